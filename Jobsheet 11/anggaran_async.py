@@ -0,0 +1,131 @@
+# anggaran_async.py
+import asyncio
+import contextvars
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from konfigurasi import ASYNC_MAKS_PEKERJA, AMBANG_PERINGATAN_ANGGARAN
+from manajer_anggaran import AnggaranHarian
+
+class AsyncAnggaranHarian:
+    """Versi async AnggaranHarian untuk Streamlit dan server berbasis asyncio.
+
+    Setiap metode repository dijalankan di ThreadPoolExecutor khusus berukuran
+    maks_pekerja (sekaligus batas konkurensi), sehingga event loop tidak pernah
+    diblokir oleh SQLite. Tiap thread pekerja memakai koneksi pool-nya sendiri,
+    jadi query yang saling bebas (misal total dan per kategori) bisa berjalan
+    bersamaan lewat asyncio.gather. Cache query AnggaranHarian ikut terpakai.
+    """
+    def __init__(self, anggaran: AnggaranHarian | None = None, maks_pekerja: int = ASYNC_MAKS_PEKERJA):
+        self.anggaran = anggaran if anggaran is not None else AnggaranHarian()
+        self.maks_pekerja = max(1, int(maks_pekerja))
+        self._executor = ThreadPoolExecutor(max_workers=self.maks_pekerja, thread_name_prefix="anggaran-db")
+
+    async def _jalankan(self, fungsi, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Salin contextvars (misal halaman aktif untuk instrumentasi) ke thread pekerja
+        konteks = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, functools.partial(konteks.run, fungsi, *args, **kwargs))
+
+    # --- Penulisan ---
+    async def tambah_transaksi(self, transaksi, peringatan=None) -> bool:
+        return await self._jalankan(self.anggaran.tambah_transaksi, transaksi, peringatan)
+
+    async def tambah_transaksi_tertunda(self, transaksi, peringatan=None) -> int:
+        """Menunggu grup commit penulis tunggal tanpa memakai thread pekerja; hasilnya id baru."""
+        return await asyncio.wrap_future(self.anggaran.tambah_transaksi_tertunda(transaksi, peringatan))
+
+    async def tambah_transaksi_batch(self, daftar_transaksi, ukuran_chunk: int = 1000,
+                                     peringatan=None) -> tuple[list[int], list[tuple]]:
+        return await self._jalankan(self.anggaran.tambah_transaksi_batch, daftar_transaksi, ukuran_chunk,
+                                    peringatan)
+
+    async def hapus_transaksi(self, id_transaksi: int) -> bool:
+        return await self._jalankan(self.anggaran.hapus_transaksi, id_transaksi)
+
+    async def bangun_ulang_ringkasan(self) -> bool:
+        return await self._jalankan(self.anggaran.bangun_ulang_ringkasan)
+
+    # --- Pembacaan ---
+    async def get_semua_transaksi_obj(self):
+        return await self._jalankan(self.anggaran.get_semua_transaksi_obj)
+
+    async def get_semua_transaksi_batch(self):
+        return await self._jalankan(self.anggaran.get_semua_transaksi_batch)
+
+    async def get_dataframe_transaksi(self, filter_tanggal=None, mulai=None, sampai=None, saring=None):
+        return await self._jalankan(self.anggaran.get_dataframe_transaksi, filter_tanggal, mulai=mulai, sampai=sampai,
+                                    saring=saring)
+
+    async def cari_transaksi(self, query: str, limit: int = 50, saring=None):
+        return await self._jalankan(self.anggaran.cari_transaksi, query, limit, saring=saring)
+
+    async def hitung_total_pencarian(self, query: str, saring=None) -> tuple[int, float]:
+        return await self._jalankan(self.anggaran.hitung_total_pencarian, query, saring=saring)
+
+    async def get_halaman_transaksi(self, ukuran: int = 50, kursor=None, arah: str = "berikut",
+                                    mulai=None, sampai=None, hitung_total: bool = False, saring=None) -> dict:
+        return await self._jalankan(self.anggaran.get_halaman_transaksi, ukuran, kursor, arah,
+                                    mulai=mulai, sampai=sampai, hitung_total=hitung_total, saring=saring)
+
+    async def hitung_total_pengeluaran(self, tanggal=None, mulai=None, sampai=None, saring=None) -> float:
+        return await self._jalankan(self.anggaran.hitung_total_pengeluaran, tanggal, mulai=mulai, sampai=sampai,
+                                    saring=saring)
+
+    async def get_pengeluaran_per_kategori(self, tanggal=None, mulai=None, sampai=None, saring=None) -> dict:
+        return await self._jalankan(self.anggaran.get_pengeluaran_per_kategori, tanggal, mulai=mulai, sampai=sampai,
+                                    saring=saring)
+
+    async def get_pengeluaran_per_periode(self, granularitas: str = "bulan", mulai=None, sampai=None,
+                                          saring=None) -> dict:
+        return await self._jalankan(self.anggaran.get_pengeluaran_per_periode, granularitas, mulai=mulai, sampai=sampai,
+                                    saring=saring)
+
+    async def status_anggaran(self, tanggal_acuan=None) -> list[dict]:
+        return await self._jalankan(self.anggaran.status_anggaran, tanggal_acuan)
+
+    async def ambil_peringatan(self, tanggal_acuan=None) -> list[dict]:
+        return await self._jalankan(self.anggaran.ambil_peringatan, tanggal_acuan)
+
+    async def get_batas_anggaran(self) -> list[dict]:
+        return await self._jalankan(self.anggaran.get_batas_anggaran)
+
+    async def atur_batas_anggaran(self, kategori, periode: str, batas: float,
+                                  ambang: float = AMBANG_PERINGATAN_ANGGARAN) -> bool:
+        return await self._jalankan(self.anggaran.atur_batas_anggaran, kategori, periode, batas, ambang)
+
+    async def hapus_batas_anggaran(self, kategori, periode: str) -> bool:
+        return await self._jalankan(self.anggaran.hapus_batas_anggaran, kategori, periode)
+
+    async def iter_transaksi(self, batch_size: int = 1000, mulai=None, sampai=None):
+        """Async generator Transaksi. Cursor SQLite terikat pada satu koneksi, jadi seluruh
+        iterasi dijalankan di satu thread khusus (bukan di pool pekerja bersama)."""
+        loop = asyncio.get_running_loop()
+        generator = self.anggaran.iter_transaksi(batch_size=batch_size, mulai=mulai, sampai=sampai)
+        ambil_batch = lambda: list(itertools.islice(generator, batch_size))
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="anggaran-iter") as executor_iter:
+            try:
+                while True:
+                    batch = await loop.run_in_executor(executor_iter, ambil_batch)
+                    if not batch: break
+                    for transaksi in batch:
+                        yield transaksi
+            finally:
+                await loop.run_in_executor(executor_iter, generator.close)
+
+    # --- Lain-lain ---
+    def statistik_cache(self) -> dict:
+        return self.anggaran.statistik_cache()
+
+    def kosongkan_cache(self):
+        self.anggaran.kosongkan_cache()
+
+    def tutup(self):
+        """Menghentikan executor setelah query yang sedang berjalan selesai."""
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.tutup)
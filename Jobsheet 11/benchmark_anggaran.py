@@ -0,0 +1,236 @@
+# benchmark_anggaran.py
+"""Benchmark lapisan repository (database.py + AnggaranHarian) pada data sintetis.
+
+Contoh:
+    python benchmark_anggaran.py                          # 10k dan 1M baris
+    python benchmark_anggaran.py --ukuran 10k,1m,10m --output hasil.json
+    python benchmark_anggaran.py --bandingkan hasil_lama.json
+
+Database dibuat di folder sementara (atau --dir agar bisa dipakai ulang antar run),
+tidak pernah menyentuh pengeluaran_harian.db. Hasil (p50 latensi, p99 bila sampel
+cukup, dan puncak memori per operasi) ditulis sebagai JSON agar run berbeda bisa dibandingkan.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import database
+from konfigurasi import KATEGORI_PENGELUARAN
+from manajer_anggaran import AnggaranHarian, rentang_periode
+from model import Transaksi
+
+# Perkiraan porsi transaksi per kategori; kategori lain di konfigurasi mendapat bobot 0.05
+BOBOT_KATEGORI = {"Makanan": 0.35, "Transportasi": 0.18, "Belanja": 0.14, "Tagihan": 0.08,
+                  "Hiburan": 0.08, "Kesehatan": 0.05, "Pendidikan": 0.04, "Lainnya": 0.08}
+RENTANG_HARI = 730       # Data sintetis tersebar di 2 tahun terakhir
+AMBANG_REGRESI = 1.2     # p50 baru > 1.2x p50 lama dianggap regresi
+MIN_SAMPEL_P99 = 100     # Di bawah ini p99 hanyalah nilai maksimum, jadi tidak dilaporkan
+
+def parse_ukuran(teks: str) -> int:
+    """'10k' -> 10000, '1m' -> 1000000, '2500' -> 2500."""
+    teks = teks.strip().lower()
+    faktor = {"k": 1_000, "m": 1_000_000}.get(teks[-1:], 1)
+    return int(float(teks[:-1] if faktor > 1 else teks) * faktor)
+
+def buat_baris_sintetis(jumlah_baris: int, seed: int = 42, ukuran_chunk: int = 50_000,
+                        akhir: datetime.date | None = None):
+    """Generator chunk tuple (deskripsi, jumlah, kategori, tanggal) yang siap untuk executemany.
+
+    Kategori mengikuti BOBOT_KATEGORI, nominal log-normal (median sekitar Rp 30.000,
+    dibulatkan ke Rp 500) dan tanggal merata di RENTANG_HARI hari terakhir.
+    """
+    rng = np.random.default_rng(seed)
+    kategori = np.array(KATEGORI_PENGELUARAN)
+    deskripsi = np.array([f"Pengeluaran {k} (sintetis)" for k in KATEGORI_PENGELUARAN])
+    bobot = np.array([BOBOT_KATEGORI.get(k, 0.05) for k in KATEGORI_PENGELUARAN])
+    bobot = bobot / bobot.sum()
+    akhir = akhir or datetime.date.today()
+    awal = np.datetime64(akhir - datetime.timedelta(days=RENTANG_HARI - 1), "D")
+    for mulai in range(0, jumlah_baris, ukuran_chunk):
+        n = min(ukuran_chunk, jumlah_baris - mulai)
+        kode = rng.choice(len(kategori), size=n, p=bobot)
+        nominal = np.maximum(500.0, np.round(rng.lognormal(10.3, 0.9, size=n) / 500) * 500)
+        tanggal = (awal + rng.integers(0, RENTANG_HARI, size=n)).astype(str)
+        yield list(zip(deskripsi[kode].tolist(), nominal.tolist(), kategori[kode].tolist(), tanggal.tolist()))
+
+def transaksi_sintetis(jumlah: int, seed: int) -> list[Transaksi]:
+    hasil = []
+    for chunk in buat_baris_sintetis(jumlah, seed=seed):
+        hasil.extend(Transaksi(d, j, k, datetime.date.fromisoformat(t)) for d, j, k, t in chunk)
+    return hasil
+
+def siapkan_database(path: str, jumlah_baris: int) -> tuple[AnggaranHarian, float]:
+    """Mengarahkan database.py ke path dan mengisinya sampai jumlah_baris (dipakai ulang jika sudah pas)."""
+    database.ganti_database(path)
+    anggaran = AnggaranHarian()
+    ada = database.fetch_query("SELECT COUNT(*) FROM transaksi", fetch_all=False)[0]
+    if ada == jumlah_baris:
+        print(f" -> Memakai ulang {path} ({ada:,} baris)")
+        return anggaran, 0.0
+    if ada:
+        database.execute_query("DELETE FROM transaksi")
+    t0 = time.perf_counter()
+    sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
+    if database.execute_many(sql, buat_baris_sintetis(jumlah_baris)) is None:
+        raise RuntimeError(f"Gagal mengisi {path}")
+    database.execute_query("ANALYZE")
+    durasi = time.perf_counter() - t0
+    print(f" -> {jumlah_baris:,} baris sintetis dibuat dalam {durasi:.1f} detik")
+    return anggaran, durasi
+
+def ukur(fungsi, ulang: int, sebelum=None) -> dict:
+    """Menjalankan fungsi sebanyak `ulang` kali untuk latensi, lalu sekali lagi di bawah tracemalloc.
+
+    Puncak memori diukur terpisah karena tracemalloc memperlambat eksekusi.
+    `sebelum` (misal mengosongkan cache) dipanggil sebelum setiap eksekusi dan tidak ikut diukur.
+    """
+    durasi = []
+    for _ in range(ulang):
+        if sebelum: sebelum()
+        t0 = time.perf_counter(); fungsi(); durasi.append(time.perf_counter() - t0)
+    if sebelum: sebelum()
+    tracemalloc.start()
+    try:
+        fungsi(); _, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    ms = np.array(durasi) * 1000
+    p99 = round(float(np.percentile(ms, 99)), 3) if ulang >= MIN_SAMPEL_P99 else None
+    return {"ulang": ulang, "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p99_ms": p99, "rata2_ms": round(float(ms.mean()), 3),
+            "min_ms": round(float(ms.min()), 3), "maks_ms": round(float(ms.max()), 3),
+            "puncak_memori_mb": round(puncak / 2**20, 2)}
+
+def jalankan_ukuran(anggaran: AnggaranHarian, jumlah_baris: int, args) -> dict:
+    """Semua operasi untuk satu ukuran tabel. Baris yang ditulis benchmark dihapus lagi di akhir."""
+    hasil = {}
+    tanpa_cache = None if args.dengan_cache else anggaran.kosongkan_cache
+    hari_ini = datetime.date.today()
+    bulan_mulai, bulan_sampai = rentang_periode(hari_ini.year, hari_ini.month)
+
+    def catat(nama, fungsi, ulang, sebelum=tanpa_cache):
+        print(f"    {nama} ...", end=" ", flush=True)
+        hasil[nama] = ukur(fungsi, ulang, sebelum)
+        h = hasil[nama]
+        ekor = f"p99 {h['p99_ms']} ms" if h["p99_ms"] is not None else f"min {h['min_ms']} ms ({ulang}x)"
+        print(f"p50 {h['p50_ms']} ms, {ekor}, memori {h['puncak_memori_mb']} MB")
+
+    # --- Pembacaan (sebelum penulisan agar ukuran tabel tepat jumlah_baris) ---
+    catat("hitung_total_pengeluaran", anggaran.hitung_total_pengeluaran, args.ulang)
+    catat("hitung_total_pengeluaran_bulan_ini",
+          lambda: anggaran.hitung_total_pengeluaran(mulai=bulan_mulai, sampai=bulan_sampai), args.ulang)
+    catat("hitung_total_pengeluaran_hari_ini", lambda: anggaran.hitung_total_pengeluaran(hari_ini), args.ulang)
+    catat("get_pengeluaran_per_kategori", anggaran.get_pengeluaran_per_kategori, args.ulang)
+    catat("get_halaman_transaksi", lambda: anggaran.get_halaman_transaksi(ukuran=50), args.ulang)
+    catat("get_dataframe_transaksi_bulan_ini",
+          lambda: anggaran.get_dataframe_transaksi(mulai=bulan_mulai, sampai=bulan_sampai), args.ulang)
+    if jumlah_baris <= args.maks_baris_penuh:
+        catat("get_dataframe_transaksi", anggaran.get_dataframe_transaksi, args.ulang_penuh)
+        catat("get_semua_transaksi_obj", anggaran.get_semua_transaksi_obj, args.ulang_penuh)
+        catat("get_semua_transaksi_batch", anggaran.get_semua_transaksi_batch, args.ulang_penuh)
+    else:
+        print(f"    (baca seluruh tabel dilewati: {jumlah_baris:,} > --maks-baris-penuh {args.maks_baris_penuh:,})")
+
+    # --- Penulisan ---
+    id_awal = database.fetch_query("SELECT COALESCE(MAX(id), 0) FROM transaksi", fetch_all=False)[0]
+    try:
+        tunggal = iter(transaksi_sintetis(args.ulang_tulis + 1, seed=7))
+        catat("tambah_transaksi", lambda: anggaran.tambah_transaksi(next(tunggal)), args.ulang_tulis, None)
+        batch = [transaksi_sintetis(args.ukuran_batch, seed=100 + i) for i in range(args.ulang + 1)]
+        sisa_batch = iter(batch)
+        catat(f"tambah_transaksi_batch_{args.ukuran_batch}",
+              lambda: anggaran.tambah_transaksi_batch(next(sisa_batch)), args.ulang, None)
+        sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
+        baris_mentah = [list(buat_baris_sintetis(args.ukuran_batch, seed=200 + i, ukuran_chunk=args.ukuran_batch))
+                        for i in range(args.ulang + 1)]
+        sisa_mentah = iter(baris_mentah)
+        catat(f"execute_many_{args.ukuran_batch}",
+              lambda: database.execute_many(sql, next(sisa_mentah)), args.ulang, None)
+        penulis = AnggaranHarian(mode_tulis_belakang=True)
+        try:
+            sisa_grup = iter([transaksi_sintetis(args.ukuran_batch, seed=300 + i) for i in range(args.ulang + 1)])
+            def tulis_belakang():
+                futures = [penulis.tambah_transaksi_tertunda(t) for t in next(sisa_grup)]
+                for f in futures: f.result()
+            catat(f"tambah_transaksi_tertunda_{args.ukuran_batch}", tulis_belakang, args.ulang, None)
+        finally:
+            penulis.tutup()
+    finally:
+        database.execute_query("DELETE FROM transaksi WHERE id > ?", (id_awal,))
+        anggaran.kosongkan_cache()
+    return hasil
+
+def bandingkan(lama: dict, baru: dict) -> list[str]:
+    """Mencetak rasio p50 baru/lama per operasi dan mengembalikan daftar regresi."""
+    regresi = []
+    for label, data_baru in baru["hasil"].items():
+        data_lama = lama.get("hasil", {}).get(label)
+        if not data_lama: continue
+        print(f"\n== Perbandingan {label} ==")
+        for nama, ukuran_baru in data_baru["operasi"].items():
+            ukuran_lama = data_lama["operasi"].get(nama)
+            if not ukuran_lama or not ukuran_lama["p50_ms"]: continue
+            rasio = ukuran_baru["p50_ms"] / ukuran_lama["p50_ms"]
+            tanda = "REGRESI" if rasio > AMBANG_REGRESI else ""
+            print(f"  {nama:45s} {ukuran_lama['p50_ms']:>10.3f} -> {ukuran_baru['p50_ms']:>10.3f} ms  x{rasio:.2f} {tanda}")
+            if tanda: regresi.append(f"{label}/{nama}")
+    return regresi
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark AnggaranHarian pada data sintetis")
+    parser.add_argument("--ukuran", default="10k,1m", help="Daftar ukuran tabel, misal 10k,1m,10m")
+    parser.add_argument("--ulang", type=int, default=MIN_SAMPEL_P99, help="Pengulangan untuk query dan batch")
+    parser.add_argument("--ulang-penuh", type=int, default=3, help="Pengulangan untuk baca seluruh tabel (hanya p50/min)")
+    parser.add_argument("--ulang-tulis", type=int, default=200, help="Pengulangan untuk INSERT tunggal")
+    parser.add_argument("--ukuran-batch", type=int, default=1000, help="Baris per operasi tulis massal")
+    parser.add_argument("--maks-baris-penuh", type=int, default=2_000_000,
+                        help="Lewati baca seluruh tabel (DataFrame/objek) di atas ukuran ini")
+    parser.add_argument("--dengan-cache", action="store_true", help="Jangan kosongkan cache query antar pengulangan")
+    parser.add_argument("--dir", help="Folder database benchmark (dipakai ulang antar run); default folder sementara")
+    parser.add_argument("--output", help="File JSON hasil (default benchmark_<waktu>.json)")
+    parser.add_argument("--bandingkan", help="File JSON run sebelumnya untuk cek regresi")
+    args = parser.parse_args(argv)
+
+    waktu = datetime.datetime.now()
+    laporan = {"meta": {"waktu": waktu.isoformat(timespec="seconds"), "python": platform.python_version(),
+                        "sqlite": sqlite3.sqlite_version, "pandas": pd.__version__, "numpy": np.__version__,
+                        "platform": platform.platform(), "argumen": vars(args)},
+               "hasil": {}}
+    tmp = None if args.dir else tempfile.TemporaryDirectory(prefix="benchmark_anggaran_")
+    folder = args.dir or tmp.name
+    os.makedirs(folder, exist_ok=True)
+    try:
+        for label in [u.strip() for u in args.ukuran.split(",") if u.strip()]:
+            jumlah_baris = parse_ukuran(label)
+            print(f"\n== {label}: {jumlah_baris:,} baris ==")
+            anggaran, durasi_isi = siapkan_database(os.path.join(folder, f"bench_{label}.db"), jumlah_baris)
+            operasi = jalankan_ukuran(anggaran, jumlah_baris, args)
+            laporan["hasil"][label] = {"baris": jumlah_baris, "isi_data_detik": round(durasi_isi, 2),
+                                       "operasi": operasi}
+    finally:
+        database.tutup_pool()
+        if tmp: tmp.cleanup()
+
+    output = args.output or f"benchmark_{waktu:%Y%m%d_%H%M%S}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(laporan, f, indent=2, ensure_ascii=False)
+    print(f"\nHasil ditulis ke {output}")
+
+    if args.bandingkan:
+        with open(args.bandingkan, encoding="utf-8") as f:
+            regresi = bandingkan(json.load(f), laporan)
+        if regresi:
+            print(f"\n{len(regresi)} operasi lebih lambat dari x{AMBANG_REGRESI}: {', '.join(regresi)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# cache_kueri.py
+import copy
+import datetime
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from konfigurasi import CACHE_MAKS_ENTRI, CACHE_TTL_DETIK
+
+_TIPE_IMMUTABLE = (int, float, str, bytes, bool, type(None), datetime.date)
+
+def _salin(nilai):
+    """Salinan dalam nilai cache (dict halaman, list, DataFrame, ...) agar pemanggil yang
+    mengubah hasilnya tidak ikut mengubah entri cache. Nilai immutable dikembalikan apa adanya."""
+    return nilai if isinstance(nilai, _TIPE_IMMUTABLE) else copy.deepcopy(nilai)
+
+class CacheKueri:
+    """Cache LRU + TTL untuk hasil query, dengan invalidasi per rentang tanggal dan kategori.
+
+    Setiap entri menyimpan cakupannya (mulai, sampai, kategori; None = tak terbatas).
+    Penulisan hanya membuang entri yang cakupannya beririsan dengan tanggal dan
+    kategori yang benar-benar diubah, bukan seluruh cache.
+    """
+    def __init__(self, maks_entri: int = CACHE_MAKS_ENTRI, ttl_detik: float = CACHE_TTL_DETIK):
+        self.maks_entri = max(1, int(maks_entri))
+        self.ttl_detik = ttl_detik
+        self._data = OrderedDict() # kunci -> (kedaluwarsa, nilai, mulai, sampai, kategori)
+        self._lock = threading.Lock()
+        self._generasi = 0 # Naik setiap invalidasi; hasil yang dihitung sebelum invalidasi tidak disimpan
+        self._statistik = {"hit": 0, "miss": 0, "kedaluwarsa": 0, "eviksi": 0, "invalidasi": 0}
+
+    def ambil_atau_hitung(self, kunci, hitung, mulai=None, sampai=None, kategori=None):
+        """Mengembalikan salinan (dalam) nilai ter-cache untuk kunci, atau memanggil hitung() lalu menyimpannya."""
+        sekarang = time.monotonic()
+        with self._lock:
+            entri = self._data.get(kunci)
+            if entri is not None:
+                if entri[0] > sekarang:
+                    self._data.move_to_end(kunci) # Tandai baru dipakai (LRU)
+                    self._statistik["hit"] += 1
+                    return _salin(entri[1])
+                del self._data[kunci]; self._statistik["kedaluwarsa"] += 1
+            self._statistik["miss"] += 1
+            generasi = self._generasi
+        nilai = hitung() # Di luar lock: query lambat tidak menahan pembaca lain
+        with self._lock:
+            if generasi != self._generasi: # Ada penulisan selama query berjalan, nilai mungkin basi
+                return _salin(nilai)
+            self._data[kunci] = (time.monotonic() + self.ttl_detik, nilai, mulai, sampai, kategori)
+            self._data.move_to_end(kunci)
+            while len(self._data) > self.maks_entri:
+                self._data.popitem(last=False); self._statistik["eviksi"] += 1
+        return _salin(nilai)
+
+    def invalidasi(self, mulai: datetime.date, sampai: datetime.date | None = None, kategori=None) -> int:
+        """Membuang entri yang cakupannya beririsan dengan rentang [mulai, sampai] dan kategori.
+
+        kategori boleh satu nama, kumpulan nama, atau None (semua kategori).
+        Mengembalikan jumlah entri yang dibuang.
+        """
+        sampai = sampai or mulai
+        kumpulan_kategori = None if kategori is None else ({kategori} if isinstance(kategori, str) else set(kategori))
+        with self._lock:
+            dibuang = [kunci for kunci, (_, _, e_mulai, e_sampai, e_kategori) in self._data.items()
+                       if (e_mulai is None or e_mulai <= sampai) and (e_sampai is None or mulai <= e_sampai)
+                       and (e_kategori is None or kumpulan_kategori is None or e_kategori in kumpulan_kategori)]
+            for kunci in dibuang:
+                del self._data[kunci]
+            self._generasi += 1
+            self._statistik["invalidasi"] += len(dibuang)
+        return len(dibuang)
+
+    def kosongkan(self):
+        with self._lock:
+            self._statistik["invalidasi"] += len(self._data)
+            self._data.clear()
+            self._generasi += 1
+
+    def statistik(self) -> dict:
+        with self._lock:
+            hasil = dict(self._statistik, entri=len(self._data), maks_entri=self.maks_entri)
+        total = hasil["hit"] + hasil["miss"]
+        hasil["hit_rate"] = hasil["hit"] / total if total else 0.0
+        return hasil
+
+def di_cache(fungsi):
+    """Dekorator metode baca AnggaranHarian: hasil disimpan di self._cache.
+
+    Kunci = nama metode + semua argumen. Cakupan entri diambil dari argumen
+    bernama tanggal/filter_tanggal, mulai, sampai dan kategori (jika ada), lalu
+    dilengkapi dari argumen saring (FilterTransaksi) lewat lingkup()-nya.
+    """
+    tanda_tangan = inspect.signature(fungsi)
+
+    @functools.wraps(fungsi)
+    def pembungkus(self, *args, **kwargs):
+        cache = getattr(self, "_cache", None)
+        if cache is None:
+            return fungsi(self, *args, **kwargs)
+        terikat = tanda_tangan.bind(self, *args, **kwargs); terikat.apply_defaults()
+        argumen = {k: v for k, v in terikat.arguments.items() if k != "self"}
+        kunci = (fungsi.__name__,) + tuple(argumen.items())
+        saring = argumen.get("saring")
+        l_mulai, l_sampai, l_kategori = saring.lingkup() if saring is not None else (None, None, None)
+        tanggal = argumen.get("tanggal") or argumen.get("filter_tanggal")
+        mulai = tanggal or argumen.get("mulai") or l_mulai
+        sampai = tanggal or argumen.get("sampai") or l_sampai
+        kategori = argumen.get("kategori") or l_kategori
+        return cache.ambil_atau_hitung(kunci, lambda: fungsi(self, *args, **kwargs), mulai, sampai,
+                                       kategori if isinstance(kategori, str) else None) # Banyak kategori = semua
+    return pembungkus
@@ -1,86 +1,368 @@
 # database.py
+import hashlib
+import os
+import re
 import sqlite3
+import threading
+import time
 import pandas as pd
-from konfigurasi import DB_PATH # Gunakan path dari konfigurasi
+import instrumentasi
+import migrasi
+from konfigurasi import (DB_PATH, POOL_MAKS_KONEKSI, POOL_TIMEOUT_DETIK, # Gunakan path dari konfigurasi
+                         PROFIL_PENYIMPANAN, SQLITE_CACHED_STATEMENTS, SHARD_DIR, POOL_MAKS_SHARD)
 
-def get_db_connection() -> sqlite3.Connection | None:
-    """Membuka dan mengembalikan koneksi baru ke database SQLite."""
-    try:
-        conn = sqlite3.connect(DB_PATH, timeout=10,
-                               detect_types=sqlite3.PARSE_DECLTYPES)
+def terapkan_profil_penyimpanan(conn: sqlite3.Connection, profil: dict | None = None):
+    """Menjalankan PRAGMA dari profil penyimpanan (WAL, synchronous, mmap, cache, temp_store)."""
+    for nama, nilai in (PROFIL_PENYIMPANAN if profil is None else profil).items():
+        if not str(nama).isidentifier() or not str(nilai).replace("-", "").isalnum():
+            print(f"ERROR [database.py] PRAGMA tidak valid dilewati: {nama}={nilai}"); continue
+        try:
+            conn.execute(f"PRAGMA {nama} = {nilai}").fetchall()
+        except sqlite3.Error as e:
+            print(f"ERROR [database.py] PRAGMA {nama} gagal: {e}")
+
+class PoolKoneksi:
+    """Pool koneksi SQLite thread-safe: satu koneksi per thread, dipakai ulang antar pemanggilan.
+
+    Koneksi milik thread yang sudah selesai (Streamlit membuat thread baru untuk
+    tiap rerun) dikembalikan ke daftar idle dan diberikan ke thread berikutnya,
+    sehingga page cache SQLite tetap hangat.
+    """
+    def __init__(self, db_path: str, maks_koneksi: int = POOL_MAKS_KONEKSI,
+                 timeout: float = POOL_TIMEOUT_DETIK, profil: dict | None = None):
+        self.db_path = db_path
+        self.profil = PROFIL_PENYIMPANAN if profil is None else profil
+        self.maks_koneksi = max(1, int(maks_koneksi))
+        self.timeout = timeout
+        self._lokal = threading.local()
+        self._kondisi = threading.Condition()
+        self._dipakai = {} # ident thread -> koneksi
+        self._idle = []    # koneksi bebas yang siap dipakai thread lain
+        self.terakhir_dipakai = time.monotonic() # Untuk urutan LRU di registri pool (ambil_pool)
+
+    def _buat_koneksi(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10,
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False, # Koneksi bisa berpindah thread lewat daftar idle
+                               cached_statements=SQLITE_CACHED_STATEMENTS) # SQL kanonik (filter_kueri) dipakai ulang
         conn.row_factory = sqlite3.Row # Akses kolom by name
+        terapkan_profil_penyimpanan(conn, self.profil) # Sekali per koneksi, bukan per query
         return conn
+
+    @staticmethod
+    def _sehat(conn: sqlite3.Connection, bersihkan: bool = False) -> bool:
+        """Health check ringan: koneksi masih terbuka (dan, bila diminta, tanpa sisa transaksi)."""
+        try:
+            if bersihkan and conn.in_transaction: conn.rollback()
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _tutup(conn: sqlite3.Connection):
+        try: conn.close()
+        except sqlite3.Error: pass
+
+    def _kembalikan_koneksi_thread_mati(self):
+        """Pindahkan koneksi milik thread yang sudah berhenti ke daftar idle (dipanggil dengan lock)."""
+        hidup = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._dipakai if i not in hidup]:
+            self._idle.append(self._dipakai.pop(ident))
+
+    def ambil(self) -> sqlite3.Connection:
+        """Mengembalikan koneksi milik thread ini, membuat/meminjam satu jika belum ada."""
+        self.terakhir_dipakai = time.monotonic()
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is not None:
+            if self._sehat(conn): return conn
+            self._lepas(conn, rusak=True); conn = None
+
+        ident = threading.get_ident()
+        batas_waktu = time.monotonic() + self.timeout
+        with self._kondisi:
+            # Entri milik thread mati yang ident-nya dipakai ulang thread ini jangan ikut dihitung kapasitas
+            lama = self._dipakai.pop(ident, None)
+            if lama is not None: self._idle.append(lama)
+            while True:
+                self._kembalikan_koneksi_thread_mati()
+                while self._idle:
+                    kandidat = self._idle.pop()
+                    if self._sehat(kandidat, bersihkan=True):
+                        conn = kandidat; break
+                    self._tutup(kandidat)
+                if conn is None and len(self._dipakai) < self.maks_koneksi:
+                    conn = self._buat_koneksi()
+                if conn is not None:
+                    self._dipakai[ident] = conn; break
+                sisa = batas_waktu - time.monotonic()
+                if sisa <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Pool penuh ({self.maks_koneksi} koneksi), tidak ada koneksi bebas dalam {self.timeout} detik")
+                # Thread pemilik yang berhenti tidak memberi sinyal, jadi cek ulang secara berkala
+                self._kondisi.wait(timeout=min(sisa, 0.05))
+        self._lokal.conn = conn
+        return conn
+
+    def _lepas(self, conn: sqlite3.Connection, rusak: bool = False):
+        with self._kondisi:
+            for ident, c in list(self._dipakai.items()):
+                if c is conn: del self._dipakai[ident]
+            if rusak: self._tutup(conn)
+            else: self._idle.append(conn)
+            self._kondisi.notify()
+        if getattr(self._lokal, 'conn', None) is conn:
+            self._lokal.conn = None
+
+    def lepas_koneksi_thread(self):
+        """Mengembalikan koneksi thread ini ke pool (opsional, misal di akhir thread pekerja)."""
+        conn = getattr(self._lokal, 'conn', None)
+        if conn is not None: self._lepas(conn, rusak=not self._sehat(conn, bersihkan=True))
+
+    def tutup_semua(self):
+        """Menutup semua koneksi (dipakai & idle). Thread yang masih berjalan akan membuka koneksi baru."""
+        with self._kondisi:
+            for conn in list(self._dipakai.values()) + self._idle:
+                self._tutup(conn)
+            self._dipakai.clear(); self._idle.clear()
+            self._kondisi.notify_all()
+        self._lokal = threading.local()
+
+    def tutup_idle(self) -> int:
+        """Menutup koneksi idle saja (termasuk milik thread yang sudah berhenti).
+        Koneksi yang sedang dipakai thread hidup tidak disentuh. Mengembalikan jumlah yang ditutup."""
+        with self._kondisi:
+            self._kembalikan_koneksi_thread_mati()
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._tutup(conn)
+        return len(idle)
+
+    def statistik(self) -> dict:
+        with self._kondisi:
+            return {"db_path": self.db_path, "maks_koneksi": self.maks_koneksi,
+                    "dipakai": len(self._dipakai), "idle": len(self._idle)}
+
+# Registri pool per file database (shard), untuk membatasi jumlah file yang terbuka.
+_daftar_pool = {}
+_lock_daftar_pool = threading.Lock()
+
+def ambil_pool(db_path: str) -> PoolKoneksi:
+    """Pool untuk satu file database, dibuat sekali lalu dipakai ulang.
+
+    Jika lebih dari POOL_MAKS_SHARD pool punya koneksi terbuka, koneksi idle milik pool
+    yang paling lama tidak dipakai (PoolKoneksi.terakhir_dipakai, diperbarui setiap ambil())
+    ditutup. Koneksi yang sedang dipakai thread lain tidak pernah ditutup; objek pool tetap
+    valid dan membuka koneksi lagi saat dibutuhkan.
+    """
+    db_path = os.path.abspath(db_path)
+    with _lock_daftar_pool:
+        pool = _daftar_pool.get(db_path)
+        if pool is None:
+            pool = _daftar_pool[db_path] = PoolKoneksi(db_path)
+        pool.terakhir_dipakai = time.monotonic()
+        aktif = [p for p in _daftar_pool.values() if (stat := p.statistik())["dipakai"] or stat["idle"]]
+        aktif.sort(key=lambda p: p.terakhir_dipakai)
+        for lama in aktif[:max(0, len(aktif) - POOL_MAKS_SHARD)]:
+            if lama is not pool and lama is not _pool: lama.tutup_idle()
+    return pool
+
+def path_tenant(tenant: str) -> str:
+    """Router default: SHARD_DIR/<2 hex hash>/<nama aman>-<hash>.db, satu file per tenant.
+
+    Subfolder hash menjaga jumlah file per folder tetap kecil; akhiran hash mencegah
+    dua nama tenant yang sama setelah dibersihkan jatuh ke file yang sama.
+    """
+    sidik = hashlib.sha1(str(tenant).encode("utf-8")).hexdigest()
+    aman = re.sub(r"[^A-Za-z0-9_.-]", "_", str(tenant))[:48]
+    return os.path.join(SHARD_DIR, sidik[:2], f"{aman}-{sidik[:10]}.db")
+
+_router_tenant = path_tenant
+
+def atur_router_tenant(fungsi):
+    """Mengganti fungsi routing tenant -> path file database (misal ke disk/volume lain per shard)."""
+    global _router_tenant
+    _router_tenant = fungsi
+
+def pool_tenant(tenant: str) -> PoolKoneksi:
+    """Pool untuk file database milik tenant, sesuai fungsi routing yang aktif."""
+    path = _router_tenant(tenant)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    return ambil_pool(path)
+
+_pool = ambil_pool(DB_PATH) # Pool default (mode satu database)
+
+def get_db_connection(pool: PoolKoneksi | None = None) -> sqlite3.Connection | None:
+    """Mengembalikan koneksi (dari pool, default pool utama) milik thread ini ke database SQLite.
+
+    Koneksi dipakai ulang antar pemanggilan; JANGAN ditutup oleh pemanggil.
+    """
+    try:
+        return (pool or _pool).ambil()
     except sqlite3.Error as e:
         print(f"ERROR [database.py] Koneksi DB gagal: {e}"); return None
 
-def execute_query(query: str, params: tuple = None):
+def tutup_pool():
+    """Menutup semua koneksi di semua pool (misal saat aplikasi berhenti)."""
+    with _lock_daftar_pool:
+        for pool in _daftar_pool.values(): pool.tutup_semua()
+
+def ganti_database(db_path: str):
+    """Mengarahkan pool default modul ini ke file database lain (misal DB sementara untuk benchmark)."""
+    global _pool, DB_PATH
+    _pool.tutup_semua()
+    DB_PATH = db_path
+    _pool = ambil_pool(db_path)
+
+def diagnostik_database(pool: PoolKoneksi | None = None) -> dict:
+    """Mengembalikan nilai PRAGMA yang aktif pada koneksi thread ini beserta statistik pool."""
+    hasil = {"sqlite_version": sqlite3.sqlite_version, "pool": (pool or _pool).statistik(),
+             "jumlah_pool": len(_daftar_pool), "pragma": {}}
+    conn = get_db_connection(pool)
+    if not conn: return hasil
+    for nama in PROFIL_PENYIMPANAN:
+        try:
+            baris = conn.execute(f"PRAGMA {nama}").fetchone()
+            hasil["pragma"][nama] = baris[0] if baris else None
+        except sqlite3.Error as e:
+            hasil["pragma"][nama] = f"ERROR: {e}"
+    return hasil
+
+def execute_query(query: str, params: tuple = None, pool: PoolKoneksi | None = None):
     """Menjalankan query non-SELECT. Mengembalikan lastrowid jika INSERT."""
-    conn = get_db_connection();
+    conn = get_db_connection(pool);
     if not conn: return None
     last_id = None
-    try:
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        conn.commit()
-        last_id = cursor.lastrowid
-        return last_id
-    except sqlite3.Error as e:
-        print(f"ERROR [database.py] Query gagal: {query[:60]}"); conn.rollback(); return None
-    finally:
-        if conn: conn.close()
+    with instrumentasi.ukur_kueri(query, params, conn) as catatan:
+        try:
+            cursor = conn.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            conn.commit()
+            catatan["baris"] = cursor.rowcount
+            last_id = cursor.lastrowid
+            return last_id
+        except sqlite3.Error as e:
+            catatan["error"] = e
+            print(f"ERROR [database.py] Query gagal: {query[:60]} ({e})"); conn.rollback(); return None
 
-def fetch_query(query: str, params: tuple = None, fetch_all: bool = True):
+def execute_many(query: str, chunk_params, pool: PoolKoneksi | None = None) -> list[int] | None:
+    """Menjalankan INSERT massal per chunk (executemany) dalam SATU transaksi.
+
+    chunk_params adalah iterable berisi list tuple parameter; dikonsumsi secara
+    lazy sehingga data bisa di-stream. Mengembalikan daftar id yang dibuat
+    (berurutan sesuai input) atau None jika gagal (semua perubahan di-rollback).
+    """
+    conn = get_db_connection(pool);
+    if not conn: return None
+    semua_id = []
+    with instrumentasi.ukur_kueri(query, None, conn) as catatan:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE") # Kunci tulis diambil sekali untuk seluruh impor
+            for chunk in chunk_params:
+                if not chunk: continue
+                cursor.executemany(query, chunk)
+                # Selama kunci tulis dipegang, AUTOINCREMENT memberi id berurutan tanpa celah
+                id_akhir = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+                semua_id.extend(range(id_akhir - len(chunk) + 1, id_akhir + 1))
+            conn.commit()
+            catatan["baris"] = len(semua_id)
+            return semua_id
+        except sqlite3.Error as e:
+            catatan["error"] = e
+            print(f"ERROR [database.py] Query massal gagal: {query[:60]} ({e})"); conn.rollback(); return None
+        except Exception as e: # Misal error saat membaca file sumber di tengah impor
+            catatan["error"] = e
+            print(f"ERROR [database.py] Sumber data massal gagal: {type(e).__name__} - {e}"); conn.rollback(); return None
+
+def fetch_query(query: str, params: tuple = None, fetch_all: bool = True, pool: PoolKoneksi | None = None):
     """Menjalankan query SELECT dan mengembalikan hasil."""
-    conn = get_db_connection();
+    conn = get_db_connection(pool);
     if not conn: return None
+    with instrumentasi.ukur_kueri(query, params, conn) as catatan:
+        try:
+            cursor = conn.cursor()
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            result = cursor.fetchall() if fetch_all else cursor.fetchone();
+            catatan["baris"] = len(result) if fetch_all else int(result is not None)
+            return result
+        except sqlite3.Error as e:
+            catatan["error"] = e
+            print(f"ERROR [database.py] Fetch gagal: {query[:60]} ({e})"); return None
+
+def iter_query(query: str, params: tuple = None, ukuran_batch: int = 1000, pool: PoolKoneksi | None = None,
+               lempar_error: bool = False):
+    """Generator hasil SELECT per batch (list baris) memakai cursor.fetchmany.
+
+    Hanya satu batch yang ada di memori pada satu waktu, cocok untuk ekspor
+    tabel besar. Error dicetak dan iterasi berhenti; dengan lempar_error=True
+    error juga diteruskan ke pemanggil, agar hasil yang terpotong tidak terlihat
+    seperti hasil lengkap. Durasi yang dicatat instrumentasi hanya waktu di
+    SQLite, tanpa waktu konsumen memproses batch.
+    """
+    conn = get_db_connection(pool);
+    if not conn:
+        if lempar_error: raise sqlite3.OperationalError("Koneksi DB gagal")
+        return
+    cursor = conn.cursor()
+    durasi = 0.0; jumlah_baris = 0; error = None
     try:
-        cursor = conn.cursor()
+        mulai = time.perf_counter()
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
-        result = cursor.fetchall() if fetch_all else cursor.fetchone();
-        return result
+        while True:
+            batch = cursor.fetchmany(max(1, int(ukuran_batch)))
+            durasi += time.perf_counter() - mulai
+            if not batch: break
+            jumlah_baris += len(batch)
+            yield batch
+            mulai = time.perf_counter()
     except sqlite3.Error as e:
-        print(f"ERROR [database.py] Fetch gagal: {query[:60]}"); return None
+        error = e; durasi += time.perf_counter() - mulai
+        print(f"ERROR [database.py] Iterasi gagal: {query[:60]} ({e})")
+        if lempar_error: raise
     finally:
-        if conn: conn.close()
+        cursor.close() # Lepas statement meski konsumen berhenti di tengah jalan
+        instrumentasi.catat(query, params, durasi, jumlah_baris, error, conn)
 
-def get_dataframe(query: str, params: tuple = None) -> pd.DataFrame:
+def get_dataframe(query: str, params: tuple = None, pool: PoolKoneksi | None = None) -> pd.DataFrame:
     """Menjalankan query SELECT dan mengembalikan DataFrame Pandas."""
-    conn = get_db_connection();
+    conn = get_db_connection(pool);
     if not conn: return pd.DataFrame()
-    try:
-        df = pd.read_sql_query(query, conn, params=params); return df
-    except Exception as e:
-        print(f"ERROR [database.py] Gagal baca ke DataFrame: {e}"); return pd.DataFrame()
-    finally:
-        if conn: conn.close()
+    with instrumentasi.ukur_kueri(query, params, conn) as catatan:
+        try:
+            df = pd.read_sql_query(query, conn, params=params)
+            catatan["baris"] = len(df); return df
+        except Exception as e:
+            catatan["error"] = e
+            print(f"ERROR [database.py] Gagal baca ke DataFrame: {e}"); return pd.DataFrame()
 
-def setup_database_initial(): # Fungsi setup dipindah ke sini juga (opsional)
-    """Memastikan tabel transaksi ada (dipanggil oleh AnggaranHarian jika perlu)."""
-    print(f"Memeriksa/membuat tabel di database (via database.py): {DB_PATH}")
-    conn = get_db_connection()
+def setup_database_initial(pool: PoolKoneksi | None = None): # Fungsi setup dipindah ke sini juga (opsional)
+    """Memastikan skema database terbaru (dipanggil oleh AnggaranHarian jika perlu)."""
+    print(f"Memeriksa/migrasi skema database (via database.py): {(pool or _pool).db_path}")
+    conn = get_db_connection(pool)
     if not conn: return False
     try:
-        cursor = conn.cursor()
-        sql_create_table = """
-        CREATE TABLE IF NOT EXISTS transaksi (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            deskripsi TEXT NOT NULL,
-            jumlah REAL NOT NULL CHECK(jumlah > 0),
-            kategori TEXT,
-            tanggal DATE NOT NULL
-        );"""
-        cursor.execute(sql_create_table)
-        conn.commit()
-        print(" -> Tabel 'transaksi' siap.")
+        versi = migrasi.jalankan_migrasi(conn)
+        print(f" -> Skema database siap (versi {versi}).")
         return True
     except sqlite3.Error as e:
         print(f" -> Error SQLite saat setup: {e}")
         return False
-    finally:
-        if conn: conn.close()
\ No newline at end of file
+
+def bangun_ulang_ringkasan(pool: PoolKoneksi | None = None) -> int | None:
+    """Membangun ulang tabel agregat ringkasan_harian. Mengembalikan jumlah barisnya atau None jika gagal."""
+    conn = get_db_connection(pool)
+    if not conn: return None
+    try:
+        return migrasi.bangun_ulang_ringkasan(conn)
+    except sqlite3.Error as e:
+        print(f"ERROR [database.py] Bangun ulang ringkasan gagal: {e}"); return None
@@ -0,0 +1,106 @@
+# filter_kueri.py
+import dataclasses
+import datetime
+import functools
+from konfigurasi import KATEGORI_DEFAULT
+
+# Urutan tetap jenis filter: SQL yang dihasilkan selalu sama untuk bentuk filter yang sama
+_URUTAN_KONDISI = ("tanggal", "mulai", "sampai", "kategori", "jumlah_min", "jumlah_maks", "teks")
+
+@dataclasses.dataclass(frozen=True)
+class FilterTransaksi:
+    """Filter transaksi yang immutable (bisa jadi kunci cache) dan menghasilkan SQL kanonik.
+
+    Dua filter dengan bentuk sama (jenis filter yang terisi dan jumlah kategori
+    sama) selalu menghasilkan teks SQL yang identik, sehingga statement yang sudah
+    dikompilasi di cache sqlite3 (cached_statements) bisa dipakai ulang. Nilai
+    filter selalu dikirim sebagai parameter, tidak pernah disisipkan ke SQL.
+    """
+    tanggal: datetime.date | None = None
+    mulai: datetime.date | None = None
+    sampai: datetime.date | None = None
+    kategori: tuple[str, ...] | None = None   # Boleh diisi str atau iterable, dinormalkan jadi tuple terurut
+    jumlah_min: float | None = None
+    jumlah_maks: float | None = None
+    teks: str | None = None                   # Cari di deskripsi (LIKE, tidak peka huruf besar/kecil)
+
+    def __post_init__(self):
+        kategori = self.kategori
+        if isinstance(kategori, str): kategori = (kategori,)
+        kategori = tuple(sorted(set(kategori))) if kategori else None
+        object.__setattr__(self, "kategori", kategori)
+        teks = self.teks.strip() if isinstance(self.teks, str) else None
+        object.__setattr__(self, "teks", teks or None)
+        if self.jumlah_min is not None and self.jumlah_maks is not None and self.jumlah_min > self.jumlah_maks:
+            raise ValueError("jumlah_min tidak boleh lebih besar dari jumlah_maks")
+
+    @property
+    def hanya_tanggal_kategori(self) -> bool:
+        """True jika filter bisa dijawab dari tabel agregat ringkasan_harian (tanpa jumlah/teks)."""
+        return self.jumlah_min is None and self.jumlah_maks is None and self.teks is None
+
+    def bentuk(self) -> tuple:
+        """Bentuk filter: jenis kondisi yang aktif (kategori disertai jumlah nilainya dan
+        apakah KATEGORI_DEFAULT ikut dicari)."""
+        return tuple((nama, len(self.kategori), KATEGORI_DEFAULT in self.kategori) if nama == "kategori" else nama
+                     for nama in _URUTAN_KONDISI
+                     if getattr(self, nama) is not None and not (nama in ("mulai", "sampai") and self.tanggal))
+
+    def params(self) -> tuple:
+        hasil = []
+        for nama in self.bentuk():
+            if isinstance(nama, tuple): hasil.extend(self.kategori)
+            elif nama in ("tanggal", "mulai", "sampai"): hasil.append(getattr(self, nama).strftime("%Y-%m-%d"))
+            elif nama == "teks": hasil.append("%" + _escape_like(self.teks) + "%")
+            else: hasil.append(float(getattr(self, nama)))
+        return tuple(hasil)
+
+    def lingkup(self) -> tuple:
+        """(mulai, sampai, kategori) untuk cakupan entri cache; kategori hanya jika tepat satu."""
+        kategori = self.kategori[0] if self.kategori and len(self.kategori) == 1 else None
+        if self.tanggal: return self.tanggal, self.tanggal, kategori
+        return self.mulai, self.sampai, kategori
+
+    def dengan_tanggal(self, tanggal=None, mulai=None, sampai=None) -> "FilterTransaksi":
+        """Salinan filter dengan tanggal/rentang diganti (argumen None tidak mengubah apa pun)."""
+        if tanggal is None and mulai is None and sampai is None: return self
+        if tanggal is not None: return dataclasses.replace(self, tanggal=tanggal, mulai=None, sampai=None)
+        return dataclasses.replace(self, tanggal=None, mulai=mulai or self.mulai, sampai=sampai or self.sampai)
+
+def _escape_like(teks: str) -> str:
+    return teks.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+@functools.lru_cache(maxsize=256)
+def _kondisi_sql(bentuk: tuple) -> tuple[str, ...]:
+    kondisi = []
+    for nama in bentuk:
+        if isinstance(nama, tuple):
+            kategori_in = "kategori IN (" + ", ".join("?" * nama[1]) + ")"
+            # Setara migrasi.KATEGORI_SQL IN (...) (kategori NULL/'' dihitung KATEGORI_DEFAULT seperti di
+            # tabel agregat), tapi kolom kategori tetap telanjang agar indeksnya terpakai
+            kondisi.append(f"({kategori_in} OR kategori IS NULL OR kategori = '')" if nama[2] else kategori_in)
+        elif nama == "tanggal": kondisi.append("tanggal = ?")
+        elif nama == "mulai": kondisi.append("tanggal >= ?")
+        elif nama == "sampai": kondisi.append("tanggal <= ?")
+        elif nama == "jumlah_min": kondisi.append("jumlah >= ?")
+        elif nama == "jumlah_maks": kondisi.append("jumlah <= ?")
+        elif nama == "teks": kondisi.append("deskripsi LIKE ? ESCAPE '\\'")
+    return tuple(kondisi)
+
+@functools.lru_cache(maxsize=512)
+def _rangkai_sql(select: str, bentuk: tuple, kondisi_tambahan: tuple, akhiran: str) -> str:
+    kondisi = _kondisi_sql(bentuk) + kondisi_tambahan
+    sql = select + (" WHERE " + " AND ".join(kondisi) if kondisi else "")
+    return sql + (" " + akhiran if akhiran else "")
+
+def bangun_kueri(select: str, saring: FilterTransaksi | None = None, akhiran: str = "",
+                 kondisi_tambahan: tuple[str, ...] = (), params_tambahan: tuple = ()) -> tuple[str, tuple]:
+    """Merangkai SELECT + WHERE kanonik dari filter + akhiran (GROUP BY/ORDER BY/LIMIT).
+
+    kondisi_tambahan (misal kursor pagination) ditempatkan setelah kondisi filter,
+    params_tambahan mengikuti urutan yang sama dan diikuti parameter akhiran.
+    Mengembalikan (sql, params); teks sql yang sama untuk bentuk filter yang sama.
+    """
+    saring = saring or FilterTransaksi()
+    sql = _rangkai_sql(select, saring.bentuk(), tuple(kondisi_tambahan), akhiran)
+    return sql, saring.params() + tuple(params_tambahan)
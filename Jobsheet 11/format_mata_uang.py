@@ -0,0 +1,59 @@
+# format_mata_uang.py
+import locale
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+def _deteksi_pemisah_ribuan() -> str:
+    """Mengatur locale moneter Indonesia SEKALI saat import dan membaca pemisah ribuannya.
+
+    setlocale bersifat global per proses dan tidak aman dipanggil dari banyak thread
+    (Streamlit), jadi fungsi format di bawah tidak pernah memanggilnya lagi.
+    """
+    for nama_locale in ('id_ID.UTF-8', 'Indonesian_Indonesia.1252'):
+        try:
+            locale.setlocale(locale.LC_MONETARY, nama_locale)
+            return locale.localeconv().get('mon_thousands_sep') or '.'
+        except locale.Error:
+            continue
+    print("Locale id_ID/Indonesian tidak tersedia, memakai pemisah ribuan '.'.")
+    return '.'
+
+PEMISAH_RIBUAN = _deteksi_pemisah_ribuan()
+SIMBOL_RP = "Rp "
+# Tabel string untuk kelompok 3 digit: kelompok paling kiri tanpa nol di depan, sisanya '.ddd'
+_KELOMPOK_KEPALA = np.array([str(i) for i in range(1000)])
+_KELOMPOK_EKOR = np.array([f"{PEMISAH_RIBUAN}{i:03d}" for i in range(1000)])
+
+@lru_cache(maxsize=4096)
+def format_angka(angka) -> str:
+    """Membulatkan ke rupiah penuh dengan pemisah ribuan, contoh 1250000 -> '1.250.000'."""
+    try:
+        nilai = round(float(angka or 0))
+    except (ValueError, TypeError, OverflowError):
+        nilai = 0
+    return f"{nilai:,d}".replace(",", PEMISAH_RIBUAN)
+
+@lru_cache(maxsize=4096)
+def format_rp(angka) -> str:
+    """Format satu nilai rupiah, contoh 25000 -> 'Rp 25.000' (hasil di-cache)."""
+    teks = format_angka(angka)
+    return f"-{SIMBOL_RP}{teks[1:]}" if teks.startswith("-") else f"{SIMBOL_RP}{teks}"
+
+def format_rp_kolom(kolom: pd.Series) -> pd.Series:
+    """Format seluruh kolom angka sekaligus, contoh [25000, 1500] -> ['Rp 25.000', 'Rp 1.500'].
+
+    Angka dipecah menjadi kelompok 3 digit dengan aritmetika NumPy lalu disusun dari
+    tabel string di atas memakai np.strings.add, jadi tidak ada lambda per baris.
+    """
+    angka = pd.to_numeric(kolom, errors='coerce').fillna(0).round().astype('int64').to_numpy()
+    sisa = np.abs(angka)
+    teks = np.zeros(sisa.shape, dtype='U1') # String kosong
+    while True:
+        masih_besar = sisa >= 1000
+        if not masih_besar.any(): break
+        teks = np.where(masih_besar, np.strings.add(_KELOMPOK_EKOR[sisa % 1000], teks), teks)
+        sisa = np.where(masih_besar, sisa // 1000, sisa)
+    teks = np.strings.add(_KELOMPOK_KEPALA[sisa], teks)
+    awalan = np.where(angka < 0, "-" + SIMBOL_RP, SIMBOL_RP)
+    return pd.Series(np.strings.add(awalan, teks).astype(object), index=kolom.index, name=kolom.name)
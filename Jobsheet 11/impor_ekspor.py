@@ -0,0 +1,94 @@
+# impor_ekspor.py
+import csv
+import json
+import os
+from manajer_anggaran import AnggaranHarian
+
+KOLOM_TRANSAKSI = ["deskripsi", "jumlah", "kategori", "tanggal"]
+
+def _baca_csv(path_file: str, pemetaan_kolom: dict | None, pemisah: str):
+    """Generator baris CSV sebagai dict dengan nama kolom Transaksi (tidak memuat seluruh file)."""
+    with open(path_file, newline="", encoding="utf-8-sig") as f:
+        for baris in csv.DictReader(f, delimiter=pemisah):
+            if pemetaan_kolom:
+                baris = {pemetaan_kolom.get(k, k): v for k, v in baris.items()}
+            yield baris
+
+def _baca_jsonl(path_file: str):
+    """Generator objek JSON per baris; baris rusak diteruskan sebagai string agar ikut ditolak."""
+    with open(path_file, encoding="utf-8") as f:
+        for baris in f:
+            baris = baris.strip()
+            if not baris: continue
+            try:
+                yield json.loads(baris)
+            except json.JSONDecodeError:
+                yield baris # Bukan dict -> ditolak oleh tambah_transaksi_batch
+
+def impor_csv(anggaran: AnggaranHarian, path_file: str, pemetaan_kolom: dict | None = None,
+              pemisah: str = ",", ukuran_chunk: int = 5000) -> tuple[list[int], list[tuple]]:
+    """Mengimpor transaksi dari file CSV (header: deskripsi,jumlah,kategori,tanggal).
+
+    pemetaan_kolom memetakan nama kolom di file (misal ekspor bank) ke nama kolom
+    Transaksi, contoh {"Keterangan": "deskripsi", "Debet": "jumlah"}.
+    """
+    return anggaran.tambah_transaksi_batch(_baca_csv(path_file, pemetaan_kolom, pemisah), ukuran_chunk)
+
+def impor_jsonl(anggaran: AnggaranHarian, path_file: str,
+                ukuran_chunk: int = 5000) -> tuple[list[int], list[tuple]]:
+    """Mengimpor transaksi dari file JSON-lines (satu objek transaksi per baris)."""
+    return anggaran.tambah_transaksi_batch(_baca_jsonl(path_file), ukuran_chunk)
+
+def _tulis_atomik(path_file: str, tulis_isi) -> int:
+    """Menulis ke file sementara lalu mengganti path_file, agar ekspor yang gagal tidak meninggalkan file setengah jadi."""
+    path_sementara = f"{path_file}.tmp"
+    try:
+        with open(path_sementara, "w", newline="", encoding="utf-8") as f:
+            jumlah = tulis_isi(f)
+        os.replace(path_sementara, path_file)
+        return jumlah
+    except BaseException:
+        if os.path.exists(path_sementara): os.remove(path_sementara)
+        raise
+
+def ekspor_csv(anggaran: AnggaranHarian, path_file: str, batch_size: int = 5000,
+               mulai=None, sampai=None) -> int:
+    """Mengekspor transaksi ke CSV secara streaming. Mengembalikan jumlah baris yang ditulis."""
+    def tulis_isi(f):
+        writer = csv.writer(f)
+        writer.writerow(["id"] + KOLOM_TRANSAKSI)
+        jumlah = 0
+        for t in anggaran.iter_transaksi(batch_size=batch_size, mulai=mulai, sampai=sampai):
+            writer.writerow((t.id, t.deskripsi, t.jumlah, t.kategori, t.tanggal.isoformat()))
+            jumlah += 1
+        return jumlah
+    return _tulis_atomik(path_file, tulis_isi)
+
+def ekspor_jsonl(anggaran: AnggaranHarian, path_file: str, batch_size: int = 5000,
+                 mulai=None, sampai=None) -> int:
+    """Mengekspor transaksi ke JSON-lines secara streaming. Mengembalikan jumlah baris yang ditulis."""
+    def tulis_isi(f):
+        jumlah = 0
+        for t in anggaran.iter_transaksi(batch_size=batch_size, mulai=mulai, sampai=sampai):
+            f.write(json.dumps({"id": t.id, **t.to_dict()}, ensure_ascii=False) + "\n")
+            jumlah += 1
+        return jumlah
+    return _tulis_atomik(path_file, tulis_isi)
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) == 3 and sys.argv[1] == "--ekspor":
+        path = sys.argv[2]
+        fungsi_ekspor = ekspor_jsonl if path.endswith((".jsonl", ".ndjson")) else ekspor_csv
+        print(f"{fungsi_ekspor(AnggaranHarian(), path)} transaksi diekspor ke {path}.")
+        sys.exit(0)
+    if len(sys.argv) != 2:
+        print("Pemakaian: python impor_ekspor.py <file.csv|file.jsonl>")
+        print("           python impor_ekspor.py --ekspor <file.csv|file.jsonl>"); sys.exit(1)
+    path = sys.argv[1]
+    anggaran = AnggaranHarian()
+    fungsi_impor = impor_jsonl if path.endswith((".jsonl", ".ndjson")) else impor_csv
+    id_baru, ditolak = fungsi_impor(anggaran, path)
+    print(f"{len(id_baru)} transaksi diimpor, {len(ditolak)} baris ditolak.")
+    for nomor, data, alasan in ditolak[:20]:
+        print(f"  -> Baris {nomor}: {alasan} ({data})")
@@ -0,0 +1,212 @@
+# instrumentasi.py
+import bisect
+import collections
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from konfigurasi import (INSTRUMENTASI_AKTIF, AMBANG_KUERI_LAMBAT_MS,
+                         LOG_KUERI_LAMBAT, EXPLAIN_KUERI_LAMBAT)
+
+# Batas atas tiap ember histogram (ms); ember terakhir menampung sisanya
+EMBER_HISTOGRAM_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+SAMPEL_PERSENTIL = 512 # Durasi terakhir per sidik yang disimpan untuk p50/p99
+
+# Modul infrastruktur yang dilewati saat mencari pemanggil sebenarnya
+_MODUL_INFRA = ("database.py", "instrumentasi.py", "cache_kueri.py", "contextlib.py",
+                "anggaran_async.py", "thread.py", "threading.py", "functools.py")
+
+_halaman_aktif = contextvars.ContextVar("halaman_aktif", default=None)
+
+def atur_halaman(nama: str | None):
+    """Menandai halaman/fitur yang sedang berjalan; ikut dicatat untuk setiap query berikutnya."""
+    _halaman_aktif.set(nama)
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_ANGKA = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_DAFTAR = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_SPASI = re.compile(r"\s+")
+
+@functools.lru_cache(maxsize=1024)
+def sidik_sql(query: str) -> str:
+    """Bentuk kanonik query: literal jadi ?, daftar IN (?, ?, ...) diringkas, spasi dirapikan."""
+    sidik = _RE_STRING.sub("?", query)
+    sidik = _RE_ANGKA.sub("?", sidik)
+    sidik = _RE_DAFTAR.sub("(?+)", sidik)
+    return _RE_SPASI.sub(" ", sidik).strip()
+
+def _cari_pemanggil(maks_frame: int = 3) -> str:
+    """Rantai pemanggil di luar modul infrastruktur, misal 'manajer_anggaran.py:42 hitung_total < main_app.py:210 halaman_ringkasan'."""
+    rantai = []
+    frame = sys._getframe(1)
+    while frame is not None and len(rantai) < maks_frame:
+        nama_file = os.path.basename(frame.f_code.co_filename)
+        if nama_file not in _MODUL_INFRA:
+            rantai.append(f"{nama_file}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return " < ".join(rantai) or "?"
+
+class _StatistikKueri:
+    __slots__ = ("sidik", "jumlah", "total_ms", "maks_ms", "baris", "error", "ember", "sampel",
+                 "pemanggil", "halaman", "terakhir")
+
+    def __init__(self, sidik: str):
+        self.sidik = sidik
+        self.jumlah = 0; self.total_ms = 0.0; self.maks_ms = 0.0; self.baris = 0; self.error = 0
+        self.ember = [0] * (len(EMBER_HISTOGRAM_MS) + 1)
+        self.sampel = collections.deque(maxlen=SAMPEL_PERSENTIL)
+        self.pemanggil = collections.Counter()
+        self.halaman = collections.Counter()
+        self.terakhir = None
+
+    def tambah(self, durasi_ms: float, baris: int, error: bool, pemanggil: str, halaman: str | None):
+        self.jumlah += 1; self.total_ms += durasi_ms; self.baris += max(0, baris)
+        self.maks_ms = max(self.maks_ms, durasi_ms)
+        if error: self.error += 1
+        self.ember[bisect.bisect_left(EMBER_HISTOGRAM_MS, durasi_ms)] += 1
+        self.sampel.append(durasi_ms)
+        self.pemanggil[pemanggil] += 1
+        if halaman: self.halaman[halaman] += 1
+        self.terakhir = time.time()
+
+    def ringkasan(self) -> dict:
+        urut = sorted(self.sampel)
+        def persentil(p): return round(urut[min(len(urut) - 1, int(p * len(urut)))], 3) if urut else 0.0
+        label_ember = [f"<={b}ms" for b in EMBER_HISTOGRAM_MS] + [f">{EMBER_HISTOGRAM_MS[-1]}ms"]
+        return {"sidik": self.sidik, "jumlah": self.jumlah, "total_ms": round(self.total_ms, 3),
+                "rata2_ms": round(self.total_ms / self.jumlah, 3) if self.jumlah else 0.0,
+                "p50_ms": persentil(0.50), "p99_ms": persentil(0.99), "maks_ms": round(self.maks_ms, 3),
+                "baris": self.baris, "error": self.error,
+                "histogram": {l: n for l, n in zip(label_ember, self.ember) if n},
+                "pemanggil_teratas": self.pemanggil.most_common(3),
+                "halaman": dict(self.halaman),
+                "terakhir": datetime.datetime.fromtimestamp(self.terakhir).isoformat(timespec="seconds")
+                            if self.terakhir else None}
+
+class Instrumentasi:
+    """Pengumpul statistik query: durasi, jumlah baris, sidik SQL, pemanggil dan halaman.
+
+    Statistik disimpan di memori per sidik SQL (query yang sama dengan literal
+    berbeda dijadikan satu). Query di atas ambang_ms ditulis sebagai satu baris
+    JSON ke log kueri lambat, opsional dengan EXPLAIN QUERY PLAN-nya.
+    """
+    def __init__(self, aktif: bool = INSTRUMENTASI_AKTIF, ambang_ms: float = AMBANG_KUERI_LAMBAT_MS,
+                 path_log: str | None = LOG_KUERI_LAMBAT, explain: bool = EXPLAIN_KUERI_LAMBAT):
+        self.aktif = aktif
+        self.ambang_ms = ambang_ms
+        self.path_log = path_log
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._lock_log = threading.Lock()
+        self._statistik = {}
+        self._mulai = time.time()
+        self._jumlah_lambat = 0
+
+    def catat(self, query: str, params=None, durasi_detik: float = 0.0, baris: int = 0,
+              error: Exception | None = None, conn: sqlite3.Connection | None = None):
+        """Mencatat satu eksekusi query (dipanggil oleh database.py setelah query selesai)."""
+        if not self.aktif: return
+        durasi_ms = durasi_detik * 1000
+        sidik = sidik_sql(query)
+        pemanggil = _cari_pemanggil()
+        halaman = _halaman_aktif.get()
+        with self._lock:
+            stat = self._statistik.get(sidik)
+            if stat is None:
+                stat = self._statistik[sidik] = _StatistikKueri(sidik)
+            stat.tambah(durasi_ms, baris, error is not None, pemanggil, halaman)
+        if durasi_ms >= self.ambang_ms:
+            self._tulis_log_lambat(query, params, durasi_ms, baris, error, pemanggil, halaman, conn)
+
+    @contextlib.contextmanager
+    def ukur(self, query: str, params=None, conn: sqlite3.Connection | None = None):
+        """Context manager pengukur durasi. Pemanggil mengisi catatan['baris'] dan catatan['error']."""
+        catatan = {"baris": 0, "error": None}
+        mulai = time.perf_counter()
+        try:
+            yield catatan
+        except Exception as e:
+            catatan["error"] = e; raise
+        finally:
+            self.catat(query, params, time.perf_counter() - mulai, catatan["baris"], catatan["error"], conn)
+
+    def _rencana_kueri(self, query: str, params, conn: sqlite3.Connection | None) -> list[str] | None:
+        if not (self.explain and conn is not None and query.lstrip().upper().startswith(("SELECT", "WITH"))):
+            return None
+        try:
+            baris = conn.execute(f"EXPLAIN QUERY PLAN {query}", params or ()).fetchall()
+            return [str(b[3]) for b in baris]
+        except sqlite3.Error as e:
+            return [f"EXPLAIN gagal: {e}"]
+
+    def _tulis_log_lambat(self, query, params, durasi_ms, baris, error, pemanggil, halaman, conn):
+        with self._lock:
+            self._jumlah_lambat += 1
+        if not self.path_log: return
+        entri = {"waktu": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                 "durasi_ms": round(durasi_ms, 3), "baris": baris, "sidik": sidik_sql(query),
+                 "params": repr(params)[:200] if params is not None else None,
+                 "pemanggil": pemanggil, "halaman": halaman,
+                 "error": f"{type(error).__name__}: {error}" if error else None,
+                 "rencana": self._rencana_kueri(query, params, conn)}
+        try:
+            with self._lock_log, open(self.path_log, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entri, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"ERROR [instrumentasi.py] Gagal menulis log kueri lambat: {e}")
+
+    def snapshot_statistik(self, urut: str = "total_ms", batas: int | None = None) -> dict:
+        """Salinan statistik saat ini: ringkasan global + daftar per sidik, diurutkan menurun."""
+        with self._lock:
+            daftar = [s.ringkasan() for s in self._statistik.values()]
+            jumlah_lambat = self._jumlah_lambat
+        daftar.sort(key=lambda d: d.get(urut, 0), reverse=True)
+        return {"sejak": datetime.datetime.fromtimestamp(self._mulai).isoformat(timespec="seconds"),
+                "total_kueri": sum(d["jumlah"] for d in daftar),
+                "total_ms": round(sum(d["total_ms"] for d in daftar), 3),
+                "total_error": sum(d["error"] for d in daftar),
+                "kueri_lambat": jumlah_lambat, "ambang_lambat_ms": self.ambang_ms,
+                "kueri": daftar[:batas] if batas else daftar}
+
+    def baca_log_lambat(self, batas: int = 50) -> list[dict]:
+        """Entri terakhir log kueri lambat (terbaru dulu)."""
+        if not self.path_log or not os.path.exists(self.path_log): return []
+        try:
+            with open(self.path_log, encoding="utf-8") as f:
+                baris = collections.deque(f, maxlen=batas)
+        except OSError as e:
+            print(f"ERROR [instrumentasi.py] Gagal membaca log kueri lambat: {e}"); return []
+        hasil = []
+        for b in reversed(baris):
+            try: hasil.append(json.loads(b))
+            except ValueError: continue
+        return hasil
+
+    def reset(self):
+        with self._lock:
+            self._statistik.clear(); self._jumlah_lambat = 0; self._mulai = time.time()
+
+# Instance global yang dipakai database.py
+_instrumentasi = Instrumentasi()
+
+def catat(query, params=None, durasi_detik=0.0, baris=0, error=None, conn=None):
+    _instrumentasi.catat(query, params, durasi_detik, baris, error, conn)
+
+def ukur_kueri(query, params=None, conn=None):
+    return _instrumentasi.ukur(query, params, conn)
+
+def snapshot_statistik(urut: str = "total_ms", batas: int | None = None) -> dict:
+    return _instrumentasi.snapshot_statistik(urut, batas)
+
+def baca_log_lambat(batas: int = 50) -> list[dict]:
+    return _instrumentasi.baca_log_lambat(batas)
+
+def reset_statistik():
+    _instrumentasi.reset()
@@ -6,4 +6,53 @@ NAMA_DB = 'pengeluaran_harian.db'
 DB_PATH = os.path.join(BASE_DIR, NAMA_DB)
 KATEGORI_PENGELUARAN = ["Makanan", "Transportasi", "Hiburan", "Tagihan", 
                         "Belanja", "Kesehatan", "Pendidikan", "Lainnya"]
-KATEGORI_DEFAULT = "Lainnya"
\ No newline at end of file
+KATEGORI_DEFAULT = "Lainnya"
+
+# Pool koneksi database (lihat database.PoolKoneksi)
+POOL_KONEKSI_SESI = 8       # Koneksi untuk thread sesi Streamlit/skrip (total pool lihat POOL_MAKS_KONEKSI)
+POOL_TIMEOUT_DETIK = 10     # Lama menunggu slot koneksi kosong sebelum menyerah
+SQLITE_CACHED_STATEMENTS = 256  # Statement terkompilasi yang disimpan per koneksi (default sqlite3: 128)
+
+# Profil penyimpanan SQLite, diterapkan sekali per koneksi baru (lihat database.terapkan_profil_penyimpanan)
+PROFIL_PENYIMPANAN = {
+    "journal_mode": "WAL",      # Pembaca tidak diblokir oleh penulis
+    "synchronous": "NORMAL",    # Aman untuk WAL, fsync jauh lebih jarang
+    "mmap_size": 268435456,     # 256 MB memory-mapped I/O
+    "cache_size": -65536,       # Nilai negatif = KiB, jadi 64 MB page cache per koneksi
+    "temp_store": "MEMORY",     # Tabel/indeks sementara (ORDER BY, GROUP BY) di RAM
+    "busy_timeout": 10000,      # ms, sama dengan timeout=10 di sqlite3.connect
+}
+
+# Cache hasil query di AnggaranHarian (lihat cache_kueri.CacheKueri)
+CACHE_MAKS_ENTRI = 512      # Entri paling lama tidak dipakai dibuang (LRU) jika penuh
+CACHE_TTL_DETIK = 300       # Batas umur entri, untuk perubahan dari luar proses ini
+
+# Akses database async (lihat anggaran_async.AsyncAnggaranHarian)
+ASYNC_MAKS_PEKERJA = 4      # Query paralel maksimum; tiap pekerja memegang satu koneksi pool
+
+# Mode tulis-belakang: INSERT dikirim ke satu thread penulis yang commit per grup (lihat penulis_tunggal.py)
+MODE_TULIS_BELAKANG = False
+GROUP_COMMIT_MAKS_BARIS = 200   # Commit setelah sekian baris terkumpul...
+GROUP_COMMIT_INTERVAL_MS = 20   # ...atau setelah sekian milidetik sejak baris pertama grup
+
+# Batas koneksi per pool. Pekerja async dan thread penulis memegang koneksinya selama hidup,
+# jadi masing-masing diberi slot sendiri agar sesi tetap punya POOL_KONEKSI_SESI koneksi.
+POOL_MAKS_KONEKSI = POOL_KONEKSI_SESI + ASYNC_MAKS_PEKERJA + 1
+
+# Instrumentasi query database (lihat instrumentasi.py)
+INSTRUMENTASI_AKTIF = True
+AMBANG_KUERI_LAMBAT_MS = 250    # Query yang lebih lama dari ini ditulis ke log kueri lambat
+LOG_KUERI_LAMBAT = os.path.join(BASE_DIR, 'kueri_lambat.log')
+EXPLAIN_KUERI_LAMBAT = True     # Sertakan EXPLAIN QUERY PLAN untuk SELECT yang lambat
+
+# Snapshot Parquet untuk analitik (lihat snapshot_parquet.py, butuh paket pyarrow)
+SNAPSHOT_DIR = os.path.join(BASE_DIR, 'snapshot_transaksi')
+SNAPSHOT_UKURAN_BATCH = 100000  # Baris per file Parquet yang ditulis dalam satu kali ekspor
+
+# Multi-tenant: satu file SQLite per pengguna, dipilih lewat fungsi routing (lihat database.path_tenant)
+MODE_MULTI_TENANT = False
+SHARD_DIR = os.path.join(BASE_DIR, 'shard')
+POOL_MAKS_SHARD = 64    # Pool shard yang koneksinya boleh terbuka bersamaan; yang paling lama tidak dipakai ditutup
+
+# Batas anggaran (lihat AnggaranHarian.status_anggaran)
+AMBANG_PERINGATAN_ANGGARAN = 0.8    # Peringatan saat pemakaian mencapai 80% batas
@@ -160,30 +160,19 @@ if __name__ == "__main__":
 
 # main_app.py (diperbarui)
 import streamlit as st
+import asyncio
 import datetime
 import pandas as pd
-import locale
-
-# --- Pengaturan Locale (Opsional, untuk format mata uang) ---
-try:
-    locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
-except locale.Error:
-    try:
-        locale.setlocale(locale.LC_ALL, 'Indonesian_Indonesia.1252')
-    except:
-        print("Locale id_ID/Indonesian tidak tersedia.")
-
-def format_rp(angka):
-    try:
-        return locale.currency(angka or 0, grouping=True, symbol='Rp ')[:-3]
-    except:
-        return f"Rp {angka or 0:.0f}".replace(",", ".") # fallback jika locale gagal
 
 # --- Import Modul Aplikasi ---
 try:
+    from format_mata_uang import format_rp, format_rp_kolom # Locale diatur sekali di modul ini
     from model import Transaksi
-    from manajer_anggaran import AnggaranHarian
-    from konfigurasi import KATEGORI_PENGELUARAN # Ambil list kategori
+    from manajer_anggaran import AnggaranHarian, rentang_periode, PERIODE_ANGGARAN, SEMUA_KATEGORI
+    from anggaran_async import AsyncAnggaranHarian
+    from filter_kueri import FilterTransaksi
+    import instrumentasi
+    from konfigurasi import KATEGORI_PENGELUARAN, MODE_MULTI_TENANT # Ambil list kategori
 except ImportError as e:
     st.error(f"Gagal mengimpor modul: {e}. Pastikan file .py lain ada.")
     st.stop()
@@ -191,15 +180,27 @@ except ImportError as e:
 
 # --- Inisialisasi Pengelola Anggaran (Gunakan Cache) ---
 @st.cache_resource
-def get_anggaran_manager():
-    print(">>> STREAMLIT: (Cache Resource) Menginisialisasi AnggaranHarian...")
-    return AnggaranHarian() # Ini akan memicu cek DB/Tabel di __init__
-anggaran = get_anggaran_manager()
+def get_anggaran_manager(tenant: str | None = None):
+    # Satu instance per tenant (di-cache per nilai argumen); tenant None = database utama
+    print(f">>> STREAMLIT: (Cache Resource) Menginisialisasi AnggaranHarian ({tenant or 'utama'})...")
+    return AnggaranHarian(tenant) # Ini akan memicu cek DB/Tabel di __init__
 
-# Fungsi untuk menangani perubahan pilihan tanggal di halaman ringkasan
-def handle_tanggal_pilihan_change():
-    # Hapus data cache saat pilihan tanggal berubah
-    st.cache_data.clear()
+@st.cache_resource
+def get_anggaran_async(tenant: str | None = None):
+    # Membungkus instance yang sama, jadi cache query tetap dipakai bersama
+    return AsyncAnggaranHarian(get_anggaran_manager(tenant))
+
+def tenant_sesi() -> str | None:
+    """Tenant milik sesi ini: None tanpa mode multi-tenant, selain itu nama pengguna dari sidebar."""
+    if not MODE_MULTI_TENANT:
+        return None
+    tenant = st.sidebar.text_input("Nama Pengguna", key="tenant").strip()
+    if not tenant:
+        st.info("Masukkan nama pengguna di sidebar untuk membuka catatan Anda."); st.stop()
+    return tenant
+
+# Catatan cache: hasil query di-cache oleh AnggaranHarian sendiri (cache_kueri.py) dan
+# hanya dibuang untuk tanggal/kategori yang berubah, jadi halaman tidak memanggil st.cache_data.clear().
 
 # --- Fungsi Halaman/UI ---
 def halaman_input(anggaran: AnggaranHarian):
@@ -229,39 +230,84 @@ def halaman_input(anggaran: AnggaranHarian):
                 with st.spinner("Menyimpan..."):
                     tx = Transaksi(deskripsi, float(jumlah), kategori,
                                    tanggal)
-                    if anggaran.tambah_transaksi(tx):
-                        st.success(f"OK! Simpan.", icon="✅"); st.cache_data.clear(); st.rerun()
+                    if anggaran.tambah_transaksi(tx, peringatan=st.session_state.setdefault("peringatan_anggaran", [])):
+                        st.success(f"OK! Simpan.", icon="✅"); st.rerun()
                     else:
                         st.error("Gagal simpan.", icon="❌")
 
+def reset_halaman_riwayat():
+    # Kembali ke halaman pertama (misal saat ukuran halaman berubah)
+    st.session_state.riwayat_kursor = None
+    st.session_state.riwayat_arah = "berikut"
+
 def halaman_riwayat(anggaran: AnggaranHarian):
     st.subheader("Detail Semua Transaksi")
-    if st.button("🔄 Refresh Riwayat"):
-        st.cache_data.clear()
-        st.rerun()
-
-    @st.cache_data
-    def get_df_transaksi():
-        with st.spinner("Memuat riwayat..."):
-            return anggaran.get_dataframe_transaksi()
+    if 'riwayat_kursor' not in st.session_state:
+        reset_halaman_riwayat()
+    col_ref1, col_ref2, col_ref3 = st.columns([1, 1, 1])
+    with col_ref1:
+        if st.button("🔄 Refresh Riwayat"):
+            anggaran.kosongkan_cache() # Muat ulang paksa, misal setelah impor dari luar aplikasi
+            reset_halaman_riwayat()
+            st.rerun()
+    with col_ref2:
+        ukuran_halaman = st.selectbox("Baris per halaman:", [25, 50, 100, 250], index=1,
+                                      key="riwayat_ukuran", on_change=reset_halaman_riwayat)
+    with col_ref3:
+        tampilkan_total = st.checkbox("Hitung total baris", value=False, key="riwayat_hitung_total")
+
+    col_cari1, col_cari2 = st.columns([2, 1])
+    with col_cari1:
+        kata_cari = st.text_input("🔍 Cari deskripsi", placeholder="misal: grab, kopi, listrik", key="riwayat_cari")
+    with col_cari2:
+        rentang_cari = st.date_input("Rentang tanggal pencarian", value=(), key="riwayat_cari_rentang")
+    if kata_cari.strip():
+        saring_cari = None
+        if isinstance(rentang_cari, (tuple, list)) and len(rentang_cari) == 2:
+            saring_cari = FilterTransaksi(mulai=rentang_cari[0], sampai=rentang_cari[1])
+        jumlah_hasil, total_hasil = anggaran.hitung_total_pencarian(kata_cari, saring=saring_cari)
+        st.metric(f"Total untuk \"{kata_cari.strip()}\"", format_rp(total_hasil),
+                  delta=f"{jumlah_hasil} transaksi", delta_color="off")
+        df_cari = anggaran.cari_transaksi(kata_cari, limit=100, saring=saring_cari)
+        if df_cari.empty:
+            st.info("Tidak ada transaksi yang cocok.")
+        else:
+            st.caption(f"{len(df_cari)} hasil paling relevan")
+            st.dataframe(df_cari.drop(columns=['skor']), use_container_width=True, hide_index=True)
+        st.markdown("---")
 
-    df_transaksi = get_df_transaksi()
+    with st.spinner("Memuat riwayat..."):
+        halaman = anggaran.get_halaman_transaksi(ukuran=ukuran_halaman, kursor=st.session_state.riwayat_kursor,
+                                                 arah=st.session_state.riwayat_arah, hitung_total=tampilkan_total)
+    df_transaksi = halaman["data"]
+    if df_transaksi.empty and st.session_state.riwayat_kursor is not None:
+        reset_halaman_riwayat(); st.rerun() # Kursor basi (misal data terhapus), mulai dari awal
     if df_transaksi.empty:
         st.info("Belum ada transaksi.")
     else:
         st.dataframe(df_transaksi, use_container_width=True, hide_index=True)
+        col_nav1, col_nav2, col_nav3 = st.columns([1, 2, 1])
+        with col_nav1:
+            if st.button("⬅️ Lebih Baru", disabled=not halaman["ada_sebelum"], key="riwayat_sebelum"):
+                st.session_state.riwayat_kursor = halaman["kursor_awal"]
+                st.session_state.riwayat_arah = "sebelum"; st.rerun()
+        with col_nav2:
+            if halaman["total"] is not None:
+                st.caption(f"Menampilkan {len(df_transaksi)} dari {halaman['total']} transaksi")
+        with col_nav3:
+            if st.button("Lebih Lama ➡️", disabled=not halaman["ada_berikut"], key="riwayat_berikut"):
+                st.session_state.riwayat_kursor = halaman["kursor_akhir"]
+                st.session_state.riwayat_arah = "berikut"; st.rerun()
 
         st.markdown("---")
         st.subheader("Hapus Transaksi")
         col_del1, col_del2 = st.columns([1, 2])
         with col_del1:
-            # Dapatkan ID maksimum dari dataframe untuk min_value dan max_value
-            max_id = df_transaksi['id'].max() if not df_transaksi.empty else 1
+            # Halaman hanya memuat sebagian data, jadi ID tidak dibatasi ke ID maksimum di tabel
             id_to_delete = st.number_input("ID Transaksi untuk Dihapus:",
                                            min_value=1,
-                                           max_value=int(max_id), # Pastikan max_value adalah int
                                            step=1,
-                                           value=1, # Nilai default
+                                           value=int(df_transaksi['id'].iloc[0]), # Nilai default: baris teratas
                                            key="id_delete_input")
         with col_del2:
             st.write("") # Spasi
@@ -277,7 +323,6 @@ def halaman_riwayat(anggaran: AnggaranHarian):
                     with st.spinner(f"Menghapus transaksi ID {id_to_delete}..."):
                         if anggaran.hapus_transaksi(int(id_to_delete)):
                             st.success(f"Transaksi ID {id_to_delete} berhasil dihapus.", icon="✅")
-                            st.cache_data.clear() # Bersihkan cache untuk memuat ulang data
                             st.session_state.confirm_delete = False # Reset status konfirmasi
                             st.rerun() # Muat ulang untuk memperbarui tampilan
                         else:
@@ -294,33 +339,69 @@ def halaman_ringkasan(anggaran: AnggaranHarian):
     st.subheader("Ringkasan Pengeluaran")
     col_filter1, col_filter2 = st.columns([1, 2])
     with col_filter1:
-        pilihan_periode = st.selectbox("Filter Periode:", ["Semua Waktu", "Hari Ini", "Pilih Tanggal"], key="filter_periode", on_change=lambda: st.cache_data.clear())
-        tanggal_filter = None; label_periode = " (Semua Waktu)"
-
-    if pilihan_periode == "Hari Ini":
-        tanggal_filter = datetime.date.today(); label_periode = f"({tanggal_filter.strftime('%d %b')})"
-    elif pilihan_periode == "Pilih Tanggal": # Mengubah dari "Pilih Tanggal Tertentu"
-        if 'tanggal_pilihan_state' not in st.session_state:
-            st.session_state.tanggal_pilihan_state = datetime.date.today()
-        tanggal_filter = st.date_input("Pilih Tanggal:",
-                                       value=st.session_state.tanggal_pilihan_state,
-                                       key="tanggal_pilihan",
-                                       on_change= handle_tanggal_pilihan_change) # Mengganti lambda dengan nama fungsi
-
+        pilihan_periode = st.selectbox("Filter Periode:", ["Semua Waktu", "Hari Ini", "Pilih Tanggal", "Minggu Ini",
+                                                           "Bulan Ini", "Pilih Bulan", "Pilih Tahun", "Rentang Tanggal"],
+                                       key="filter_periode")
+        mulai = sampai = None; label_periode = " (Semua Waktu)"; granularitas_tren = "bulan"
+        hari_ini = datetime.date.today()
+
+        if pilihan_periode == "Hari Ini":
+            mulai = sampai = hari_ini; label_periode = f"({hari_ini.strftime('%d %b')})"
+        elif pilihan_periode == "Pilih Tanggal": # Mengubah dari "Pilih Tanggal Tertentu"
+            if 'tanggal_pilihan_state' not in st.session_state:
+                st.session_state.tanggal_pilihan_state = datetime.date.today()
+            mulai = sampai = st.date_input("Pilih Tanggal:",
+                                           value=st.session_state.tanggal_pilihan_state,
+                                           key="tanggal_pilihan")
+            label_periode = f"({mulai.strftime('%d %b %Y')})"
+        elif pilihan_periode == "Minggu Ini":
+            mulai = hari_ini - datetime.timedelta(days=hari_ini.weekday()); sampai = mulai + datetime.timedelta(days=6)
+            label_periode = f"({mulai.strftime('%d %b')} - {sampai.strftime('%d %b')})"; granularitas_tren = "hari"
+        elif pilihan_periode in ("Bulan Ini", "Pilih Bulan"):
+            tahun, bulan = hari_ini.year, hari_ini.month
+            if pilihan_periode == "Pilih Bulan":
+                tahun = st.number_input("Tahun:", min_value=2000, max_value=2100, value=tahun, step=1, key="tahun_bulan")
+                bulan = st.selectbox("Bulan:", range(1, 13), index=bulan - 1, key="bulan_pilihan")
+            mulai, sampai = rentang_periode(int(tahun), int(bulan))
+            label_periode = f"({mulai.strftime('%b %Y')})"; granularitas_tren = "hari"
+        elif pilihan_periode == "Pilih Tahun":
+            tahun = st.number_input("Tahun:", min_value=2000, max_value=2100, value=hari_ini.year, step=1, key="tahun_pilihan")
+            mulai, sampai = rentang_periode(int(tahun)); label_periode = f"({int(tahun)})"
+        elif pilihan_periode == "Rentang Tanggal":
+            rentang = st.date_input("Dari - Sampai:", value=(hari_ini - datetime.timedelta(days=29), hari_ini), key="rentang_pilihan")
+            if len(rentang) == 2: # Saat memilih, date_input sempat hanya berisi tanggal awal
+                mulai, sampai = rentang
+            else:
+                mulai = sampai = rentang[0]
+            label_periode = f"({mulai.strftime('%d %b %Y')} - {sampai.strftime('%d %b %Y')})"
+            granularitas_tren = "hari" if (sampai - mulai).days <= 62 else "bulan"
+
+    # Total, per kategori dan tren saling bebas: jalankan bersamaan (hasil tetap ter-cache di AnggaranHarian)
+    tampilkan_tren = pilihan_periode not in ("Hari Ini", "Pilih Tanggal")
+    async def muat_ringkasan():
+        anggaran_async = get_anggaran_async(anggaran.tenant)
+        tugas = [anggaran_async.hitung_total_pengeluaran(mulai=mulai, sampai=sampai),
+                 anggaran_async.get_pengeluaran_per_kategori(mulai=mulai, sampai=sampai),
+                 anggaran_async.status_anggaran()]
+        if tampilkan_tren:
+            tugas.append(anggaran_async.get_pengeluaran_per_periode(granularitas_tren, mulai=mulai, sampai=sampai))
+        return await asyncio.gather(*tugas)
+    with st.spinner("Memuat ringkasan..."):
+        total_pengeluaran, dict_per_kategori, daftar_status, *sisa = asyncio.run(muat_ringkasan())
 
     with col_filter2:
-        @st.cache_data(ttl=300) # Cache hasil total
-        def hitung_total_cached(tgl_filter):
-            return anggaran.hitung_total_pengeluaran(tanggal=tgl_filter)
-        total_pengeluaran = hitung_total_cached(tanggal_filter)
         st.metric(label=f"Total Pengeluaran {label_periode}", value=format_rp(total_pengeluaran))
 
+    tampilkan_status_anggaran(anggaran, daftar_status)
+
+    if tampilkan_tren:
+        dict_tren = sisa[0]
+        if dict_tren:
+            st.write(f"Tren per {granularitas_tren}:")
+            st.bar_chart(pd.Series(dict_tren, name="Total"), use_container_width=True)
+
     st.divider()
     st.subheader(f"Pengeluaran Per Kategori {label_periode}")
-    @st.cache_data(ttl=300) # Cache hasil kategori
-    def get_kategori_cached(tgl_filter): return anggaran.get_pengeluaran_per_kategori(tanggal=tgl_filter)
-    with st.spinner("Memuat ringkasan kategori..."):
-        dict_per_kategori = get_kategori_cached(tanggal_filter)
 
     if not dict_per_kategori:
         st.info("Tidak ada data untuk periode ini.")
@@ -328,7 +409,7 @@ def halaman_ringkasan(anggaran: AnggaranHarian):
         try:
             data_kategori = [{"Kategori": kat, "Total": jml} for kat, jml in dict_per_kategori.items()]
             df_kategori = pd.DataFrame(data_kategori).sort_values(by="Total", ascending=False).reset_index(drop=True)
-            df_kategori['Total (Rp)'] = df_kategori['Total'].apply(format_rp)
+            df_kategori['Total (Rp)'] = format_rp_kolom(df_kategori['Total'])
 
             col_kat1, col_kat2 = st.columns(2)
             with col_kat1:
@@ -340,20 +421,103 @@ def halaman_ringkasan(anggaran: AnggaranHarian):
         except Exception as e:
             st.error(f"Gagal tampilkan ringkasan: {e}")
 
+def tampilkan_status_anggaran(anggaran: AnggaranHarian, daftar_status: list[dict]):
+    st.subheader("Status Anggaran (periode berjalan)")
+    if not daftar_status:
+        st.caption("Belum ada batas anggaran. Atur di bawah ini.")
+    ikon_status = {"aman": "🟢", "peringatan": "🟠", "terlampaui": "🔴"}
+    for status in daftar_status:
+        nama = "Semua Kategori" if status['kategori'] == SEMUA_KATEGORI else status['kategori']
+        st.progress(min(status['persen'], 1.0),
+                    text=f"{ikon_status[status['status']]} {nama} ({status['periode']}): "
+                         f"{format_rp(status['terpakai'])} dari {format_rp(status['batas'])} "
+                         f"({status['persen']:.0%}, sisa {format_rp(status['sisa'])})")
+
+    with st.expander("⚙️ Atur Batas Anggaran"):
+        with st.form("form_batas_anggaran", clear_on_submit=True):
+            col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+            with col1:
+                kategori = st.selectbox("Kategori:", ["Semua Kategori"] + KATEGORI_PENGELUARAN, key="batas_kategori")
+            with col2:
+                periode = st.selectbox("Periode:", PERIODE_ANGGARAN, index=2, key="batas_periode")
+            with col3:
+                batas = st.number_input("Batas (Rp):", min_value=0.0, step=50000.0, format="%.0f", key="batas_nilai")
+            with col4:
+                ambang = st.slider("Peringatan di:", 0.5, 1.0, 0.8, 0.05, format="%.2f", key="batas_ambang")
+            if st.form_submit_button("💾 Simpan Batas"):
+                kategori_db = None if kategori == "Semua Kategori" else kategori
+                if batas <= 0: st.warning("Batas harus lebih dari 0.", icon="⚠️")
+                elif anggaran.atur_batas_anggaran(kategori_db, periode, batas, ambang): st.rerun()
+                else: st.error("Gagal menyimpan batas anggaran.", icon="❌")
+        for b in anggaran.get_batas_anggaran():
+            nama = "Semua Kategori" if b['kategori'] == SEMUA_KATEGORI else b['kategori']
+            col_b1, col_b2 = st.columns([4, 1])
+            col_b1.write(f"{nama} · {b['periode']} · {format_rp(b['batas'])} · peringatan {b['ambang']:.0%}")
+            if col_b2.button("🗑️ Hapus", key=f"hapus_batas_{b['kategori']}_{b['periode']}"):
+                anggaran.hapus_batas_anggaran(b['kategori'], b['periode']); st.rerun()
+    st.divider()
+
 # --- Fungsi Utama Aplikasi Streamlit ---
+def halaman_admin(anggaran: AnggaranHarian):
+    st.header("🛠️ Admin: Performa Query")
+    snapshot = instrumentasi.snapshot_statistik()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Query", f"{snapshot['total_kueri']:,}")
+    col2.metric("Total Waktu", f"{snapshot['total_ms'] / 1000:.2f} s")
+    col3.metric(f"Lambat (>{snapshot['ambang_lambat_ms']} ms)", snapshot['kueri_lambat'])
+    col4.metric("Error", snapshot['total_error'])
+    st.caption(f"Statistik sejak {snapshot['sejak']} (di memori proses ini).")
+
+    if snapshot['kueri']:
+        df_kueri = pd.DataFrame([{
+            "SQL": k['sidik'], "Jumlah": k['jumlah'], "Total (ms)": k['total_ms'],
+            "Rata-rata (ms)": k['rata2_ms'], "p50 (ms)": k['p50_ms'], "p99 (ms)": k['p99_ms'],
+            "Maks (ms)": k['maks_ms'], "Baris": k['baris'], "Error": k['error'],
+            "Halaman": ", ".join(f"{h} ({n})" for h, n in k['halaman'].items()),
+            "Pemanggil Teratas": k['pemanggil_teratas'][0][0] if k['pemanggil_teratas'] else "",
+        } for k in snapshot['kueri']])
+        st.dataframe(df_kueri, use_container_width=True, hide_index=True)
+        sidik_pilihan = st.selectbox("Histogram durasi untuk query:", [k['sidik'] for k in snapshot['kueri']])
+        detail = next(k for k in snapshot['kueri'] if k['sidik'] == sidik_pilihan)
+        st.bar_chart(pd.Series(detail['histogram'], name="Jumlah"))
+    else:
+        st.info("Belum ada query yang tercatat.")
+
+    with st.expander("Log Query Lambat (terbaru)"):
+        entri_lambat = instrumentasi.baca_log_lambat(batas=20)
+        if not entri_lambat: st.write("Belum ada query lambat.")
+        for entri in entri_lambat:
+            st.markdown(f"**{entri['durasi_ms']} ms** · {entri['waktu']} · {entri.get('halaman') or '-'} · `{entri['pemanggil']}`")
+            st.code(entri['sidik'] + ("\n-- " + "\n-- ".join(entri['rencana']) if entri.get('rencana') else ""), language="sql")
+
+    with st.expander("Cache Query & Database"):
+        st.json({"cache": anggaran.statistik_cache(), "database": anggaran.diagnostik_database()})
+
+    if st.button("Reset Statistik Query"):
+        instrumentasi.reset_statistik(); st.rerun()
+
 def main():
     st.sidebar.title("💰 Catatan Pengeluaran")
-    menu_pilihan = st.sidebar.radio("Pilih Menu:", ["Tambah", "Riwayat", "Ringkasan"], key="menu_utama")
+    menu_pilihan = st.sidebar.radio("Pilih Menu:", ["Tambah", "Riwayat", "Ringkasan", "Admin"], key="menu_utama")
     st.sidebar.markdown("---")
     st.sidebar.info("Jobsheet - Aplikasi Keuangan")
 
-    manajer_anggaran = get_anggaran_manager()
+    instrumentasi.atur_halaman(menu_pilihan) # Setiap query di rerun ini tercatat dengan nama halamannya
+    manajer_anggaran = get_anggaran_manager(tenant_sesi())
+    # Lintasan ambang dari tulisan sesi ini saja (disimpan per sesi, bukan di instance bersama)
+    for peringatan in st.session_state.pop("peringatan_anggaran", []):
+        st.toast(peringatan['pesan'], icon="🔴" if peringatan['status'] == "terlampaui" else "🟠")
+    statistik_cache = manajer_anggaran.statistik_cache()
+    st.sidebar.caption(f"Cache query: {statistik_cache['hit_rate']:.0%} hit "
+                       f"({statistik_cache['hit']} hit / {statistik_cache['miss']} miss, {statistik_cache['entri']} entri)")
     if menu_pilihan == "Tambah":
         halaman_input(manajer_anggaran)
     elif menu_pilihan == "Riwayat":
         halaman_riwayat(manajer_anggaran)
     elif menu_pilihan == "Ringkasan":
         halaman_ringkasan(manajer_anggaran)
+    elif menu_pilihan == "Admin":
+        halaman_admin(manajer_anggaran)
 
     st.markdown("---"); st.caption("Pengembangan Aplikasi Berbasis OOP")
 
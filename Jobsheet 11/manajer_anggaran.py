@@ -80,90 +80,512 @@ class AnggaranHarian:
 
 # manajer_anggaran.py (diperbarui)
 import datetime
+import re
+import dataclasses
+from concurrent.futures import Future
 import pandas as pd
-from model import Transaksi
+from model import Transaksi, TransaksiBatch
+from format_mata_uang import format_rp, format_rp_kolom
 import database # Impor modul database kita
+from cache_kueri import CacheKueri, di_cache
+from filter_kueri import FilterTransaksi, bangun_kueri
+from migrasi import KATEGORI_SQL # Kategori NULL/'' -> 'Lainnya', sama dengan isi tabel agregat
+from konfigurasi import MODE_TULIS_BELAKANG, AMBANG_PERINGATAN_ANGGARAN
+from penulis_tunggal import PenulisTunggal
+
+def rentang_periode(tahun: int, bulan: int | None = None) -> tuple[datetime.date, datetime.date]:
+    """Mengembalikan (mulai, sampai) inklusif untuk satu tahun atau satu bulan."""
+    if bulan is None:
+        return datetime.date(tahun, 1, 1), datetime.date(tahun, 12, 31)
+    awal_bulan_depan = datetime.date(tahun + bulan // 12, bulan % 12 + 1, 1)
+    return datetime.date(tahun, bulan, 1), awal_bulan_depan - datetime.timedelta(days=1)
+
+def _gabung_filter(saring: FilterTransaksi | None, tanggal: datetime.date | None = None,
+                   mulai: datetime.date | None = None, sampai: datetime.date | None = None) -> FilterTransaksi:
+    """Filter akhir sebuah metode: argumen tanggal/mulai/sampai menimpa tanggal di `saring`."""
+    return (saring or FilterTransaksi()).dengan_tanggal(tanggal, mulai, sampai)
+
+
+def _sumber_agregat(saring: FilterTransaksi) -> tuple[str, FilterTransaksi, tuple, tuple]:
+    """Tabel agregat termurah untuk filter tanggal/kategori: (tabel, filter sisa, kondisi, params).
+
+    Rentang yang tepat di batas bulan (satu tahun/bulan penuh, atau tanpa batas tanggal)
+    dibaca dari ringkasan_bulanan, O(bulan x kategori); selain itu dari ringkasan_harian.
+    """
+    awal_bulan = saring.mulai is None or saring.mulai.day == 1
+    akhir_bulan = saring.sampai is None or (saring.sampai + datetime.timedelta(days=1)).day == 1
+    if saring.tanggal is not None or not (awal_bulan and akhir_bulan):
+        return "ringkasan_harian", saring, (), ()
+    kondisi, params = [], []
+    if saring.mulai: kondisi.append("bulan >= ?"); params.append(saring.mulai.strftime("%Y-%m"))
+    if saring.sampai: kondisi.append("bulan <= ?"); params.append(saring.sampai.strftime("%Y-%m"))
+    return "ringkasan_bulanan", dataclasses.replace(saring, mulai=None, sampai=None), tuple(kondisi), tuple(params)
+
+def kueri_fts(teks: str) -> str | None:
+    """Mengubah input bebas pengguna menjadi query MATCH FTS5 yang aman.
+
+    Setiap kata dijadikan frasa berkutip dengan pencarian awalan ("gra"* cocok
+    dengan "Grab"), digabung AND. Operator/tanda baca FTS5 dari pengguna dibuang
+    sehingga input apa pun tidak bisa memicu syntax error. None jika tidak ada kata.
+    """
+    kata = re.findall(r"\w+", teks or "")
+    return " ".join(f'"{k}"*' for k in kata) or None
+
+PERIODE_ANGGARAN = ("harian", "mingguan", "bulanan", "tahunan")
+SEMUA_KATEGORI = "*" # Kategori batas anggaran untuk total semua kategori
+
+def rentang_periode_anggaran(periode: str, tanggal: datetime.date) -> tuple[datetime.date, datetime.date]:
+    """Rentang (mulai, sampai) periode anggaran yang memuat tanggal; minggu dimulai Senin."""
+    if periode == "harian":
+        return tanggal, tanggal
+    if periode == "mingguan":
+        mulai = tanggal - datetime.timedelta(days=tanggal.weekday())
+        return mulai, mulai + datetime.timedelta(days=6)
+    if periode == "bulanan":
+        return rentang_periode(tanggal.year, tanggal.month)
+    if periode == "tahunan":
+        return rentang_periode(tanggal.year)
+    raise ValueError(f"Periode anggaran '{periode}' tidak dikenal, pilih dari {list(PERIODE_ANGGARAN)}")
+
+# Pemakaian satu batas = satu range scan kecil di agregat (<= 7 hari atau <= 12 bulan x kategori),
+# tidak pernah SUM atas tabel transaksi. Kunci: (periode, khusus satu kategori?)
+_SQL_PEMAKAIAN = {
+    ("harian", False): "SELECT SUM(total) FROM ringkasan_harian WHERE tanggal >= ? AND tanggal <= ?",
+    ("harian", True): "SELECT SUM(total) FROM ringkasan_harian WHERE tanggal >= ? AND tanggal <= ? AND kategori = ?",
+    ("bulanan", False): "SELECT SUM(total) FROM ringkasan_bulanan WHERE bulan >= ? AND bulan <= ?",
+    ("bulanan", True): "SELECT SUM(total) FROM ringkasan_bulanan WHERE bulan >= ? AND bulan <= ? AND kategori = ?",
+}
+
+# Ekspresi pengelompokan periode di SQL (tanggal disimpan sebagai teks 'YYYY-MM-DD')
+GRANULARITAS_PERIODE = {"hari": "tanggal", "bulan": "substr(tanggal, 1, 7)", "tahun": "substr(tanggal, 1, 4)"}
 
 class AnggaranHarian:
     """Mengelola logika bisnis pengeluaran harian (Repository Pattern)"""
-    _db_setup_done = False # Flag untuk memastikan setup DB hanya dicek sekali per sesi
+    _db_siap = set() # Path file database yang skemanya sudah dicek (sekali per file per proses)
 
-    def __init__(self):
-        if not AnggaranHarian._db_setup_done:
-            print("[AnggaranHarian] Melakukan pengecekan/setup database awal...")
-            if database.setup_database_initial(): # Panggil fungsi setup dari database.py
-                AnggaranHarian._db_setup_done = True
+    def __init__(self, tenant: str | None = None, mode_tulis_belakang: bool = MODE_TULIS_BELAKANG):
+        """tenant=None memakai database utama; selain itu file milik tenant (database.pool_tenant)."""
+        self.tenant = tenant
+        self._pool = database.pool_tenant(tenant) if tenant is not None else None
+        self._cache = CacheKueri() # Dipakai bersama semua sesi jika instance di-cache (st.cache_resource)
+        self._penulis = None
+        self._batas = None # Daftar batas anggaran (dimuat saat pertama dibutuhkan)
+        db_path = (self._pool or database._pool).db_path
+        if db_path not in AnggaranHarian._db_siap:
+            print(f"[AnggaranHarian] Melakukan pengecekan/setup database awal ({tenant or 'utama'})...")
+            if database.setup_database_initial(self._pool): # Panggil fungsi setup dari database.py
+                AnggaranHarian._db_siap.add(db_path)
                 print("[AnggaranHarian] Database siap.")
             else:
                 print("[AnggaranHarian] KRITIKAL: Setup database awal GAGAL!")
+        if mode_tulis_belakang: # Dibuat setelah setup agar tabel sudah ada saat penulis mulai
+            self._penulis = PenulisTunggal(pool=self._pool)
 
-    def tambah_transaksi(self, transaksi: Transaksi) -> bool:
+    def tambah_transaksi(self, transaksi: Transaksi, peringatan: list | None = None) -> bool:
+        """Menyimpan satu transaksi. Jika `peringatan` (list milik pemanggil) diberikan, batas
+        anggaran yang naik tingkat karena transaksi ini ditambahkan ke list tersebut."""
         if not isinstance(transaksi, Transaksi) or transaksi.jumlah <= 0:
             return False
+        if self._penulis is not None: # Mode tulis-belakang: tunggu grup commit milik baris ini
+            future = self.tambah_transaksi_tertunda(transaksi, peringatan)
+            try:
+                try:
+                    future.result(timeout=30); return True
+                except TimeoutError:
+                    if future.cancel(): # Masih di antrean: batalkan agar tidak tersimpan belakangan
+                        print("ERROR [AnggaranHarian] Simpan transaksi timeout, dibatalkan dari antrean."); return False
+                    future.result(); return True # Grupnya sedang ditulis: tunggu hasil akhirnya
+            except Exception as e:
+                print(f"ERROR [AnggaranHarian] Simpan transaksi gagal: {e}"); return False
         sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
         params = (transaksi.deskripsi, transaksi.jumlah,
                   transaksi.kategori, transaksi.tanggal.strftime("%Y-%m-%d"))
-        last_id = database.execute_query(sql, params)
+        last_id = database.execute_query(sql, params, pool=self._pool)
         if last_id is not None:
-            transaksi.id = last_id; return True
+            transaksi.id = last_id
+            self._cache.invalidasi(transaksi.tanggal, kategori=transaksi.kategori)
+            if peringatan is not None: peringatan.extend(self._cek_ambang_anggaran([transaksi]))
+            return True
         return False
 
+    def tambah_transaksi_tertunda(self, transaksi: Transaksi, peringatan: list | None = None) -> Future:
+        """Mengirim transaksi ke penulis tunggal dan langsung mengembalikan Future berisi id baru.
+
+        Tanpa mode tulis-belakang, transaksi disimpan langsung dan Future sudah selesai.
+        Saat Future selesai, transaksi.id sudah terisi dan cache untuk tanggal/kategorinya
+        sudah dibuang (dikerjakan thread penulis sebelum Future diselesaikan).
+        """
+        if self._penulis is None:
+            future = Future()
+            if self.tambah_transaksi(transaksi, peringatan): future.set_result(transaksi.id)
+            else: future.set_exception(ValueError("Transaksi tidak valid atau gagal disimpan"))
+            return future
+        if not isinstance(transaksi, Transaksi) or transaksi.jumlah <= 0:
+            future = Future(); future.set_exception(ValueError("Transaksi tidak valid")); return future
+        sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
+        params = (transaksi.deskripsi, transaksi.jumlah,
+                  transaksi.kategori, transaksi.tanggal.strftime("%Y-%m-%d"))
+        def setelah_commit(id_baru: int):
+            transaksi.id = id_baru
+            self._cache.invalidasi(transaksi.tanggal, kategori=transaksi.kategori)
+            if peringatan is not None: peringatan.extend(self._cek_ambang_anggaran([transaksi]))
+        return self._penulis.kirim(sql, params, setelah_commit)
+
+    def tutup(self):
+        """Menyimpan sisa antrean tulis-belakang (jika aktif) dan menghentikan thread penulisnya."""
+        if self._penulis is not None:
+            self._penulis.tutup()
+
+    def tambah_transaksi_batch(self, daftar_transaksi, ukuran_chunk: int = 1000,
+                               peringatan: list | None = None) -> tuple[list[int], list[tuple]]:
+        """Menyimpan banyak transaksi sekaligus (executemany per chunk, satu commit).
+
+        daftar_transaksi boleh berisi objek Transaksi atau dict (kolom seperti
+        Transaksi.to_dict) dan dikonsumsi secara streaming. Dict divalidasi lewat
+        Transaksi.dari_dict. Mengembalikan (daftar id baru, daftar baris ditolak)
+        dengan baris ditolak berbentuk (nomor_urut, data_asli, alasan).
+        Jika penyimpanan gagal, tidak ada yang tersimpan dan daftar id kosong.
+        Lintasan ambang anggaran ditambahkan ke `peringatan` jika diberikan (lihat tambah_transaksi).
+        """
+        ditolak = []; diterima = []
+        ukuran_chunk = max(1, int(ukuran_chunk))
+
+        def chunk_params():
+            chunk = []
+            for nomor, data in enumerate(daftar_transaksi, start=1):
+                try:
+                    if isinstance(data, Transaksi):
+                        if data.jumlah <= 0: raise ValueError("jumlah harus positif")
+                        transaksi = data
+                    else:
+                        transaksi = Transaksi.dari_dict(data)
+                except (ValueError, TypeError) as e:
+                    ditolak.append((nomor, data, str(e))); continue
+                diterima.append(transaksi)
+                chunk.append((transaksi.deskripsi, transaksi.jumlah,
+                              transaksi.kategori, transaksi.tanggal.strftime("%Y-%m-%d")))
+                if len(chunk) >= ukuran_chunk:
+                    yield chunk; chunk = []
+            if chunk: yield chunk
+
+        sql = "INSERT INTO transaksi (deskripsi, jumlah, kategori, tanggal) VALUES (?, ?, ?, ?)"
+        id_baru = database.execute_many(sql, chunk_params(), pool=self._pool)
+        if id_baru is None:
+            return [], ditolak
+        for transaksi, id_transaksi in zip(diterima, id_baru):
+            transaksi.id = id_transaksi
+        if diterima:
+            self._cache.invalidasi(min(t.tanggal for t in diterima), max(t.tanggal for t in diterima),
+                                   kategori={t.kategori for t in diterima})
+            if peringatan is not None: peringatan.extend(self._cek_ambang_anggaran(diterima))
+        return id_baru, ditolak
+
+    # --- Batas anggaran ---
+    def get_batas_anggaran(self) -> list[dict]:
+        """Semua batas anggaran: dict kategori ('*' = semua), periode, batas, ambang."""
+        if self._batas is None:
+            rows = database.fetch_query("SELECT kategori, periode, batas, ambang FROM batas_anggaran "
+                                        "ORDER BY kategori, periode", fetch_all=True, pool=self._pool)
+            self._batas = [dict(row) for row in rows] if rows else []
+        return self._batas
+
+    def atur_batas_anggaran(self, kategori: str | None, periode: str, batas: float,
+                            ambang: float = AMBANG_PERINGATAN_ANGGARAN) -> bool:
+        """Menambah/mengubah batas anggaran. kategori None atau '*' berarti total semua kategori."""
+        if periode not in PERIODE_ANGGARAN or batas <= 0 or not 0 < ambang <= 1:
+            return False
+        sql = ("INSERT INTO batas_anggaran (kategori, periode, batas, ambang) VALUES (?, ?, ?, ?) "
+               "ON CONFLICT (kategori, periode) DO UPDATE SET batas = excluded.batas, ambang = excluded.ambang")
+        hasil = database.execute_query(sql, (kategori or SEMUA_KATEGORI, periode, float(batas), float(ambang)),
+                                       pool=self._pool)
+        self._batas = None
+        return hasil is not None
+
+    def hapus_batas_anggaran(self, kategori: str | None, periode: str) -> bool:
+        hasil = database.execute_query("DELETE FROM batas_anggaran WHERE kategori = ? AND periode = ?",
+                                       (kategori or SEMUA_KATEGORI, periode), pool=self._pool)
+        self._batas = None
+        return hasil is not None
+
+    def _pemakaian(self, kategori: str, periode: str, mulai: datetime.date, sampai: datetime.date) -> float:
+        if periode in ("harian", "mingguan"):
+            kunci, params = "harian", [mulai.strftime("%Y-%m-%d"), sampai.strftime("%Y-%m-%d")]
+        else:
+            kunci, params = "bulanan", [mulai.strftime("%Y-%m"), sampai.strftime("%Y-%m")]
+        khusus = kategori != SEMUA_KATEGORI
+        if khusus: params.append(kategori)
+        hasil = database.fetch_query(_SQL_PEMAKAIAN[(kunci, khusus)], tuple(params), fetch_all=False, pool=self._pool)
+        return float(hasil[0]) if hasil and hasil[0] is not None else 0.0
+
+    @staticmethod
+    def _tingkat(persen: float, ambang: float) -> str:
+        return "terlampaui" if persen > 1 else "peringatan" if persen >= ambang else "aman"
+
+    def status_anggaran(self, tanggal_acuan: datetime.date | None = None) -> list[dict]:
+        """Pemakaian setiap batas anggaran pada periode yang memuat tanggal_acuan (default hari ini).
+
+        Biayanya O(jumlah batas): tiap batas dibaca dari agregat yang dijaga trigger
+        saat menulis, jadi tidak ada scan tabel transaksi. Tiap dict berisi kategori,
+        periode, mulai, sampai, batas, terpakai, sisa, persen (0..), ambang dan
+        status ('aman', 'peringatan' atau 'terlampaui').
+        """
+        tanggal_acuan = tanggal_acuan or datetime.date.today()
+        hasil = []
+        for b in self.get_batas_anggaran():
+            mulai, sampai = rentang_periode_anggaran(b['periode'], tanggal_acuan)
+            terpakai = self._pemakaian(b['kategori'], b['periode'], mulai, sampai)
+            persen = terpakai / b['batas']
+            hasil.append({**b, "mulai": mulai, "sampai": sampai, "terpakai": terpakai,
+                          "sisa": b['batas'] - terpakai, "persen": persen,
+                          "status": self._tingkat(persen, b['ambang'])})
+        return hasil
+
+    @staticmethod
+    def _buat_peringatan(b: dict, terpakai: float, status: str) -> dict:
+        nama = "semua kategori" if b['kategori'] == SEMUA_KATEGORI else b['kategori']
+        return {"waktu": datetime.datetime.now(), "kategori": b['kategori'], "periode": b['periode'],
+                "status": status, "persen": terpakai / b['batas'],
+                "pesan": f"{terpakai / b['batas']:.0%} anggaran {b['periode']} {nama} terpakai "
+                         f"({format_rp(terpakai)} dari {format_rp(b['batas'])})"}
+
+    def _cek_ambang_anggaran(self, daftar_transaksi: list[Transaksi]) -> list[dict]:
+        """Batas periode berjalan yang naik tingkat (aman -> peringatan -> terlampaui) akibat tulisan ini.
+
+        Pemakaian sebelum tulisan = pemakaian sekarang dikurangi nominal transaksi baru
+        yang jatuh di periode itu, jadi tidak perlu query tambahan sebelum INSERT.
+        Hasilnya dikembalikan ke pemanggil, bukan disimpan di instance, karena instance
+        dipakai bersama oleh semua sesi (st.cache_resource).
+        """
+        hasil = []
+        batas_terkait = self.get_batas_anggaran()
+        if not batas_terkait: return hasil
+        hari_ini = datetime.date.today()
+        for b in batas_terkait:
+            mulai, sampai = rentang_periode_anggaran(b['periode'], hari_ini)
+            tambahan = sum(t.jumlah for t in daftar_transaksi if mulai <= t.tanggal <= sampai
+                           and (b['kategori'] == SEMUA_KATEGORI or t.kategori == b['kategori']))
+            if tambahan <= 0: continue
+            terpakai = self._pemakaian(b['kategori'], b['periode'], mulai, sampai)
+            tingkat_baru = self._tingkat(terpakai / b['batas'], b['ambang'])
+            tingkat_lama = self._tingkat((terpakai - tambahan) / b['batas'], b['ambang'])
+            if tingkat_baru != tingkat_lama and tingkat_baru != "aman":
+                hasil.append(self._buat_peringatan(b, terpakai, tingkat_baru))
+        return hasil
+
+    def ambil_peringatan(self, tanggal_acuan: datetime.date | None = None) -> list[dict]:
+        """Peringatan untuk setiap batas yang sedang berstatus 'peringatan' atau 'terlampaui'.
+
+        Dihitung dari status_anggaran, tanpa state per instance, jadi aman dipanggil dari
+        sesi mana pun. Lintasan ambang milik satu tulisan didapat lewat parameter
+        `peringatan` di tambah_transaksi/tambah_transaksi_batch.
+        """
+        return [self._buat_peringatan(s, s['terpakai'], s['status'])
+                for s in self.status_anggaran(tanggal_acuan) if s['status'] != "aman"]
+
+    def bangun_ulang_ringkasan(self) -> bool:
+        """Menghitung ulang tabel agregat ringkasan_harian dari seluruh transaksi."""
+        hasil = database.bangun_ulang_ringkasan(pool=self._pool) is not None
+        self._cache.kosongkan()
+        return hasil
+
+    def kosongkan_cache(self):
+        """Membuang seluruh cache query (misal setelah data diubah dari luar aplikasi)."""
+        self._cache.kosongkan()
+
+    def statistik_cache(self) -> dict:
+        """Hit/miss, eviksi dan invalidasi cache query instance ini."""
+        return self._cache.statistik()
+
+    def diagnostik_database(self) -> dict:
+        """PRAGMA aktif dan statistik pool untuk file database instance ini."""
+        return database.diagnostik_database(self._pool)
+
     def hapus_transaksi(self, id_transaksi: int) -> bool: # Metode baru
         """Menghapus transaksi berdasarkan ID."""
+        lama = database.fetch_query("SELECT tanggal, kategori FROM transaksi WHERE id = ?",
+                                    (id_transaksi,), fetch_all=False, pool=self._pool) # Untuk invalidasi cache yang tepat
         sql = "DELETE FROM transaksi WHERE id = ?"
         # execute_query mengembalikan lastrowid untuk INSERT, None untuk operasi lain yang berhasil, atau None jika ada error.
         # Jadi, jika bukan None, berarti query berhasil dieksekusi tanpa error SQLite.
-        result = database.execute_query(sql, (id_transaksi,))
+        result = database.execute_query(sql, (id_transaksi,), pool=self._pool)
+        if result is not None and lama is not None:
+            self._cache.invalidasi(lama['tanggal'], kategori=lama['kategori'] or "Lainnya")
         return result is not None
 
     def get_semua_transaksi_obj(self) -> list[Transaksi]:
-        sql = "SELECT id, deskripsi, jumlah, kategori, tanggal FROM transaksi ORDER BY tanggal DESC, id DESC"
-        rows = database.fetch_query(sql, fetch_all=True)
-        transaksi_list = []
-        if rows:
-            for row in rows:
-                transaksi_list.append(Transaksi(id_transaksi=row['id'],
-                                              deskripsi=row['deskripsi'], jumlah=row['jumlah'], kategori=row['kategori'],
-                                              tanggal=row['tanggal']))
-        return transaksi_list
+        # CAST tanpa tipe deklarasi -> converter DATE (PARSE_DECLTYPES) per baris dilewati, parsing di from_row
+        sql = "SELECT id, deskripsi, jumlah, kategori, CAST(tanggal AS TEXT) FROM transaksi ORDER BY tanggal DESC, id DESC"
+        rows = database.fetch_query(sql, fetch_all=True, pool=self._pool)
+        # Baris dari tabel sendiri sudah valid: pakai fast path tanpa validasi ulang
+        return [Transaksi.from_row(row) for row in rows] if rows else []
 
-    def get_dataframe_transaksi(self, filter_tanggal: datetime.date | None = None) -> pd.DataFrame:
-        # Mengubah query untuk menyertakan 'id'
-        query = "SELECT id, tanggal, kategori, deskripsi, jumlah FROM transaksi"
-        params = None
-        if filter_tanggal:
-            query += " WHERE tanggal = ?"; params = (filter_tanggal.strftime("%Y-%m-%d"),)
-        query += " ORDER BY tanggal DESC, id DESC"
-        df = database.get_dataframe(query, params=params)
+    def iter_transaksi(self, batch_size: int = 1000, mulai: datetime.date | None = None,
+                       sampai: datetime.date | None = None):
+        """Generator Transaksi (urut tanggal DESC, id DESC) yang dibaca per batch dengan fetchmany.
+
+        Berbeda dengan get_semua_transaksi_obj, memori puncak hanya sebesar satu batch.
+        """
+        sql, params = bangun_kueri("SELECT id, deskripsi, jumlah, kategori, CAST(tanggal AS TEXT) FROM transaksi",
+                                   _gabung_filter(None, None, mulai, sampai),
+                                   "ORDER BY tanggal DESC, id DESC") # Mengikuti indeks (tanggal, id), tanpa sort sementara
+        for batch in database.iter_query(sql, params or None, ukuran_batch=batch_size, pool=self._pool):
+            for row in batch:
+                yield Transaksi.from_row(row)
+
+    def get_semua_transaksi_batch(self) -> TransaksiBatch:
+        """Semua transaksi dalam bentuk kolom (TransaksiBatch), urutan sama dengan get_semua_transaksi_obj."""
+        sql = "SELECT id, deskripsi, jumlah, kategori, CAST(tanggal AS TEXT) FROM transaksi ORDER BY tanggal DESC, id DESC"
+        return TransaksiBatch.from_rows(database.fetch_query(sql, fetch_all=True, pool=self._pool) or [])
+
+    @di_cache
+    def get_dataframe_transaksi(self, filter_tanggal: datetime.date | None = None,
+                                mulai: datetime.date | None = None, sampai: datetime.date | None = None,
+                                saring: FilterTransaksi | None = None) -> pd.DataFrame:
+        # Mengubah query untuk menyertakan 'id'; filter tanggal memakai indeks (tanggal, id)
+        query, params = bangun_kueri("SELECT id, tanggal, kategori, deskripsi, jumlah FROM transaksi",
+                                     _gabung_filter(saring, filter_tanggal, mulai, sampai),
+                                     "ORDER BY tanggal DESC, id DESC")
+        df = database.get_dataframe(query, params=params or None, pool=self._pool)
+        return self._format_dataframe(df)
+
+    @di_cache
+    def cari_transaksi(self, query: str, limit: int = 50, saring: FilterTransaksi | None = None) -> pd.DataFrame:
+        """Mencari deskripsi transaksi lewat indeks FTS5, diurutkan dari yang paling relevan (bm25).
+
+        saring membatasi tanggal/kategori/jumlah hasil (filter teks-nya diabaikan).
+        Kolom sama dengan get_dataframe_transaksi ditambah 'skor' (makin kecil makin relevan).
+        """
+        cocok = kueri_fts(query)
+        if cocok is None: return pd.DataFrame()
+        saring = dataclasses.replace(saring, teks=None) if saring else None
+        sql, params = bangun_kueri(
+            "SELECT transaksi.id, tanggal, kategori, transaksi.deskripsi, jumlah, bm25(transaksi_fts) AS skor "
+            "FROM transaksi_fts JOIN transaksi ON transaksi.id = transaksi_fts.rowid", saring,
+            "ORDER BY skor, tanggal DESC LIMIT ?", ("transaksi_fts MATCH ?",), (cocok, max(1, int(limit))))
+        df = database.get_dataframe(sql, params=params, pool=self._pool)
+        if df.empty: return df
+        skor = df['skor'].round(3)
+        df = self._format_dataframe(df)
+        df['skor'] = skor
+        return df
+
+    @di_cache
+    def hitung_total_pencarian(self, query: str, saring: FilterTransaksi | None = None) -> tuple[int, float]:
+        """(jumlah transaksi, total nominal) dari SEMUA hasil pencarian, misal "grab" di kuartal lalu."""
+        cocok = kueri_fts(query)
+        if cocok is None: return 0, 0.0
+        saring = dataclasses.replace(saring, teks=None) if saring else None
+        sql, params = bangun_kueri(
+            "SELECT COUNT(*), SUM(jumlah) FROM transaksi_fts JOIN transaksi ON transaksi.id = transaksi_fts.rowid",
+            saring, kondisi_tambahan=("transaksi_fts MATCH ?",), params_tambahan=(cocok,))
+        hasil = database.fetch_query(sql, params=params, fetch_all=False, pool=self._pool)
+        if not hasil: return 0, 0.0
+        return int(hasil[0]), float(hasil[1] or 0.0)
+
+    @staticmethod
+    def _format_dataframe(df: pd.DataFrame) -> pd.DataFrame:
         if not df.empty:
-            try:
-                import locale; locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
-                df['Jumlah (Rp)'] = df['jumlah'].map(lambda x: locale.currency(x or 0, grouping=True, symbol='Rp ')[:-3])
-            except: df['Jumlah (Rp)'] = df['jumlah'].map(lambda x: f"Rp {x or 0:.0f}".replace(",", "."))
+            df['Jumlah (Rp)'] = format_rp_kolom(df['jumlah']) # Vektorisasi, tanpa setlocale per request
             # Mengatur ulang kolom untuk menampilkan ID terlebih dahulu agar lebih mudah dihapus
             df = df[['id', 'tanggal', 'kategori', 'deskripsi', 'Jumlah (Rp)']]
         return df
 
-    def hitung_total_pengeluaran(self, tanggal: datetime.date | None = None) -> float:
-        sql = "SELECT SUM(jumlah) FROM transaksi"; params = None
-        if tanggal:
-            sql += " WHERE tanggal = ?"; params = (tanggal.strftime("%Y-%m-%d"),)
-        result = database.fetch_query(sql, params=params, fetch_all=False)
+    @di_cache
+    def get_halaman_transaksi(self, ukuran: int = 50, kursor: tuple | None = None, arah: str = "berikut",
+                              mulai: datetime.date | None = None, sampai: datetime.date | None = None,
+                              hitung_total: bool = False, saring: FilterTransaksi | None = None) -> dict:
+        """Satu halaman riwayat (urut tanggal DESC, id DESC) dengan keyset pagination.
+
+        kursor adalah (tanggal 'YYYY-MM-DD', id) dari baris batas halaman sebelumnya:
+        'kursor_akhir' untuk arah="berikut" (lebih lama), 'kursor_awal' untuk
+        arah="sebelum" (lebih baru). Query selalu memakai indeks (tanggal, id) dan
+        tidak bergantung pada OFFSET, jadi biayanya sama di halaman mana pun.
+        Mengembalikan dict: data (DataFrame), kursor_awal, kursor_akhir,
+        ada_sebelum, ada_berikut, total (None jika hitung_total=False).
+        saring menambah filter kategori/jumlah/teks pada riwayat.
+        """
+        if arah not in ("berikut", "sebelum"):
+            raise ValueError(f"arah '{arah}' tidak dikenal, pilih 'berikut' atau 'sebelum'")
+        ukuran = max(1, int(ukuran))
+        saring = _gabung_filter(saring, None, mulai, sampai)
+        kondisi_kursor, params_kursor = (), ()
+        if kursor is not None:
+            kondisi_kursor = ("(tanggal, id) < (?, ?)" if arah == "berikut" else "(tanggal, id) > (?, ?)",)
+            params_kursor = (str(kursor[0]), int(kursor[1]))
+        urutan = "DESC" if arah == "berikut" else "ASC"
+        query, params = bangun_kueri("SELECT id, tanggal, kategori, deskripsi, jumlah FROM transaksi", saring,
+                                     f"ORDER BY tanggal {urutan}, id {urutan} LIMIT ?", # Ambil 1 baris lebih untuk tahu ada halaman lanjut
+                                     kondisi_kursor, params_kursor + (ukuran + 1,))
+        df = database.get_dataframe(query, params=params, pool=self._pool)
+
+        masih_ada = len(df) > ukuran
+        df = df.iloc[:ukuran]
+        if arah == "sebelum":
+            df = df.iloc[::-1]
+        df = df.reset_index(drop=True)
+        kursor_awal = kursor_akhir = None
+        if not df.empty:
+            kursor_awal = (str(df['tanggal'].iloc[0]), int(df['id'].iloc[0]))
+            kursor_akhir = (str(df['tanggal'].iloc[-1]), int(df['id'].iloc[-1]))
+
+        total = None
+        if hitung_total:
+            sql_total, params_total = bangun_kueri("SELECT COUNT(*) FROM transaksi", saring)
+            hasil = database.fetch_query(sql_total, params=params_total or None, fetch_all=False, pool=self._pool)
+            total = int(hasil[0]) if hasil else None
+        return {"data": self._format_dataframe(df),
+                "kursor_awal": kursor_awal, "kursor_akhir": kursor_akhir,
+                "ada_sebelum": masih_ada if arah == "sebelum" else kursor is not None,
+                "ada_berikut": masih_ada if arah == "berikut" else kursor is not None,
+                "total": total}
+
+    @di_cache
+    def hitung_total_pengeluaran(self, tanggal: datetime.date | None = None,
+                                 mulai: datetime.date | None = None, sampai: datetime.date | None = None,
+                                 saring: FilterTransaksi | None = None) -> float:
+        # Dibaca dari agregat ringkasan_bulanan/ringkasan_harian (dijaga trigger), bukan SUM atas
+        # seluruh transaksi. Filter jumlah/teks tidak ada di agregat, jadi baru saat itu tabel transaksi dipakai.
+        saring = _gabung_filter(saring, tanggal, mulai, sampai)
+        if saring.hanya_tanggal_kategori:
+            tabel, sisa, kondisi, params_bulan = _sumber_agregat(saring)
+            sql, params = bangun_kueri(f"SELECT SUM(total) FROM {tabel}", sisa,
+                                       kondisi_tambahan=kondisi, params_tambahan=params_bulan)
+        else:
+            sql, params = bangun_kueri("SELECT SUM(jumlah) FROM transaksi", saring)
+        result = database.fetch_query(sql, params=params or None, fetch_all=False, pool=self._pool)
         if result and result[0] is not None:
             return float(result[0])
         return 0.0
 
-    def get_pengeluaran_per_kategori(self, tanggal: datetime.date | None = None) -> dict:
-        hasil = {}; sql = "SELECT kategori, SUM(jumlah) FROM transaksi";
-        params = []
-        if tanggal:
-            sql += " WHERE tanggal = ?";
-            params.append(tanggal.strftime("%Y-%m-%d"))
-        sql += " GROUP BY kategori HAVING SUM(jumlah) > 0 ORDER BY SUM(jumlah) DESC"
-        rows = database.fetch_query(sql, params=tuple(params) if params else None, fetch_all=True)
+    @di_cache
+    def get_pengeluaran_per_kategori(self, tanggal: datetime.date | None = None,
+                                     mulai: datetime.date | None = None, sampai: datetime.date | None = None,
+                                     saring: FilterTransaksi | None = None) -> dict:
+        hasil = {}; saring = _gabung_filter(saring, tanggal, mulai, sampai)
+        if saring.hanya_tanggal_kategori:
+            tabel, sisa, kondisi, params_bulan = _sumber_agregat(saring)
+            sql, params = bangun_kueri(f"SELECT {KATEGORI_SQL} AS kategori, SUM(total) FROM {tabel}", sisa,
+                                       "GROUP BY 1 HAVING SUM(total) > 0 ORDER BY SUM(total) DESC",
+                                       kondisi_tambahan=kondisi, params_tambahan=params_bulan)
+        else:
+            sql, params = bangun_kueri(f"SELECT {KATEGORI_SQL} AS kategori, SUM(jumlah) FROM transaksi", saring,
+                                       "GROUP BY 1 HAVING SUM(jumlah) > 0 ORDER BY SUM(jumlah) DESC")
+        rows = database.fetch_query(sql, params=params or None, fetch_all=True, pool=self._pool)
         if rows:
             for row in rows:
-                kategori = row['kategori'] if row['kategori'] else "Lainnya";
-                jumlah = float(row[1]) if row[1] is not None else 0.0
-                hasil[kategori] = jumlah
-        return hasil
\ No newline at end of file
+                hasil[row['kategori']] = float(row[1]) if row[1] is not None else 0.0
+        return hasil
+
+    @di_cache
+    def get_pengeluaran_per_periode(self, granularitas: str = "bulan", mulai: datetime.date | None = None,
+                                    sampai: datetime.date | None = None, saring: FilterTransaksi | None = None) -> dict:
+        """Total pengeluaran per hari/bulan/tahun ('YYYY-MM-DD'/'YYYY-MM'/'YYYY' -> total), urut kronologis."""
+        if granularitas not in GRANULARITAS_PERIODE:
+            raise ValueError(f"Granularitas '{granularitas}' tidak dikenal, pilih dari {list(GRANULARITAS_PERIODE)}")
+        periode = GRANULARITAS_PERIODE[granularitas]
+        saring = _gabung_filter(saring, None, mulai, sampai)
+        select = (f"SELECT {periode} AS periode, SUM(total) FROM ringkasan_harian" if saring.hanya_tanggal_kategori
+                  else f"SELECT {periode} AS periode, SUM(jumlah) FROM transaksi")
+        sql, params = bangun_kueri(select, saring, "GROUP BY periode ORDER BY periode")
+        rows = database.fetch_query(sql, params=params or None, fetch_all=True, pool=self._pool)
+        return {str(row['periode']): float(row[1] or 0.0) for row in rows} if rows else {}
\ No newline at end of file
@@ -0,0 +1,256 @@
+# migrasi.py
+import sqlite3
+from konfigurasi import KATEGORI_DEFAULT
+
+# Daftar migrasi skema berversi. Versi yang sudah diterapkan disimpan di PRAGMA user_version,
+# jadi setiap migrasi hanya dijalankan sekali per file database. Tambahkan migrasi baru di
+# akhir daftar dengan nomor versi berikutnya; JANGAN ubah migrasi yang sudah dirilis.
+
+def kategori_sql(kolom: str = "kategori") -> str:
+    """Ekspresi kategori ternormalisasi (NULL/'' -> KATEGORI_DEFAULT). Satu-satunya definisi:
+    dipakai trigger agregat, pengisian ulang agregat dan kueri per kategori di manajer_anggaran."""
+    return f"COALESCE(NULLIF({kolom}, ''), '{KATEGORI_DEFAULT}')"
+
+KATEGORI_SQL = kategori_sql()
+
+# Isi ringkasan_harian dihitung ulang dari transaksi (migrasi v3, v6 & bangun_ulang_ringkasan)
+SQL_ISI_RINGKASAN = f"""
+        INSERT INTO ringkasan_harian (tanggal, kategori, total, jumlah_transaksi)
+        SELECT tanggal, {KATEGORI_SQL}, SUM(jumlah), COUNT(*)
+        FROM transaksi GROUP BY tanggal, {KATEGORI_SQL}"""
+# Isi ringkasan_bulanan dihitung dari ringkasan_harian (migrasi v5 & bangun_ulang_ringkasan)
+SQL_ISI_RINGKASAN_BULANAN = """
+        INSERT INTO ringkasan_bulanan (bulan, kategori, total, jumlah_transaksi)
+        SELECT substr(tanggal, 1, 7), kategori, SUM(total), SUM(jumlah_transaksi)
+        FROM ringkasan_harian GROUP BY substr(tanggal, 1, 7), kategori"""
+
+MIGRASI = [
+    (1, "Tabel transaksi", [
+        """
+        CREATE TABLE IF NOT EXISTS transaksi (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            deskripsi TEXT NOT NULL,
+            jumlah REAL NOT NULL CHECK(jumlah > 0),
+            kategori TEXT,
+            tanggal DATE NOT NULL
+        )""",
+    ]),
+    (2, "Indeks untuk filter tanggal, urutan riwayat dan ringkasan per kategori", [
+        # WHERE tanggal = ? dan ORDER BY tanggal DESC, id DESC
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_tanggal_id ON transaksi(tanggal, id)",
+        # GROUP BY kategori + SUM(jumlah) bisa dijawab dari indeks saja (covering)
+        "CREATE INDEX IF NOT EXISTS idx_transaksi_kategori_tanggal_jumlah ON transaksi(kategori, tanggal, jumlah)",
+        "ANALYZE transaksi",
+    ]),
+    (3, "Tabel agregat ringkasan_harian yang dijaga trigger", [
+        """
+        CREATE TABLE IF NOT EXISTS ringkasan_harian (
+            tanggal DATE NOT NULL,
+            kategori TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            jumlah_transaksi INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tanggal, kategori)
+        ) WITHOUT ROWID""",
+        # Trigger ikut berjalan untuk semua jalur tulis (tambah, batch, hapus, UPDATE manual)
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transaksi_ringkasan_insert AFTER INSERT ON transaksi
+        BEGIN
+            INSERT INTO ringkasan_harian (tanggal, kategori, total, jumlah_transaksi)
+            VALUES (NEW.tanggal, COALESCE(NEW.kategori, 'Lainnya'), NEW.jumlah, 1)
+            ON CONFLICT (tanggal, kategori) DO UPDATE SET
+                total = total + excluded.total,
+                jumlah_transaksi = jumlah_transaksi + 1;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transaksi_ringkasan_delete AFTER DELETE ON transaksi
+        BEGIN
+            UPDATE ringkasan_harian SET total = total - OLD.jumlah, jumlah_transaksi = jumlah_transaksi - 1
+            WHERE tanggal = OLD.tanggal AND kategori = COALESCE(OLD.kategori, 'Lainnya');
+            DELETE FROM ringkasan_harian
+            WHERE tanggal = OLD.tanggal AND kategori = COALESCE(OLD.kategori, 'Lainnya') AND jumlah_transaksi <= 0;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transaksi_ringkasan_update
+        AFTER UPDATE OF jumlah, kategori, tanggal ON transaksi
+        BEGIN
+            UPDATE ringkasan_harian SET total = total - OLD.jumlah, jumlah_transaksi = jumlah_transaksi - 1
+            WHERE tanggal = OLD.tanggal AND kategori = COALESCE(OLD.kategori, 'Lainnya');
+            DELETE FROM ringkasan_harian
+            WHERE tanggal = OLD.tanggal AND kategori = COALESCE(OLD.kategori, 'Lainnya') AND jumlah_transaksi <= 0;
+            INSERT INTO ringkasan_harian (tanggal, kategori, total, jumlah_transaksi)
+            VALUES (NEW.tanggal, COALESCE(NEW.kategori, 'Lainnya'), NEW.jumlah, 1)
+            ON CONFLICT (tanggal, kategori) DO UPDATE SET
+                total = total + excluded.total,
+                jumlah_transaksi = jumlah_transaksi + 1;
+        END""",
+        "DELETE FROM ringkasan_harian",
+        SQL_ISI_RINGKASAN,
+    ]),
+    (4, "Indeks teks penuh (FTS5) untuk deskripsi transaksi", [
+        # External content: teks tidak disalin dua kali, transaksi_fts hanya menyimpan indeks
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS transaksi_fts USING fts5(
+            deskripsi, content='transaksi', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transaksi_fts_insert AFTER INSERT ON transaksi
+        BEGIN
+            INSERT INTO transaksi_fts (rowid, deskripsi) VALUES (NEW.id, NEW.deskripsi);
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transaksi_fts_delete AFTER DELETE ON transaksi
+        BEGIN
+            INSERT INTO transaksi_fts (transaksi_fts, rowid, deskripsi) VALUES ('delete', OLD.id, OLD.deskripsi);
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transaksi_fts_update AFTER UPDATE OF deskripsi ON transaksi
+        BEGIN
+            INSERT INTO transaksi_fts (transaksi_fts, rowid, deskripsi) VALUES ('delete', OLD.id, OLD.deskripsi);
+            INSERT INTO transaksi_fts (rowid, deskripsi) VALUES (NEW.id, NEW.deskripsi);
+        END""",
+        "INSERT INTO transaksi_fts (transaksi_fts) VALUES ('rebuild')", # Indeks untuk data yang sudah ada
+    ]),
+    (5, "Batas anggaran dan agregat ringkasan_bulanan", [
+        # kategori '*' = batas untuk total semua kategori
+        """
+        CREATE TABLE IF NOT EXISTS batas_anggaran (
+            kategori TEXT NOT NULL,
+            periode TEXT NOT NULL CHECK(periode IN ('harian', 'mingguan', 'bulanan', 'tahunan')),
+            batas REAL NOT NULL CHECK(batas > 0),
+            ambang REAL NOT NULL DEFAULT 0.8 CHECK(ambang > 0 AND ambang <= 1),
+            PRIMARY KEY (kategori, periode)
+        ) WITHOUT ROWID""",
+        """
+        CREATE TABLE IF NOT EXISTS ringkasan_bulanan (
+            bulan TEXT NOT NULL,
+            kategori TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            jumlah_transaksi INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bulan, kategori)
+        ) WITHOUT ROWID""",
+        # Diturunkan dari ringkasan_harian (bukan transaksi), jadi ikut semua perubahan ringkasan harian
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ringkasan_bulanan_insert AFTER INSERT ON ringkasan_harian
+        BEGIN
+            INSERT INTO ringkasan_bulanan (bulan, kategori, total, jumlah_transaksi)
+            VALUES (substr(NEW.tanggal, 1, 7), NEW.kategori, NEW.total, NEW.jumlah_transaksi)
+            ON CONFLICT (bulan, kategori) DO UPDATE SET
+                total = total + excluded.total,
+                jumlah_transaksi = jumlah_transaksi + excluded.jumlah_transaksi;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ringkasan_bulanan_delete AFTER DELETE ON ringkasan_harian
+        BEGIN
+            UPDATE ringkasan_bulanan SET total = total - OLD.total,
+                                         jumlah_transaksi = jumlah_transaksi - OLD.jumlah_transaksi
+            WHERE bulan = substr(OLD.tanggal, 1, 7) AND kategori = OLD.kategori;
+            DELETE FROM ringkasan_bulanan
+            WHERE bulan = substr(OLD.tanggal, 1, 7) AND kategori = OLD.kategori AND jumlah_transaksi <= 0;
+        END""",
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_ringkasan_bulanan_update AFTER UPDATE ON ringkasan_harian
+        BEGIN
+            UPDATE ringkasan_bulanan SET total = total - OLD.total,
+                                         jumlah_transaksi = jumlah_transaksi - OLD.jumlah_transaksi
+            WHERE bulan = substr(OLD.tanggal, 1, 7) AND kategori = OLD.kategori;
+            INSERT INTO ringkasan_bulanan (bulan, kategori, total, jumlah_transaksi)
+            VALUES (substr(NEW.tanggal, 1, 7), NEW.kategori, NEW.total, NEW.jumlah_transaksi)
+            ON CONFLICT (bulan, kategori) DO UPDATE SET
+                total = total + excluded.total,
+                jumlah_transaksi = jumlah_transaksi + excluded.jumlah_transaksi;
+            DELETE FROM ringkasan_bulanan
+            WHERE bulan = substr(OLD.tanggal, 1, 7) AND kategori = OLD.kategori AND jumlah_transaksi <= 0;
+        END""",
+        "DELETE FROM ringkasan_bulanan",
+        SQL_ISI_RINGKASAN_BULANAN,
+    ]),
+    (6, "Kategori kosong di agregat disamakan dengan 'Lainnya' seperti kueri transaksi", [
+        # Trigger v3 hanya memakai COALESCE, jadi kategori '' tersimpan sebagai '' di agregat
+        "DROP TRIGGER IF EXISTS trg_transaksi_ringkasan_insert",
+        "DROP TRIGGER IF EXISTS trg_transaksi_ringkasan_delete",
+        "DROP TRIGGER IF EXISTS trg_transaksi_ringkasan_update",
+        f"""
+        CREATE TRIGGER trg_transaksi_ringkasan_insert AFTER INSERT ON transaksi
+        BEGIN
+            INSERT INTO ringkasan_harian (tanggal, kategori, total, jumlah_transaksi)
+            VALUES (NEW.tanggal, {kategori_sql('NEW.kategori')}, NEW.jumlah, 1)
+            ON CONFLICT (tanggal, kategori) DO UPDATE SET
+                total = total + excluded.total,
+                jumlah_transaksi = jumlah_transaksi + 1;
+        END""",
+        f"""
+        CREATE TRIGGER trg_transaksi_ringkasan_delete AFTER DELETE ON transaksi
+        BEGIN
+            UPDATE ringkasan_harian SET total = total - OLD.jumlah, jumlah_transaksi = jumlah_transaksi - 1
+            WHERE tanggal = OLD.tanggal AND kategori = {kategori_sql('OLD.kategori')};
+            DELETE FROM ringkasan_harian
+            WHERE tanggal = OLD.tanggal AND kategori = {kategori_sql('OLD.kategori')} AND jumlah_transaksi <= 0;
+        END""",
+        f"""
+        CREATE TRIGGER trg_transaksi_ringkasan_update
+        AFTER UPDATE OF jumlah, kategori, tanggal ON transaksi
+        BEGIN
+            UPDATE ringkasan_harian SET total = total - OLD.jumlah, jumlah_transaksi = jumlah_transaksi - 1
+            WHERE tanggal = OLD.tanggal AND kategori = {kategori_sql('OLD.kategori')};
+            DELETE FROM ringkasan_harian
+            WHERE tanggal = OLD.tanggal AND kategori = {kategori_sql('OLD.kategori')} AND jumlah_transaksi <= 0;
+            INSERT INTO ringkasan_harian (tanggal, kategori, total, jumlah_transaksi)
+            VALUES (NEW.tanggal, {kategori_sql('NEW.kategori')}, NEW.jumlah, 1)
+            ON CONFLICT (tanggal, kategori) DO UPDATE SET
+                total = total + excluded.total,
+                jumlah_transaksi = jumlah_transaksi + 1;
+        END""",
+        # Bangun ulang kedua agregat (trigger ringkasan_bulanan ikut terpicu, lalu bulanan diisi ulang bersih)
+        "DELETE FROM ringkasan_harian",
+        SQL_ISI_RINGKASAN,
+        "DELETE FROM ringkasan_bulanan",
+        SQL_ISI_RINGKASAN_BULANAN,
+    ]),
+]
+
+VERSI_TERBARU = MIGRASI[-1][0]
+
+def versi_skema(conn: sqlite3.Connection) -> int:
+    """Mengembalikan versi skema database (PRAGMA user_version)."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def jalankan_migrasi(conn: sqlite3.Connection) -> int:
+    """Menerapkan semua migrasi yang belum dijalankan, masing-masing dalam satu transaksi.
+
+    Aman dipanggil berkali-kali dan dari beberapa proses sekaligus: versi dicek ulang
+    setelah kunci tulis didapat. Mengembalikan versi skema akhir. sqlite3.Error
+    diteruskan ke pemanggil (migrasi yang gagal di-rollback).
+    """
+    for versi, judul, daftar_sql in MIGRASI:
+        if versi_skema(conn) >= versi: continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if versi_skema(conn) >= versi: # Sudah diterapkan proses lain
+                conn.rollback(); continue
+            print(f" -> Migrasi skema v{versi}: {judul}")
+            for sql in daftar_sql:
+                conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {int(versi)}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback(); raise
+    return versi_skema(conn)
+
+
+def bangun_ulang_ringkasan(conn: sqlite3.Connection) -> int:
+    """Menghitung ulang ringkasan_harian (dan ringkasan_bulanan) dari tabel transaksi (untuk memperbaiki drift).
+
+    Mengembalikan jumlah baris ringkasan. sqlite3.Error diteruskan ke pemanggil.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM ringkasan_harian")
+        conn.execute(SQL_ISI_RINGKASAN)
+        if versi_skema(conn) >= 5: # ringkasan_bulanan diturunkan dari ringkasan_harian
+            conn.execute("DELETE FROM ringkasan_bulanan")
+            conn.execute(SQL_ISI_RINGKASAN_BULANAN)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback(); raise
+    return conn.execute("SELECT COUNT(*) FROM ringkasan_harian").fetchone()[0]
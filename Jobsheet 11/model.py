@@ -1,8 +1,14 @@
 # model.py
 import datetime
+import math
+import numpy as np
+import pandas as pd
+from format_mata_uang import format_angka
 
 class Transaksi:
     """Merepresentasikan satu entitas transaksi pengeluaran (Data Class)."""
+    __slots__ = ("id", "deskripsi", "jumlah", "kategori", "tanggal") # Tanpa __dict__: lebih hemat memori
+
     def __init__(self, deskripsi: str, jumlah: float, kategori: str,
                  tanggal: datetime.date | str | None = None, id_transaksi: int | None = None):
 
@@ -23,11 +29,52 @@ class Transaksi:
             except ValueError: self.tanggal = datetime.date.today(); print(f"Peringatan: Format tgl '{tanggal}' salah.")
         else: self.tanggal = datetime.date.today(); print(f"Peringatan: Tipe tgl '{type(tanggal)}' tidak valid.")
 
-    def __repr__(self) -> str:
+    @classmethod
+    def from_row(cls, row) -> "Transaksi":
+        """Fast path untuk baris (id, deskripsi, jumlah, kategori, tanggal) dari tabel transaksi.
+
+        Data di tabel sudah tervalidasi saat disimpan, jadi __init__ (strptime,
+        isinstance, print peringatan) dilewati. tanggal boleh berupa date
+        (PARSE_DECLTYPES) atau string ISO.
+        """
+        id_transaksi, deskripsi, jumlah, kategori, tanggal = row
+        obj = cls.__new__(cls)
+        obj.id = id_transaksi
+        obj.deskripsi = deskripsi
+        obj.jumlah = jumlah
+        obj.kategori = kategori or "Lainnya"
+        obj.tanggal = tanggal if isinstance(tanggal, datetime.date) else datetime.date.fromisoformat(tanggal)
+        return obj
+
+    @classmethod
+    def dari_dict(cls, data: dict) -> "Transaksi":
+        """Membuat Transaksi dari dict (misal baris CSV/JSON) dengan validasi ketat.
+
+        Berbeda dengan __init__, data tidak valid tidak diganti nilai default
+        melainkan memunculkan ValueError berisi alasannya.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"data transaksi harus berupa dict, bukan {type(data).__name__}")
+        deskripsi = str(data.get("deskripsi") or "").strip()
+        if not deskripsi:
+            raise ValueError("deskripsi kosong")
         try:
-            import locale; locale.setlocale(locale.LC_ALL, 'id_ID.UTF-8')
-            jml_str = locale.format_string("%.0f", self.jumlah, grouping=True)
-        except: jml_str = f"{self.jumlah:.0f}"
+            jumlah = float(data.get("jumlah"))
+        except (ValueError, TypeError):
+            raise ValueError(f"jumlah '{data.get('jumlah')}' tidak valid") from None
+        if not math.isfinite(jumlah) or jumlah <= 0:
+            raise ValueError(f"jumlah '{data.get('jumlah')}' harus positif")
+        tanggal = data.get("tanggal")
+        if isinstance(tanggal, datetime.datetime):
+            tanggal = tanggal.date()
+        elif not isinstance(tanggal, datetime.date):
+            try: tanggal = datetime.date.fromisoformat(str(tanggal).strip())
+            except ValueError: raise ValueError(f"tanggal '{tanggal}' bukan format YYYY-MM-DD") from None
+        kategori = str(data.get("kategori") or "").strip() or None
+        return cls(deskripsi, jumlah, kategori, tanggal)
+
+    def __repr__(self) -> str:
+        jml_str = format_angka(self.jumlah)
         return f"Transaksi(ID:{self.id}), Tgl:{self.tanggal.strftime('%Y-%m-%d')}, Jml:{jml_str}, Kat:'{self.kategori}', Desc:'{self.deskripsi}')"
 
     def to_dict(self) -> dict:
@@ -36,4 +83,49 @@ class Transaksi:
             "jumlah": self.jumlah,
             "kategori": self.kategori,
             "tanggal": self.tanggal.strftime("%Y-%m-%d")
-        }
\ No newline at end of file
+        }
+
+
+class TransaksiBatch:
+    """Kumpulan transaksi dalam bentuk kolom (array NumPy) untuk konsumen massal.
+
+    id, jumlah dan tanggal disimpan sebagai array int64/float64/datetime64[D];
+    objek Transaksi hanya dibuat saat satu elemen diakses.
+    """
+    __slots__ = ("ids", "jumlah", "tanggal", "deskripsi", "kategori")
+
+    def __init__(self, ids, jumlah, tanggal, deskripsi, kategori):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.jumlah = np.asarray(jumlah, dtype=np.float64)
+        self.tanggal = np.asarray(tanggal, dtype="datetime64[D]")
+        self.deskripsi = list(deskripsi)
+        self.kategori = list(kategori)
+
+    @classmethod
+    def from_rows(cls, rows) -> "TransaksiBatch":
+        """Membuat batch dari baris (id, deskripsi, jumlah, kategori, tanggal)."""
+        rows = list(rows)
+        if not rows:
+            return cls([], [], [], [], [])
+        ids, deskripsi, jumlah, kategori, tanggal = zip(*rows) # Transpose baris -> kolom
+        if not isinstance(tanggal[0], str):
+            tanggal = [str(t) for t in tanggal] # date -> 'YYYY-MM-DD' untuk datetime64
+        return cls(ids, jumlah, tanggal, deskripsi, [k or "Lainnya" for k in kategori])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, indeks: int) -> Transaksi:
+        return Transaksi.from_row((int(self.ids[indeks]), self.deskripsi[indeks], float(self.jumlah[indeks]),
+                                   self.kategori[indeks], self.tanggal[indeks].item()))
+
+    def __iter__(self):
+        for indeks in range(len(self)):
+            yield self[indeks]
+
+    def total(self) -> float:
+        return float(self.jumlah.sum())
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({"id": self.ids, "tanggal": self.tanggal, "kategori": self.kategori,
+                             "deskripsi": self.deskripsi, "jumlah": self.jumlah})
@@ -0,0 +1,117 @@
+# penulis_tunggal.py
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+import database
+from konfigurasi import GROUP_COMMIT_MAKS_BARIS, GROUP_COMMIT_INTERVAL_MS
+
+_SELESAI = object() # Penanda berhenti di antrean
+
+class PenulisTunggal:
+    """Satu thread penulis yang menguras antrean INSERT dan commit per grup.
+
+    Banyak sesi yang menulis bersamaan tidak lagi berebut kunci tulis SQLite:
+    semua baris masuk antrean, lalu thread penulis menyimpannya dalam satu
+    transaksi setiap ukuran_grup baris atau interval_ms milidetik (mana yang
+    lebih dulu). kirim() mengembalikan Future yang berisi id baris baru, atau
+    exception jika baris itu gagal disimpan. Callback setelah_commit dijalankan
+    di thread penulis sebelum Future diselesaikan, jadi pemanggil yang menunggu
+    Future selalu melihat efeknya. Future yang dibatalkan (cancel()) sebelum
+    grupnya mulai ditulis tidak akan pernah disimpan.
+    """
+    def __init__(self, ukuran_grup: int = GROUP_COMMIT_MAKS_BARIS,
+                 interval_ms: float = GROUP_COMMIT_INTERVAL_MS, pool: database.PoolKoneksi | None = None):
+        self.pool = pool # None = pool database utama
+        self.ukuran_grup = max(1, int(ukuran_grup))
+        self.interval_detik = max(0.0, interval_ms / 1000)
+        self._antrean = queue.Queue()
+        self._lock_tutup = threading.Lock()
+        self._ditutup = False
+        self._statistik = {"baris": 0, "grup": 0, "gagal": 0}
+        self._thread = threading.Thread(target=self._loop, name="penulis-tunggal", daemon=True)
+        self._thread.start()
+        atexit.register(self.tutup) # Antrean tetap di-flush saat proses berhenti normal
+
+    def kirim(self, query: str, params: tuple, setelah_commit=None) -> Future:
+        """Memasukkan satu INSERT ke antrean. Future selesai setelah grupnya di-commit
+        dan setelah_commit(id_baru) (jika ada) selesai dijalankan."""
+        future = Future()
+        with self._lock_tutup:
+            if self._ditutup:
+                future.set_exception(RuntimeError("PenulisTunggal sudah ditutup"))
+            else:
+                self._antrean.put((query, params, future, setelah_commit))
+        return future
+
+    def _loop(self):
+        berhenti = False
+        while not berhenti:
+            item = self._antrean.get()
+            if item is _SELESAI: break
+            grup = [item]
+            batas_waktu = time.monotonic() + self.interval_detik
+            while len(grup) < self.ukuran_grup:
+                sisa = batas_waktu - time.monotonic()
+                try:
+                    item = self._antrean.get(timeout=sisa) if sisa > 0 else self._antrean.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _SELESAI:
+                    berhenti = True; break
+                grup.append(item)
+            try:
+                self._tulis_grup(grup)
+            except Exception as e: # Jaring pengaman: thread penulis tidak boleh mati diam-diam
+                print(f"ERROR [penulis_tunggal.py] Grup {len(grup)} baris gagal tak terduga: {type(e).__name__} - {e}")
+                for _, _, future, _ in grup:
+                    if not future.done():
+                        future.set_exception(e); self._statistik["gagal"] += 1
+
+    def _tulis_grup(self, grup: list):
+        # Tandai Future sebagai berjalan; yang sudah dibatalkan pemanggil dibuang dari grup
+        grup = [item for item in grup if item[2].set_running_or_notify_cancel()]
+        if not grup: return
+        conn = database.get_db_connection(self.pool) # Koneksi pool milik thread penulis
+        if not conn:
+            for _, _, future, _ in grup: future.set_exception(sqlite3.OperationalError("Koneksi DB gagal"))
+            self._statistik["gagal"] += len(grup); return
+        hasil = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.cursor()
+            for query, params, future, setelah_commit in grup:
+                try:
+                    cursor.execute(query, params)
+                    hasil.append((future, cursor.lastrowid, None, setelah_commit))
+                except sqlite3.Error as e: # Hanya statement ini yang batal, transaksi grup tetap jalan
+                    hasil.append((future, None, e, None))
+            conn.commit()
+        except Exception as e:
+            print(f"ERROR [penulis_tunggal.py] Commit grup {len(grup)} baris gagal: {e}")
+            if conn.in_transaction: conn.rollback()
+            for _, _, future, _ in grup: future.set_exception(e)
+            self._statistik["gagal"] += len(grup); return
+        self._statistik["grup"] += 1
+        for future, id_baru, error, setelah_commit in hasil:
+            if error is None:
+                if setelah_commit is not None:
+                    try: setelah_commit(id_baru)
+                    except Exception as e: # Baris sudah tersimpan; jangan gagalkan Future-nya
+                        print(f"ERROR [penulis_tunggal.py] setelah_commit gagal untuk id {id_baru}: {e}")
+                future.set_result(id_baru); self._statistik["baris"] += 1
+            else:
+                future.set_exception(error); self._statistik["gagal"] += 1
+
+    def tutup(self, timeout: float | None = None):
+        """Menolak kiriman baru, menyimpan semua yang masih di antrean, lalu menghentikan thread."""
+        with self._lock_tutup:
+            if self._ditutup: return
+            self._ditutup = True
+            self._antrean.put(_SELESAI)
+        self._thread.join(timeout)
+
+    def statistik(self) -> dict:
+        return dict(self._statistik, antrean=self._antrean.qsize())
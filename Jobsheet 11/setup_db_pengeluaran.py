@@ -1,26 +1,17 @@
 # setup_db_pengeluaran.py
 import sqlite3
 import os
+import sys
 from konfigurasi import DB_PATH # Ambil path dari konfigurasi
+import migrasi
 
 def setup_database():
     print(f"Memeriksa/membuat database di: {DB_PATH}")
     conn = None
     try:
         conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        sql_create_table = """
-        CREATE TABLE IF NOT EXISTS transaksi (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            deskripsi TEXT NOT NULL,
-            jumlah REAL NOT NULL CHECK(jumlah > 0),
-            kategori TEXT,
-            tanggal DATE NOT NULL
-        );"""
-        print(" Membuat tabel 'transaksi' (jika belum ada)...")
-        cursor.execute(sql_create_table)
-        conn.commit()
-        print(" -> Tabel 'transaksi' siap.")
+        versi = migrasi.jalankan_migrasi(conn) # DDL dibagi dengan database.setup_database_initial
+        print(f" -> Skema database siap (versi {versi}).")
         return True
     except sqlite3.Error as e:
         print(f" -> Error SQLite saat setup: {e}")
@@ -30,10 +21,26 @@ def setup_database():
             conn.close()
             print(" -> Koneksi DB setup ditutup.")
 
+def bangun_ulang_ringkasan():
+    """Menghitung ulang tabel ringkasan_harian dari transaksi (perbaikan drift)."""
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        jumlah_baris = migrasi.bangun_ulang_ringkasan(conn)
+        print(f" -> Ringkasan harian dibangun ulang ({jumlah_baris} baris).")
+        return True
+    except sqlite3.Error as e:
+        print(f" -> Error SQLite saat bangun ulang ringkasan: {e}")
+        return False
+    finally:
+        if conn: conn.close()
+
 if __name__ == "__main__": # Perbaikan di sini, hilangkan spasi berlebih
     print("--- Memulai Setup Database Pengeluaran ---")
     if setup_database(): # Perbaikan di sini, hilangkan spasi berlebih
         print(f"\nSetup database '{os.path.basename(DB_PATH)}' selesai.")
+        if "--bangun-ulang-ringkasan" in sys.argv:
+            bangun_ulang_ringkasan()
     else:
         print(f"\nSetup database GAGAL.")
     print("--- Setup Database Selesai ---")
\ No newline at end of file
@@ -0,0 +1,148 @@
+# snapshot_parquet.py
+"""Snapshot tabel transaksi ke Parquet yang dipartisi per tahun/bulan (gaya Hive).
+
+Struktur folder:
+    snapshot_transaksi/tahun=2025/bulan=1/id1-5000-0.parquet
+    snapshot_transaksi/_status_snapshot.json   (id terakhir yang sudah diekspor)
+
+ekspor_snapshot() hanya menambahkan transaksi dengan id > id terakhir, jadi bisa
+dijalankan berkala (cron). Transaksi yang dihapus/diubah setelah diekspor tidak
+ikut berubah; jalankan dengan penuh=True (atau --penuh) untuk membangun ulang.
+baca_snapshot() membaca kolom dan partisi yang diminta saja, tanpa menyentuh SQLite.
+"""
+import datetime
+import json
+import os
+import shutil
+import sqlite3
+import numpy as np
+import pandas as pd
+import database
+from konfigurasi import SNAPSHOT_DIR, SNAPSHOT_UKURAN_BATCH
+
+try: # pyarrow opsional: hanya dibutuhkan oleh modul ini
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = ds = None
+
+NAMA_STATUS = "_status_snapshot.json" # Awalan '_' diabaikan pyarrow saat membaca dataset
+KOLOM_SNAPSHOT = ["id", "tanggal", "kategori", "deskripsi", "jumlah"]
+
+def _skema():
+    return pa.schema([("id", pa.int64()), ("tanggal", pa.date32()),
+                      ("kategori", pa.dictionary(pa.int32(), pa.string())), ("deskripsi", pa.string()),
+                      ("jumlah", pa.float64()), ("tahun", pa.int16()), ("bulan", pa.int8())])
+
+def _partisi():
+    return ds.partitioning(pa.schema([("tahun", pa.int16()), ("bulan", pa.int8())]), flavor="hive")
+
+def _pyarrow_tersedia() -> bool:
+    if pa is None:
+        print("ERROR [snapshot_parquet.py] Paket pyarrow belum terpasang (pip install pyarrow).")
+        return False
+    return True
+
+def status_snapshot(folder: str = SNAPSHOT_DIR) -> dict:
+    """Isi file status: id_terakhir, jumlah baris yang sudah diekspor dan waktu pembaruan terakhir."""
+    path = os.path.join(folder, NAMA_STATUS)
+    if not os.path.exists(path):
+        return {"id_terakhir": 0, "baris": 0, "diperbarui": None}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def _simpan_status(folder: str, status: dict):
+    path = os.path.join(folder, NAMA_STATUS)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(status, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def _batch_ke_tabel(baris: list):
+    """Baris SQLite (id, tanggal teks, kategori, deskripsi, jumlah) -> pyarrow.Table dengan kolom partisi."""
+    ids, tanggal, kategori, deskripsi, jumlah = zip(*baris)
+    hari = np.array(tanggal, dtype="datetime64[D]")
+    tahun = hari.astype("datetime64[Y]").astype(np.int64) + 1970
+    bulan = hari.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    return pa.table({"id": pa.array(ids, pa.int64()), "tanggal": pa.array(hari, pa.date32()),
+                     "kategori": pa.array(kategori, pa.string()).dictionary_encode(),
+                     "deskripsi": pa.array(deskripsi, pa.string()), "jumlah": pa.array(jumlah, pa.float64()),
+                     "tahun": pa.array(tahun, pa.int16()), "bulan": pa.array(bulan, pa.int8())}).cast(_skema())
+
+def ekspor_snapshot(folder: str = SNAPSHOT_DIR, ukuran_batch: int = SNAPSHOT_UKURAN_BATCH,
+                    penuh: bool = False) -> int | None:
+    """Menambahkan transaksi baru (id > id terakhir) ke snapshot Parquet.
+
+    Nama file memuat rentang id, jadi ekspor yang terputus aman diulang (file yang
+    sama ditimpa, bukan diduplikasi). Status (id terakhir) hanya maju setelah
+    semua batch terbaca dan tertulis; jika gagal di tengah, run berikutnya
+    mengulang dari id lama. Mengembalikan jumlah baris yang diekspor, atau None jika gagal.
+    """
+    if not _pyarrow_tersedia(): return None
+    if penuh and os.path.isdir(folder):
+        shutil.rmtree(folder)
+    os.makedirs(folder, exist_ok=True)
+    status = status_snapshot(folder)
+    id_terakhir = int(status["id_terakhir"])
+    sql = ("SELECT id, CAST(tanggal AS TEXT), kategori, deskripsi, jumlah FROM transaksi "
+           "WHERE id > ? ORDER BY id") # Rentang PRIMARY KEY, tanpa sort tambahan
+    jumlah = 0
+    try:
+        for baris in database.iter_query(sql, (id_terakhir,), ukuran_batch=ukuran_batch, lempar_error=True):
+            tabel = _batch_ke_tabel(baris)
+            ds.write_dataset(tabel, folder, format="parquet", partitioning=_partisi(),
+                             basename_template=f"id{baris[0][0]}-{baris[-1][0]}-{{i}}.parquet",
+                             existing_data_behavior="overwrite_or_ignore")
+            id_terakhir = int(baris[-1][0]); jumlah += len(baris)
+    except (pa.ArrowException, OSError, ValueError, sqlite3.Error) as e:
+        print(f"ERROR [snapshot_parquet.py] Ekspor snapshot gagal setelah id {id_terakhir}, status tidak diubah: {e}")
+        return None
+    if jumlah:
+        _simpan_status(folder, {"id_terakhir": id_terakhir, "baris": int(status["baris"]) + jumlah,
+                                "diperbarui": datetime.datetime.now().isoformat(timespec="seconds")})
+    return jumlah
+
+def _filter_partisi(mulai: datetime.date | None, sampai: datetime.date | None, kategori):
+    """Ekspresi filter: kondisi tahun/bulan memangkas folder partisi, kondisi tanggal menyaring baris."""
+    filter_ = None
+    def dan(kondisi):
+        nonlocal filter_
+        filter_ = kondisi if filter_ is None else filter_ & kondisi
+    tahun, bulan = ds.field("tahun"), ds.field("bulan")
+    if mulai:
+        dan((tahun > mulai.year) | ((tahun == mulai.year) & (bulan >= mulai.month)))
+        dan(ds.field("tanggal") >= pa.scalar(mulai, pa.date32()))
+    if sampai:
+        dan((tahun < sampai.year) | ((tahun == sampai.year) & (bulan <= sampai.month)))
+        dan(ds.field("tanggal") <= pa.scalar(sampai, pa.date32()))
+    if kategori:
+        dan(ds.field("kategori").isin([kategori] if isinstance(kategori, str) else list(kategori)))
+    return filter_
+
+def baca_snapshot(folder: str = SNAPSHOT_DIR, kolom: list[str] | None = None,
+                  mulai: datetime.date | None = None, sampai: datetime.date | None = None,
+                  kategori=None) -> pd.DataFrame:
+    """Membaca snapshot ke DataFrame: hanya kolom dan partisi tahun/bulan yang diminta yang dibuka.
+
+    kolom default KOLOM_SNAPSHOT; 'tahun' dan 'bulan' (kolom partisi) juga boleh diminta.
+    Tidak membuka database SQLite sama sekali.
+    """
+    if not _pyarrow_tersedia(): return pd.DataFrame()
+    if not os.path.isdir(folder):
+        print(f"ERROR [snapshot_parquet.py] Folder snapshot tidak ditemukan: {folder}"); return pd.DataFrame()
+    try:
+        dataset = ds.dataset(folder, format="parquet", partitioning=_partisi(), schema=_skema())
+        tabel = dataset.to_table(columns=kolom or KOLOM_SNAPSHOT, filter=_filter_partisi(mulai, sampai, kategori))
+    except (pa.ArrowException, OSError, ValueError) as e:
+        print(f"ERROR [snapshot_parquet.py] Baca snapshot gagal: {e}"); return pd.DataFrame()
+    df = tabel.to_pandas(date_as_object=False) # tanggal jadi datetime64, bukan objek date per baris
+    if "id" in df.columns:
+        df = df.sort_values("id", ignore_index=True) # Urutan file antar partisi tidak dijamin
+    return df
+
+if __name__ == "__main__":
+    import sys
+    argumen = [a for a in sys.argv[1:] if not a.startswith("--")]
+    folder = argumen[0] if argumen else SNAPSHOT_DIR
+    jumlah = ekspor_snapshot(folder, penuh="--penuh" in sys.argv)
+    if jumlah is None: sys.exit(1)
+    print(f"{jumlah} transaksi baru diekspor ke {folder} (status: {status_snapshot(folder)}).")
@@ -0,0 +1,259 @@
+# indeks_spasial.py
+"""Indeks spasial berbasis grid untuk kueri "apa yang dekat titik ini".
+
+Titik dikelompokkan ke sel grid berukuran kira-kira `ukuran_sel_km` x `ukuran_sel_km`
+(sel bujur dilebarkan dengan 1/cos(lintang acuan) agar mendekati persegi di lapangan).
+Kueri hanya memeriksa sel di sekitar titik, lalu jarak dihitung dengan haversine.
+
+Mendukung k-terdekat, radius (haversine), dan bounding box; titik bisa ditambah
+bertahap dengan tambah(), dan indeks bisa disimpan/dimuat (.npz).
+"""
+import math
+import numpy as np
+from objek_data_pandas import Lokasi
+
+RADIUS_BUMI_KM = 6371.0088
+KM_PER_DERAJAT = math.pi * RADIUS_BUMI_KM / 180.0
+
+
+def jarak_haversine(lat1, lon1, lat2, lon2):
+    """Jarak lingkaran besar (km) antara titik-titik; menerima skalar atau array NumPy."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2.0) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2)
+    return 2.0 * RADIUS_BUMI_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class IndeksSpasial:
+    """Grid index: setiap sel menyimpan array id, latitude, dan longitude titiknya.
+
+    Id adalah posisi titik di koleksi asal (mis. LokasiCollection), jadi hasil kueri
+    bisa langsung dipakai sebagai indeks: koleksi[ids].
+    """
+
+    def __init__(self, ukuran_sel_km: float = 1.0, lat_acuan: float | None = None):
+        self.ukuran_sel_km = float(ukuran_sel_km)
+        self.lat_acuan = lat_acuan # Ditentukan dari batch pertama jika None
+        self._sel = {} # (baris, kolom) -> (ids, lat, lon)
+        self._jumlah = 0
+        self._id_berikut = 0
+        self._batas_sel = None # (baris_min, kolom_min, baris_maks, kolom_maks)
+        self._derajat_lat = self._derajat_lon = None
+        if lat_acuan is not None:
+            self._siapkan_grid(np.empty(0))
+
+    # --- Pembuatan indeks ---
+    @classmethod
+    def dari_koleksi(cls, koleksi, ukuran_sel_km: float = 1.0) -> "IndeksSpasial":
+        """Bangun indeks dari LokasiCollection atau list objek Lokasi."""
+        indeks = cls(ukuran_sel_km)
+        if hasattr(koleksi, 'latitude') and not isinstance(koleksi, Lokasi):
+            indeks.tambah(koleksi.latitude, koleksi.longitude)
+        elif koleksi:
+            lat, lon = zip(*(lok.get_koordinat() for lok in koleksi))
+            indeks.tambah(lat, lon)
+        return indeks
+
+    def _siapkan_grid(self, latitude: np.ndarray):
+        if self.lat_acuan is None:
+            self.lat_acuan = float(np.mean(latitude)) if len(latitude) else 0.0
+        self._derajat_lat = self.ukuran_sel_km / KM_PER_DERAJAT
+        # Dibatasi agar sel bujur tidak meledak di dekat kutub
+        self._derajat_lon = self._derajat_lat / max(math.cos(math.radians(self.lat_acuan)), 0.01)
+
+    def _sel_dari(self, latitude, longitude):
+        baris = np.floor(np.asarray(latitude) / self._derajat_lat).astype(np.int64)
+        kolom = np.floor(np.asarray(longitude) / self._derajat_lon).astype(np.int64)
+        return baris, kolom
+
+    def tambah(self, latitude, longitude, ids=None) -> np.ndarray:
+        """Tambahkan titik ke indeks. Tanpa `ids`, id dilanjutkan dari titik terakhir.
+        Titik dengan koordinat NaN dilewati. Mengembalikan id titik yang ditambahkan."""
+        latitude = np.asarray(latitude, dtype=np.float64).ravel()
+        longitude = np.asarray(longitude, dtype=np.float64).ravel()
+        if ids is None:
+            ids = np.arange(self._id_berikut, self._id_berikut + len(latitude), dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64).ravel()
+        if len(ids):
+            self._id_berikut = max(self._id_berikut, int(ids.max()) + 1)
+        valid = ~(np.isnan(latitude) | np.isnan(longitude))
+        latitude, longitude, ids = latitude[valid], longitude[valid], ids[valid]
+        if not len(ids):
+            return ids
+        if self._derajat_lat is None:
+            self._siapkan_grid(latitude)
+
+        baris, kolom = self._sel_dari(latitude, longitude)
+        # Kelompokkan titik baru per sel, lalu sambung ke isi sel yang sudah ada
+        urutan = np.lexsort((kolom, baris))
+        baris, kolom = baris[urutan], kolom[urutan]
+        lat_urut, lon_urut, ids_urut = latitude[urutan], longitude[urutan], ids[urutan]
+        awal = np.flatnonzero(np.r_[True, (baris[1:] != baris[:-1]) | (kolom[1:] != kolom[:-1])])
+        for a, b in zip(awal, np.r_[awal[1:], len(baris)]):
+            kunci = (int(baris[a]), int(kolom[a]))
+            baru = (ids_urut[a:b], lat_urut[a:b], lon_urut[a:b])
+            lama = self._sel.get(kunci)
+            self._sel[kunci] = baru if lama is None else tuple(np.concatenate(p) for p in zip(lama, baru))
+
+        batas = (int(baris.min()), int(kolom.min()), int(baris.max()), int(kolom.max()))
+        if self._batas_sel is not None:
+            batas = (min(batas[0], self._batas_sel[0]), min(batas[1], self._batas_sel[1]),
+                     max(batas[2], self._batas_sel[2]), max(batas[3], self._batas_sel[3]))
+        self._batas_sel = batas
+        self._jumlah += len(ids)
+        return ids
+
+    def __len__(self) -> int:
+        return self._jumlah
+
+    def __repr__(self) -> str:
+        return f"IndeksSpasial({self._jumlah} titik, {len(self._sel)} sel, sel {self.ukuran_sel_km} km)"
+
+    # --- Kueri ---
+    def _kumpulkan(self, kunci_sel, mask=None):
+        """Gabungkan isi beberapa sel menjadi (ids, lat, lon), opsional disaring `mask[ids]`."""
+        bagian = [self._sel[k] for k in kunci_sel if k in self._sel]
+        if not bagian:
+            kosong = np.empty(0)
+            return kosong.astype(np.int64), kosong, kosong
+        ids, lat, lon = (np.concatenate(p) for p in zip(*bagian))
+        if mask is not None:
+            pilih = np.asarray(mask, dtype=bool)[ids]
+            ids, lat, lon = ids[pilih], lat[pilih], lon[pilih]
+        return ids, lat, lon
+
+    def _sel_persegi(self, baris_min, kolom_min, baris_maks, kolom_maks):
+        if self._batas_sel is None:
+            return []
+        # Potong ke sel yang memang berisi data
+        baris_min, kolom_min = max(baris_min, self._batas_sel[0]), max(kolom_min, self._batas_sel[1])
+        baris_maks, kolom_maks = min(baris_maks, self._batas_sel[2]), min(kolom_maks, self._batas_sel[3])
+        jumlah_sel = (baris_maks - baris_min + 1) * (kolom_maks - kolom_min + 1)
+        if jumlah_sel <= 0:
+            return []
+        if jumlah_sel > len(self._sel):
+            # Kotak lebih besar dari jumlah sel terisi: cukup periksa sel yang ada
+            return [k for k in self._sel
+                    if baris_min <= k[0] <= baris_maks and kolom_min <= k[1] <= kolom_maks]
+        return [(b, k) for b in range(baris_min, baris_maks + 1) for k in range(kolom_min, kolom_maks + 1)]
+
+    def dalam_bbox(self, lat_min: float, lon_min: float, lat_maks: float, lon_maks: float,
+                   mask=None) -> np.ndarray:
+        """Id titik di dalam kotak batas (inklusif), terurut naik."""
+        if not self._jumlah:
+            return np.empty(0, dtype=np.int64)
+        b0, k0 = self._sel_dari(lat_min, lon_min)
+        b1, k1 = self._sel_dari(lat_maks, lon_maks)
+        ids, lat, lon = self._kumpulkan(self._sel_persegi(int(b0), int(k0), int(b1), int(k1)), mask)
+        pilih = (lat >= lat_min) & (lat <= lat_maks) & (lon >= lon_min) & (lon <= lon_maks)
+        return np.sort(ids[pilih])
+
+    def dalam_radius(self, lat: float, lon: float, radius_km: float, mask=None) -> tuple[np.ndarray, np.ndarray]:
+        """Titik dalam radius (km, haversine) dari (lat, lon). Mengembalikan (ids, jarak_km),
+        terurut dari yang terdekat."""
+        if not self._jumlah:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        d_lat = radius_km / KM_PER_DERAJAT
+        d_lon = d_lat / max(math.cos(math.radians(min(abs(lat) + d_lat, 89.9))), 0.01)
+        b0, k0 = self._sel_dari(lat - d_lat, lon - d_lon)
+        b1, k1 = self._sel_dari(lat + d_lat, lon + d_lon)
+        ids, lat_c, lon_c = self._kumpulkan(self._sel_persegi(int(b0), int(k0), int(b1), int(k1)), mask)
+        jarak = jarak_haversine(lat, lon, lat_c, lon_c)
+        pilih = jarak <= radius_km
+        ids, jarak = ids[pilih], jarak[pilih]
+        urutan = np.argsort(jarak, kind='stable')
+        return ids[urutan], jarak[urutan]
+
+    def terdekat(self, lat: float, lon: float, k: int = 1, mask=None) -> tuple[np.ndarray, np.ndarray]:
+        """k titik terdekat dari (lat, lon). Mengembalikan (ids, jarak_km), terurut naik.
+
+        Sel diperiksa cincin demi cincin dari sel titik kueri; pencarian berhenti saat
+        jarak ke-k sudah tidak mungkin dikalahkan titik di cincin berikutnya.
+        """
+        if not self._jumlah or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        b, kol = (int(v) for v in self._sel_dari(lat, lon))
+        # Lebar sel terkecil (km) di sekitar titik kueri: batas bawah jarak per cincin
+        lebar_km = min(self._derajat_lat, self._derajat_lon * math.cos(math.radians(lat))) * KM_PER_DERAJAT
+        b_min, k_min, b_maks, k_maks = self._batas_sel
+        # Cincin pertama yang menyentuh grid sampai cincin yang menutup seluruh grid
+        cincin_awal = max(0, b - b_maks, b_min - b, kol - k_maks, k_min - kol)
+        cincin_maks = max(abs(b - b_min), abs(b - b_maks), abs(kol - k_min), abs(kol - k_maks))
+        ids_all, jarak_all = [], []
+        terkumpul = 0
+        for r in range(cincin_awal, cincin_maks + 1):
+            if r == 0:
+                kunci = [(b, kol)]
+            elif 8 * r > len(self._sel):
+                # Cincin lebih panjang dari jumlah sel terisi: saring sel yang ada saja
+                kunci = [s for s in self._sel if max(abs(s[0] - b), abs(s[1] - kol)) == r]
+            else:
+                kunci = ([(b - r, c) for c in range(kol - r, kol + r + 1)]
+                         + [(b + r, c) for c in range(kol - r, kol + r + 1)]
+                         + [(br, kol - r) for br in range(b - r + 1, b + r)]
+                         + [(br, kol + r) for br in range(b - r + 1, b + r)])
+            ids, lat_c, lon_c = self._kumpulkan(kunci, mask)
+            if len(ids):
+                ids_all.append(ids)
+                jarak_all.append(jarak_haversine(lat, lon, lat_c, lon_c))
+                terkumpul += len(ids)
+            if terkumpul >= k:
+                jarak_k = np.partition(np.concatenate(jarak_all), k - 1)[k - 1]
+                # Titik di luar cincin r berjarak minimal r * lebar sel dari titik kueri
+                if jarak_k <= r * lebar_km:
+                    break
+        if not ids_all:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ids, jarak = np.concatenate(ids_all), np.concatenate(jarak_all)
+        urutan = np.argsort(jarak, kind='stable')[:k]
+        return ids[urutan], jarak[urutan]
+
+    # --- Simpan / muat ---
+    def _semua_titik(self):
+        if not self._sel:
+            kosong = np.empty(0)
+            return kosong.astype(np.int64), kosong, kosong
+        return tuple(np.concatenate(p) for p in zip(*self._sel.values()))
+
+    def simpan(self, path: str) -> bool:
+        """Simpan indeks ke file .npz (titik + parameter grid)."""
+        ids, lat, lon = self._semua_titik()
+        try:
+            np.savez_compressed(path, ids=ids, latitude=lat, longitude=lon,
+                                ukuran_sel_km=self.ukuran_sel_km,
+                                lat_acuan=np.nan if self.lat_acuan is None else self.lat_acuan,
+                                id_berikut=self._id_berikut)
+            return True
+        except OSError as e:
+            print(f"ERROR: Gagal menyimpan indeks spasial ke '{path}': {e}")
+            return False
+
+    @classmethod
+    def muat(cls, path: str) -> "IndeksSpasial | None":
+        """Muat indeks dari file .npz hasil simpan(); grid dibangun ulang secara tervektorisasi."""
+        try:
+            with np.load(path) as data:
+                lat_acuan = float(data['lat_acuan'])
+                indeks = cls(float(data['ukuran_sel_km']), None if math.isnan(lat_acuan) else lat_acuan)
+                indeks.tambah(data['latitude'], data['longitude'], data['ids'])
+                indeks._id_berikut = max(indeks._id_berikut, int(data['id_berikut']))
+            return indeks
+        except (OSError, KeyError, ValueError) as e:
+            print(f"ERROR: Gagal memuat indeks spasial dari '{path}': {e}")
+            return None
+
+
+# --- Kode Utama ---
+if __name__ == "__main__":
+    from koleksi_lokasi import LokasiCollection
+    from objek_data_pandas import Kuliner
+
+    koleksi = LokasiCollection.dari_csv("lokasi_semarang.csv")
+    indeks = IndeksSpasial.dari_koleksi(koleksi, ukuran_sel_km=0.5)
+    print(indeks)
+
+    LAWANG_SEWU = (-6.9840, 110.4105)
+    ids, jarak = indeks.terdekat(*LAWANG_SEWU, k=3, mask=koleksi.mask_kelas(Kuliner))
+    print("Kuliner terdekat dari Lawang Sewu:")
+    for i, d in zip(ids, jarak):
+        print(f"  {koleksi[int(i)]} - {d:.2f} km")
@@ -0,0 +1,260 @@
+# koleksi_lokasi.py
+"""Koleksi lokasi kolumnar: data disimpan sebagai array NumPy, bukan list objek.
+
+Latitude/longitude disimpan sebagai array float64, Tipe sebagai kode kategori,
+kelas objek sebagai kode int8 (indeks ke KELAS_LOKASI), lalu Nama, Deskripsi dan
+atribut khusus kelas (jenis_wisata/agama) sebagai array string yang di-intern
+(nilai yang sama berbagi satu objek str). Objek Lokasi (TempatWisata/Kuliner/TempatIbadah) baru dibuat
+saat elemen diakses, jadi koleksi jutaan baris tidak menyimpan jutaan objek.
+"""
+import sys
+import numpy as np
+import pandas as pd
+from objek_data_pandas import (AGAMA_DARI_TIPE, Kuliner, Lokasi, TempatIbadah,
+                               TempatWisata, baca_data_lokasi_bertahap)
+
+
+# Urutan kelas = nilai kode_kelas; jangan diubah agar kode tetap konsisten
+KELAS_LOKASI = (TempatWisata, Kuliner, TempatIbadah)
+KODE_KELAS = {kelas: kode for kode, kelas in enumerate(KELAS_LOKASI)}
+
+
+# --- Klasifikasi per kategori Tipe ---
+def _kelas_untuk_tipe(tipe: str):
+    """Kembalikan (kelas, atribut) untuk satu nilai Tipe; kelas None jika tidak dikenali.
+    Atribut = jenis_wisata untuk TempatWisata, agama untuk TempatIbadah, '' untuk Kuliner.
+    Aturannya sama dengan buat_objek_lokasi_dari_df."""
+    if 'Wisata' in tipe or tipe == 'Landmark':
+        return TempatWisata, tipe
+    if tipe == 'Kuliner':
+        return Kuliner, ''
+    if 'Ibadah' in tipe:
+        agama = next((nilai for kata, nilai in AGAMA_DARI_TIPE.items() if kata in tipe), "Umum")
+        return TempatIbadah, agama
+    return None, None
+
+
+def _kolom_dari_objek(objek: Lokasi) -> tuple[int, str, str, str]:
+    """Kembalikan (kode_kelas, atribut, tipe, deskripsi) dari objek Lokasi yang sudah ada.
+    Kelas dicocokkan persis (bukan isinstance) agar objek bisa dibuat ulang tanpa kehilangan data."""
+    kode = KODE_KELAS.get(type(objek))
+    if kode is None:
+        raise TypeError(f"Kelas lokasi tidak didukung LokasiCollection: {type(objek).__name__}")
+    if isinstance(objek, TempatWisata):
+        return kode, objek.jenis_wisata, objek.jenis_wisata, objek.deskripsi
+    if isinstance(objek, Kuliner):
+        return kode, '', 'Kuliner', objek.menu_andalan
+    kata = next((k for k, nilai in AGAMA_DARI_TIPE.items() if nilai == objek.agama), None)
+    if kata is None and objek.agama != "Umum":
+        kata = objek.agama
+    return kode, objek.agama, (f"Tempat Ibadah {kata}" if kata else "Tempat Ibadah"), objek.deskripsi
+
+
+def _intern_array(nilai) -> np.ndarray:
+    """Array object berisi str yang di-intern: tiap nilai unik hanya disimpan sekali."""
+    kode, unik = pd.factorize(pd.Series(nilai, dtype=object).fillna('').astype(str))
+    unik = np.array([sys.intern(s) for s in unik], dtype=object)
+    return unik[kode] if len(unik) else np.empty(len(kode), dtype=object)
+
+
+# --- Kelas Koleksi ---
+class LokasiCollection:
+    """Kumpulan lokasi dalam bentuk kolom (array NumPy) dengan akses objek on-demand."""
+
+    def __init__(self, nama, latitude, longitude, kode_kelas, atribut, kode_tipe, kategori_tipe, deskripsi):
+        self.nama = np.asarray(nama, dtype=object)
+        self.latitude = np.asarray(latitude, dtype=np.float64)
+        self.longitude = np.asarray(longitude, dtype=np.float64)
+        self.kode_kelas = np.asarray(kode_kelas, dtype=np.int8)
+        self.atribut = np.asarray(atribut, dtype=object)
+        self.kode_tipe = np.asarray(kode_tipe, dtype=np.int32)
+        self.kategori_tipe = tuple(kategori_tipe)
+        self.deskripsi = np.asarray(deskripsi, dtype=object)
+
+    # --- Pembuatan koleksi ---
+    @classmethod
+    def kosong(cls) -> "LokasiCollection":
+        return cls([], [], [], [], [], [], (), [])
+
+    @classmethod
+    def dari_dataframe(cls, dataframe: pd.DataFrame) -> "LokasiCollection":
+        """Buat koleksi dari DataFrame berkolom Nama, Latitude, Longitude, Tipe, Deskripsi.
+        Baris tidak valid/tipe tidak dikenali dilewati dan dilaporkan sekaligus."""
+        if dataframe is None or dataframe.empty:
+            print("DataFrame kosong atau None, koleksi kosong dibuat.")
+            return cls.kosong()
+        df = dataframe.rename(columns=lambda kolom: str(kolom).strip())
+        if not {'Nama', 'Latitude', 'Longitude'}.issubset(df.columns):
+            print("  -> Melewati semua baris: Kolom Nama/Latitude/Longitude tidak lengkap.")
+            return cls.kosong()
+
+        lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=np.float64)
+        lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=np.float64)
+        tipe = df['Tipe'].astype(object).fillna('').astype(str) if 'Tipe' in df.columns else pd.Series('Lainnya', index=df.index)
+        kategori = pd.Categorical(tipe)
+        # Kelas dan atribut dihitung per kategori, lalu disebar ke baris lewat kode kategori
+        per_kategori = [_kelas_untuk_tipe(t) for t in kategori.categories]
+        kelas_kategori = np.array([KODE_KELAS.get(k, -1) for k, _ in per_kategori], dtype=np.int8)
+        atribut_kategori = _intern_array([a for _, a in per_kategori])
+        kode = kategori.codes
+
+        valid = df['Nama'].notna().to_numpy() & ~np.isnan(lat) & ~np.isnan(lon)
+        dikenali = kelas_kategori[kode] >= 0 if len(kelas_kategori) else np.zeros(len(df), dtype=bool)
+        if (~valid).any():
+            print(f"  -> Melewati {int((~valid).sum())} baris: Data Nama/Latitude/Longitude tidak lengkap/tidak valid.")
+        if (valid & ~dikenali).any():
+            print(f"  -> Peringatan: {int((valid & ~dikenali).sum())} baris bertipe tidak dikenali dilewati.")
+
+        pilih = valid & dikenali
+        deskripsi = df['Deskripsi'][pilih] if 'Deskripsi' in df.columns else [''] * int(pilih.sum())
+        kode = kode[pilih]
+        return cls(_intern_array(df['Nama'][pilih].to_numpy()), lat[pilih], lon[pilih],
+                   kelas_kategori[kode], atribut_kategori[kode], kode, kategori.categories,
+                   _intern_array(deskripsi))
+
+    @classmethod
+    def dari_list(cls, list_objek: list) -> "LokasiCollection":
+        """Buat koleksi dari list objek Lokasi yang sudah ada.
+        Raises TypeError jika ada objek di luar KELAS_LOKASI (termasuk subclass)."""
+        if not list_objek:
+            return cls.kosong()
+        kode_kelas, atribut, tipe, deskripsi = zip(*map(_kolom_dari_objek, list_objek))
+        kategori = pd.Categorical(tipe)
+        return cls(_intern_array([lok.nama for lok in list_objek]),
+                   [lok.latitude for lok in list_objek], [lok.longitude for lok in list_objek],
+                   kode_kelas, _intern_array(atribut), kategori.codes, kategori.categories,
+                   _intern_array(deskripsi))
+
+    @classmethod
+    def dari_csv(cls, nama_file: str, ukuran_chunk: int = 100_000,
+                 lewati_baris_rusak: bool = True) -> "LokasiCollection":
+        """Baca CSV per chunk (baca_data_lokasi_bertahap) lalu gabungkan.
+        Baris dengan jumlah kolom salah dilewati, kecuali lewati_baris_rusak=False."""
+        return cls.gabung([cls.dari_dataframe(chunk) for chunk in baca_data_lokasi_bertahap(
+            nama_file, ukuran_chunk, lewati_baris_rusak=lewati_baris_rusak)])
+
+    @classmethod
+    def gabung(cls, daftar_koleksi: list) -> "LokasiCollection":
+        """Gabungkan beberapa koleksi; kategori Tipe disatukan dan kode dipetakan ulang."""
+        daftar_koleksi = [k for k in daftar_koleksi if len(k)]
+        if not daftar_koleksi:
+            return cls.kosong()
+        kategori = list(dict.fromkeys(t for k in daftar_koleksi for t in k.kategori_tipe))
+        posisi = {t: i for i, t in enumerate(kategori)}
+        kode = [np.array([posisi[t] for t in k.kategori_tipe], dtype=np.int32)[k.kode_tipe]
+                for k in daftar_koleksi]
+        return cls(np.concatenate([k.nama for k in daftar_koleksi]),
+                   np.concatenate([k.latitude for k in daftar_koleksi]),
+                   np.concatenate([k.longitude for k in daftar_koleksi]),
+                   np.concatenate([k.kode_kelas for k in daftar_koleksi]),
+                   np.concatenate([k.atribut for k in daftar_koleksi]),
+                   np.concatenate(kode), kategori,
+                   np.concatenate([k.deskripsi for k in daftar_koleksi]))
+
+    # --- Akses elemen ---
+    def __len__(self) -> int:
+        return len(self.latitude)
+
+    def __getitem__(self, kunci):
+        """Indeks int -> objek Lokasi baru; slice/mask/array indeks -> LokasiCollection."""
+        if isinstance(kunci, (int, np.integer)):
+            return self._buat_objek(int(kunci))
+        return self._ambil(kunci)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._buat_objek(i)
+
+    def __repr__(self) -> str:
+        return f"LokasiCollection({len(self)} lokasi, {len(self.kategori_tipe)} tipe)"
+
+    def _buat_objek(self, i: int) -> Lokasi:
+        if i < 0:
+            i += len(self)
+        kelas = KELAS_LOKASI[self.kode_kelas[i]]
+        nama, lat, lon, deskripsi = self.nama[i], self.latitude[i], self.longitude[i], self.deskripsi[i]
+        if kelas is TempatWisata:
+            return TempatWisata(nama, lat, lon, self.atribut[i], deskripsi)
+        if kelas is Kuliner:
+            return Kuliner(nama, lat, lon, deskripsi)
+        if kelas is TempatIbadah:
+            return TempatIbadah(nama, lat, lon, self.atribut[i], deskripsi)
+        raise TypeError(f"Kode kelas tidak dikenali: {self.kode_kelas[i]}")
+
+    def _ambil(self, kunci) -> "LokasiCollection":
+        """Subset koleksi. Slice menghasilkan view array (tanpa salinan)."""
+        return LokasiCollection(self.nama[kunci], self.latitude[kunci], self.longitude[kunci],
+                                self.kode_kelas[kunci], self.atribut[kunci],
+                                self.kode_tipe[kunci], self.kategori_tipe, self.deskripsi[kunci])
+
+    def ke_list(self) -> list:
+        """Materialisasi semua elemen menjadi list objek Lokasi."""
+        return list(self)
+
+    def ke_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            'Nama': self.nama, 'Latitude': self.latitude, 'Longitude': self.longitude,
+            'Tipe': pd.Categorical.from_codes(self.kode_tipe, self.kategori_tipe),
+            'Deskripsi': self.deskripsi,
+        })
+
+    def koordinat(self) -> np.ndarray:
+        """Array (n, 2) berisi [latitude, longitude]."""
+        return np.column_stack((self.latitude, self.longitude))
+
+    # --- Operasi tervektorisasi ---
+    def mask_kelas(self, kelas: type) -> np.ndarray:
+        """Mask baris yang objeknya berkelas `kelas` (mis. Kuliner)."""
+        kode_cocok = [kode for kode, k in enumerate(KELAS_LOKASI) if issubclass(k, kelas)]
+        return np.isin(self.kode_kelas, kode_cocok)
+
+    def saring(self, kelas: type | None = None, tipe: str | list | None = None,
+               nama_mengandung: str | None = None) -> "LokasiCollection":
+        """Saring berdasarkan kelas objek, nilai Tipe (persis), dan/atau potongan nama."""
+        mask = np.ones(len(self), dtype=bool)
+        if kelas is not None:
+            mask &= self.mask_kelas(kelas)
+        if tipe is not None:
+            daftar_tipe = [tipe] if isinstance(tipe, str) else list(tipe)
+            kode_cocok = [i for i, t in enumerate(self.kategori_tipe) if t in daftar_tipe]
+            mask &= np.isin(self.kode_tipe, kode_cocok)
+        if nama_mengandung:
+            mask &= pd.Series(self.nama, dtype=object).str.contains(
+                nama_mengandung, case=False, regex=False).to_numpy(dtype=bool)
+        return self._ambil(mask)
+
+    def dalam_bbox(self, lat_min: float, lon_min: float, lat_maks: float, lon_maks: float) -> "LokasiCollection":
+        """Lokasi di dalam kotak batas (inklusif)."""
+        mask = ((self.latitude >= lat_min) & (self.latitude <= lat_maks)
+                & (self.longitude >= lon_min) & (self.longitude <= lon_maks))
+        return self._ambil(mask)
+
+    def bbox(self) -> tuple | None:
+        """Kotak batas (lat_min, lon_min, lat_maks, lon_maks); None jika koleksi kosong."""
+        if not len(self):
+            return None
+        return (float(self.latitude.min()), float(self.longitude.min()),
+                float(self.latitude.max()), float(self.longitude.max()))
+
+    def jumlah_per_tipe(self) -> dict:
+        hitung = np.bincount(self.kode_tipe, minlength=len(self.kategori_tipe))
+        return {t: int(n) for t, n in zip(self.kategori_tipe, hitung) if n}
+
+    def ukuran_memori(self) -> int:
+        """Perkiraan memori (byte): array + string unik (string yang di-intern dihitung sekali)."""
+        total = sum(a.nbytes for a in (self.nama, self.latitude, self.longitude, self.kode_kelas,
+                                       self.atribut, self.kode_tipe, self.deskripsi))
+        unik = {id(s): s for s in np.concatenate((self.nama, self.deskripsi, self.atribut))}
+        return total + sum(sys.getsizeof(s) for s in unik.values())
+
+
+# --- Kode Utama ---
+if __name__ == "__main__":
+    NAMA_FILE_CSV = "lokasi_semarang.csv"
+
+    koleksi = LokasiCollection.dari_csv(NAMA_FILE_CSV)
+    print(koleksi)
+    print("Jumlah per tipe:", koleksi.jumlah_per_tipe())
+    print("Kotak batas:", koleksi.bbox())
+    for lok in koleksi.saring(kelas=Kuliner):
+        print(" ", repr(lok))
@@ -1,4 +1,6 @@
+import json
 import pandas as pd
+import numpy as np
 from abc import ABC, abstractmethod # Diperlukan untuk definisi kelas
 
 # --- Definisi Kelas (Salin dari Praktikum 3) ---
@@ -76,11 +78,82 @@ def baca_data_lokasi(nama_file: str) -> pd.DataFrame | None:
         return None
 
 
+def _rapikan_chunk(chunk: pd.DataFrame, dtype_koordinat: str) -> pd.DataFrame:
+    """Rapikan nama kolom dan paksa dtype koordinat/Tipe pada satu chunk."""
+    chunk = chunk.rename(columns=lambda kolom: str(kolom).strip())
+    for kolom in ('Latitude', 'Longitude'):
+        if kolom in chunk.columns:
+            chunk[kolom] = pd.to_numeric(chunk[kolom], errors='coerce').astype(dtype_koordinat)
+    if 'Tipe' in chunk.columns and not isinstance(chunk['Tipe'].dtype, pd.CategoricalDtype):
+        chunk['Tipe'] = chunk['Tipe'].astype('category')
+    return chunk
+
+
+def baca_data_lokasi_bertahap(nama_file: str, ukuran_chunk: int = 100_000,
+                              dtype_koordinat: str = "float64",
+                              lewati_baris_rusak: bool = True):
+    """
+    Membaca file CSV lokasi secara bertahap (streaming), chunk demi chunk,
+    sehingga memori tidak bergantung pada ukuran file dan proses berikutnya
+    bisa mulai sebelum seluruh file selesai dibaca.
+
+    Setiap chunk sudah bertipe eksplisit: nama kolom dirapikan (spasi di ujung
+    dibuang), 'Latitude'/'Longitude' bertipe dtype_koordinat (nilai yang bukan
+    angka menjadi NaN) dan 'Tipe' bertipe category.
+
+    Args:
+        nama_file (str): Path file CSV.
+        ukuran_chunk (int): Jumlah baris per chunk.
+        dtype_koordinat (str): "float64" atau "float32". float32 hanya memperkecil
+                               DataFrame per chunk; objek Lokasi dan
+                               LokasiCollection tetap menyimpan float64.
+        lewati_baris_rusak (bool): Jika True, baris dengan jumlah kolom salah
+                                   dilewati dengan peringatan, bukan menghentikan
+                                   seluruh pembacaan.
+
+    Yields:
+        pd.DataFrame: Satu chunk data lokasi.
+
+    Raises:
+        Exception: Error setelah file berhasil dibuka (baris rusak saat
+                   lewati_baris_rusak=False, I/O error di tengah file) diteruskan
+                   ke pemanggil, agar hasil yang terpotong tidak dianggap lengkap.
+                   Error saat membuka file hanya dicetak dan tidak ada chunk.
+    """
+    try:
+        pembaca = pd.read_csv(nama_file, chunksize=ukuran_chunk, dtype={'Tipe': 'category'},
+                              on_bad_lines='warn' if lewati_baris_rusak else 'error')
+    except FileNotFoundError:
+        print(f"ERROR: File '{nama_file}' tidak ditemukan!")
+        return
+    except Exception as e:
+        print(f"ERROR saat membuka file CSV: {type(e).__name__} - {e}")
+        return
+    with pembaca:
+        for chunk in pembaca:
+            yield _rapikan_chunk(chunk, dtype_koordinat)
+
+
 # --- Fungsi Inti Praktikum Ini ---
+# Tabel kata kunci di kolom 'Tipe' -> agama TempatIbadah.
+# Urutan menentukan prioritas jika satu tipe memuat lebih dari satu kata kunci.
+AGAMA_DARI_TIPE = {
+    "Islam": "Islam",
+    "Kristen": "Kristen",
+    "Klenteng": "Tridharma",
+}
+
+
 def buat_objek_lokasi_dari_df(dataframe: pd.DataFrame) -> list:
     """
-    Mengiterasi DataFrame Pandas dan membuat list berisi objek-objek
-    Lokasi (atau turunannya) berdasarkan data di setiap baris.
+    Membuat list berisi objek-objek Lokasi (atau turunannya) dari DataFrame
+    Pandas secara tervektorisasi (tanpa iterrows).
+
+    Semua baris diklasifikasikan sekaligus dengan operasi string per kolom
+    menjadi mask TempatWisata/Kuliner/TempatIbadah, koordinat dikonversi
+    dengan pd.to_numeric, lalu objek dibuat dari tuple biasa. Baris yang
+    tidak valid atau tipenya tidak dikenali dilaporkan sekaligus di akhir.
+    Urutan objek mengikuti urutan baris di DataFrame.
 
     Args:
         dataframe (pd.DataFrame): DataFrame yang berisi data lokasi
@@ -96,56 +169,136 @@ def buat_objek_lokasi_dari_df(dataframe: pd.DataFrame) -> list:
         return list_objek_lokasi
 
     print("\nMembuat objek dari DataFrame...")
-    # Iterasi setiap baris dalam DataFrame
-    for index, row in dataframe.iterrows():
-        # Ambil data dari setiap kolom di baris saat ini
-        # Gunakan .get() dengan default value untuk antisipasi kolom hilang
-        nama = row.get('Nama', None)
-        lat = row.get('Latitude', None)
-        lon = row.get('Longitude', None)
-        tipe = row.get('Tipe', 'Lainnya') # Default jika kolom Tipe tidak ada
-        deskripsi = row.get('Deskripsi', '') # Default string kosong
-
-        objek = None
-        # Lakukan pengecekan tipe data dasar sebelum membuat objek
-        if nama is None or lat is None or lon is None:
-            print(f"  -> Melewati baris {index}: Data Nama/Latitude/Longitude tidak lengkap.")
-            continue # Lanjut ke baris berikutnya
-
-        # Membuat objek berdasarkan nilai di kolom 'Tipe'
-        try:
-            if 'Wisata' in tipe or tipe == 'Landmark':
-                objek = TempatWisata(nama, lat, lon, tipe, deskripsi)
-            elif tipe == 'Kuliner':
-                # Menggunakan kolom 'Deskripsi' sebagai 'menu_andalan' untuk contoh ini
-                # Perhatian: Kelas Kuliner yang didefinisikan tidak secara eksplisit menerima 'deskripsi'
-                # sebagai parameter langsung ke atribut self.deskripsi.
-                # Jika 'deskripsi' dari CSV ingin disimpan di Kuliner, perlu penyesuaian di __init__ Kuliner.
-                objek = Kuliner(nama, lat, lon, deskripsi)
-            elif 'Ibadah' in tipe:
-                # Bisa ekstrak info agama dari tipe jika ada, atau set default
-                agama_info = "Umum" # Default
-                if "Islam" in tipe: agama_info="Islam"
-                elif "Kristen" in tipe: agama_info="Kristen"
-                elif "Klenteng" in tipe: agama_info="Tridharma"
-                # Dst...
-                objek = TempatIbadah(nama, lat, lon, agama_info, deskripsi)
-            else:
-                print(f"  -> Peringatan: Tipe '{tipe}' untuk '{nama}' tidak dikenali. Tidak membuat objek spesifik.")
-                # Karena Lokasi abstrak, kita tidak bisa membuat objek Lokasi generik.
-                # Jika Lokasi tidak abstrak, bisa: objek = Lokasi(nama, lat, lon)
-
-            if objek:
-                list_objek_lokasi.append(objek)
-                # print(f"  -> Objek {type(objek).__name__} untuk '{nama}' dibuat.")
-
-        except Exception as e:
-            # Tangani error saat pembuatan objek (misal konversi tipe gagal di __init__)
-            print(f"  -> GAGAL membuat objek untuk '{nama}' di baris {index}: {e}")
-
-    print(f"Total {len(list_objek_lokasi)} objek lokasi berhasil dibuat dari {len(dataframe)} baris data.")
+    # Header CSV kadang punya spasi di ujung (mis. 'Deskripsi ')
+    df = dataframe.rename(columns=lambda kolom: str(kolom).strip())
+    if not {'Nama', 'Latitude', 'Longitude'}.issubset(df.columns):
+        print("  -> Melewati semua baris: Kolom Nama/Latitude/Longitude tidak lengkap.")
+        return list_objek_lokasi
+
+    # Ambil kolom sekaligus; kolom opsional diganti nilai default
+    jumlah_baris = len(df)
+    nama = df['Nama']
+    lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy(dtype=float)
+    lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy(dtype=float)
+    if 'Tipe' in df.columns:
+        # astype(object) dulu agar kolom bertipe category juga bisa diisi ''
+        tipe = df['Tipe'].astype(object).fillna('').astype(str)
+    else:
+        tipe = pd.Series('Lainnya', index=df.index)
+    if 'Deskripsi' in df.columns:
+        deskripsi = df['Deskripsi'].astype(object).fillna('').astype(str)
+    else:
+        deskripsi = pd.Series('', index=df.index)
+
+    # Baris valid: nama ada dan kedua koordinat berupa angka
+    valid = nama.notna().to_numpy() & ~np.isnan(lat) & ~np.isnan(lon)
+
+    # Klasifikasi semua baris sekaligus (prioritas: Wisata, Kuliner, lalu Ibadah)
+    is_wisata = (tipe.str.contains('Wisata', regex=False) | (tipe == 'Landmark')).to_numpy()
+    is_kuliner = (tipe == 'Kuliner').to_numpy() & ~is_wisata
+    is_ibadah = tipe.str.contains('Ibadah', regex=False).to_numpy() & ~is_wisata & ~is_kuliner
+    dikenali = is_wisata | is_kuliner | is_ibadah
+
+    # Agama dari tabel lookup; np.select memilih kata kunci pertama yang cocok
+    agama = np.select(
+        [tipe.str.contains(kata, regex=False).to_numpy() for kata in AGAMA_DARI_TIPE],
+        list(AGAMA_DARI_TIPE.values()),
+        default="Umum",
+    )
+
+    # Buat objek dari tuple biasa, lalu taruh di posisi barisnya agar urutan terjaga
+    hasil = np.empty(jumlah_baris, dtype=object)
+    nama_arr = nama.astype(str).to_numpy(dtype=object)
+    tipe_arr = tipe.to_numpy(dtype=object)
+    deskripsi_arr = deskripsi.to_numpy(dtype=object)
+
+    m = valid & is_wisata
+    hasil[m] = list(map(TempatWisata, nama_arr[m], lat[m], lon[m], tipe_arr[m], deskripsi_arr[m]))
+    # Menggunakan kolom 'Deskripsi' sebagai 'menu_andalan' untuk contoh ini
+    m = valid & is_kuliner
+    hasil[m] = list(map(Kuliner, nama_arr[m], lat[m], lon[m], deskripsi_arr[m]))
+    m = valid & is_ibadah
+    hasil[m] = list(map(TempatIbadah, nama_arr[m], lat[m], lon[m], agama[m], deskripsi_arr[m]))
+    list_objek_lokasi = hasil[valid & dikenali].tolist()
+
+    # Laporkan baris bermasalah sekaligus, bukan satu per satu
+    baris_tidak_valid = df.index[~valid]
+    if len(baris_tidak_valid):
+        print(f"  -> Melewati {len(baris_tidak_valid)} baris: Data Nama/Latitude/Longitude "
+              f"tidak lengkap/tidak valid (baris {_ringkas_indeks(baris_tidak_valid)}).")
+    tidak_dikenali = valid & ~dikenali
+    if tidak_dikenali.any():
+        tipe_asing = sorted(tipe[tidak_dikenali].unique())
+        print(f"  -> Peringatan: {int(tidak_dikenali.sum())} baris bertipe tidak dikenali "
+              f"{tipe_asing[:10]} (baris {_ringkas_indeks(df.index[tidak_dikenali])}). "
+              "Tidak membuat objek spesifik.")
+
+    print(f"Total {len(list_objek_lokasi)} objek lokasi berhasil dibuat dari {jumlah_baris} baris data.")
     return list_objek_lokasi
 
+
+def _ringkas_indeks(indeks, maks: int = 20) -> str:
+    """Ringkas daftar indeks baris untuk laporan (maksimal `maks` ditampilkan)."""
+    daftar = [str(i) for i in indeks[:maks]]
+    if len(indeks) > maks:
+        daftar.append(f"... +{len(indeks) - maks} lainnya")
+    return ", ".join(daftar)
+
+
+# --- Mode Cluster untuk Data Besar (dipakai buat_peta_lokasi_folium di log.py dan visualisasi.folium.py) ---
+MODE_PETA = ("otomatis", "marker", "cluster")
+# Di atas jumlah titik ini, peta otomatis memakai mode cluster
+AMBANG_MODE_CLUSTER = 2000
+
+# Marker dibuat di browser dari array data [lat, lon, nama, indeks_tipe, teks]; HTML popup baru
+# dirangkai saat marker diklik. Label tipe disimpan sekali di DAFTAR_TIPE, bukan per titik.
+CALLBACK_MARKER_LAZY = """
+(function () {
+    var DAFTAR_TIPE = __DAFTAR_TIPE__;
+    return function (row) {
+        var marker = L.marker(new L.LatLng(row[0], row[1]));
+        marker.bindTooltip(row[2]);
+        marker.bindPopup(function () {
+            var tipe = DAFTAR_TIPE[row[3]];
+            return '<b>' + row[2] + '</b><br><i>' + tipe[0] + '</i><br><br>' + tipe[1] + row[4]
+                + '<br><br>Koordinat: (' + row[0].toFixed(4) + ', ' + row[1].toFixed(4) + ')';
+        }, {maxWidth: 300});
+        return marker;
+    };
+})()
+"""
+
+
+def _kolom_popup(lok: Lokasi) -> tuple[str, str, str]:
+    """(label tipe, awalan teks, teks) untuk popup lazy; isinya sama dengan get_info_popup()."""
+    if isinstance(lok, TempatWisata):
+        return lok.jenis_wisata, "", lok.deskripsi
+    if isinstance(lok, Kuliner):
+        return "Kuliner", "Menu Andalan: ", lok.menu_andalan
+    if isinstance(lok, TempatIbadah):
+        return f"Tempat Ibadah ({lok.agama})", "", lok.deskripsi
+    return type(lok).__name__, "", getattr(lok, "deskripsi", "")
+
+
+def data_cluster_lokasi(list_objek: list) -> tuple[list, list, list]:
+    """Ubah objek lokasi menjadi baris [lat, lon, nama, indeks_tipe, teks] untuk FastMarkerCluster.
+    Mengembalikan (data, daftar_tipe, nama_lokasi_dilewati); daftar_tipe berisi [label, awalan_teks]."""
+    data, dilewati, posisi_tipe = [], [], {}
+    for lok in list_objek:
+        lat, lon = lok.get_koordinat()
+        if (lat, lon) != (0.0, 0.0):
+            label, awalan, teks = _kolom_popup(lok)
+            indeks_tipe = posisi_tipe.setdefault((label, awalan), len(posisi_tipe))
+            data.append([round(lat, 6), round(lon, 6), lok.nama, indeks_tipe, teks])
+        else:
+            dilewati.append(lok.nama)
+    return data, [list(tipe) for tipe in posisi_tipe], dilewati
+
+
+def callback_marker_lazy(daftar_tipe: list) -> str:
+    """CALLBACK_MARKER_LAZY dengan tabel label tipe dari data_cluster_lokasi."""
+    return CALLBACK_MARKER_LAZY.replace("__DAFTAR_TIPE__", json.dumps(daftar_tipe))
+
 # --- Kode Utama ---
 if __name__ == "__main__":
     NAMA_FILE_CSV = "Job12\lokasi_semarang.csv"
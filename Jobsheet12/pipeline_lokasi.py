@@ -0,0 +1,127 @@
+# pipeline_lokasi.py
+"""Pipeline streaming: CSV lokasi dibaca per chunk, tiap chunk diubah menjadi objek
+Lokasi lalu langsung diteruskan ke tahap-tahap berikutnya (peta, ekspor CSV, indeks).
+
+Hanya satu chunk objek yang hidup di memori pada satu waktu; tahap peta menyimpan
+data yang sudah dibaca dalam bentuk kolom (LokasiCollection) sampai peta ditulis.
+"""
+import os
+from abc import ABC, abstractmethod
+from koleksi_lokasi import LokasiCollection
+from indeks_spasial import IndeksSpasial
+from log import buat_peta_lokasi_folium, tulis_log
+from objek_data_pandas import baca_data_lokasi_bertahap, buat_objek_lokasi_dari_df
+
+
+# --- Tahap Pipeline ---
+class TahapPipeline(ABC):
+    """Satu tahap pipeline: menerima objek lokasi per chunk, lalu ditutup dengan selesai()."""
+
+    @abstractmethod
+    def proses(self, list_objek: list):
+        pass
+
+    def selesai(self):
+        pass
+
+
+class TahapPeta(TahapPipeline):
+    """Kumpulkan lokasi (kolumnar) lalu buat peta Folium di akhir pipeline."""
+
+    def __init__(self, file_output: str = "peta_lokasi.html", mode: str = "otomatis"):
+        self.file_output = file_output
+        self.mode = mode
+        self._bagian = []
+
+    def proses(self, list_objek: list):
+        self._bagian.append(LokasiCollection.dari_list(list_objek))
+
+    def selesai(self):
+        koleksi = LokasiCollection.gabung(self._bagian)
+        self._bagian = []
+        buat_peta_lokasi_folium(koleksi, self.file_output, mode=self.mode)
+
+
+class TahapEksporCsv(TahapPipeline):
+    """Tulis objek lokasi ke CSV (Nama, Latitude, Longitude, Tipe, Deskripsi) per chunk."""
+
+    def __init__(self, file_output: str):
+        self.file_output = file_output
+        self._header_ditulis = False
+        if os.path.exists(file_output):
+            os.remove(file_output) # Mulai dari file baru setiap pipeline dijalankan
+
+    def proses(self, list_objek: list):
+        if not list_objek:
+            return
+        df = LokasiCollection.dari_list(list_objek).ke_dataframe()
+        try:
+            df.to_csv(self.file_output, mode='a', header=not self._header_ditulis, index=False)
+            self._header_ditulis = True
+        except OSError as e:
+            print(f"ERROR: Gagal menulis ke '{self.file_output}': {e}")
+
+
+class TahapIndeks(TahapPipeline):
+    """Tambahkan koordinat tiap chunk ke IndeksSpasial; opsional simpan ke .npz di akhir."""
+
+    def __init__(self, ukuran_sel_km: float = 1.0, file_output: str | None = None):
+        self.indeks = IndeksSpasial(ukuran_sel_km)
+        self.file_output = file_output
+
+    def proses(self, list_objek: list):
+        if list_objek:
+            lat, lon = zip(*(lok.get_koordinat() for lok in list_objek))
+            self.indeks.tambah(lat, lon)
+
+    def selesai(self):
+        if self.file_output:
+            self.indeks.simpan(self.file_output)
+
+
+# --- Fungsi Pipeline ---
+def alirkan_objek_lokasi(nama_file: str, ukuran_chunk: int = 100_000,
+                         dtype_koordinat: str = "float64", lewati_baris_rusak: bool = True):
+    """Generator: list objek Lokasi untuk setiap chunk CSV."""
+    for chunk in baca_data_lokasi_bertahap(nama_file, ukuran_chunk, dtype_koordinat, lewati_baris_rusak):
+        yield buat_objek_lokasi_dari_df(chunk)
+
+
+def jalankan_pipeline(nama_file: str, daftar_tahap: list, ukuran_chunk: int = 100_000,
+                      dtype_koordinat: str = "float64", lewati_baris_rusak: bool = True) -> int:
+    """Alirkan CSV melalui semua tahap. Mengembalikan jumlah objek lokasi yang diproses.
+
+    Jika pembacaan gagal di tengah file, error dicatat lalu diteruskan dan selesai()
+    tidak dipanggil, sehingga tidak ada peta/indeks yang ditulis dari data terpotong.
+    Dengan lewati_baris_rusak=False, satu baris rusak sudah cukup untuk membatalkan pipeline.
+    """
+    total_objek = 0
+    jumlah_chunk = 0
+    tulis_log(f"[jalankan_pipeline] Mulai memproses '{nama_file}' (chunk {ukuran_chunk} baris).")
+    try:
+        for list_objek in alirkan_objek_lokasi(nama_file, ukuran_chunk, dtype_koordinat, lewati_baris_rusak):
+            jumlah_chunk += 1
+            total_objek += len(list_objek)
+            for tahap in daftar_tahap:
+                tahap.proses(list_objek)
+            print(f"  -> Chunk {jumlah_chunk}: {len(list_objek)} objek (total {total_objek}).")
+    except Exception as e:
+        tulis_log(f"[jalankan_pipeline] Dibatalkan setelah {jumlah_chunk} chunk: {type(e).__name__} - {e}")
+        raise
+    for tahap in daftar_tahap:
+        tahap.selesai()
+    tulis_log(f"[jalankan_pipeline] Selesai: {total_objek} objek dari {jumlah_chunk} chunk.")
+    return total_objek
+
+
+# --- Kode Utama ---
+if __name__ == "__main__":
+    NAMA_FILE_CSV = "lokasi_semarang.csv"
+
+    print("--- Pipeline Streaming Lokasi ---")
+    total = jalankan_pipeline(NAMA_FILE_CSV, [
+        TahapPeta("peta_interaktif_semarang.html"),
+        TahapEksporCsv("lokasi_bersih.csv"),
+        TahapIndeks(ukuran_sel_km=0.5, file_output="indeks_lokasi.npz"),
+    ], ukuran_chunk=10_000)
+    print(f"Total {total} lokasi diproses.")
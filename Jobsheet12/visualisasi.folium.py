@@ -1,64 +1,12 @@
 # !pip install folium pandas # jalankan kode ini jika Folium dan Pandas belum ada
 import pandas as pd
 import folium # Impor library Folium
-from abc import ABC, abstractmethod # Impor ABC dan abstractmethod
+from folium.plugins import FastMarkerCluster
+# Kelas lokasi, pembuat objek dan data mode cluster didefinisikan sekali di objek_data_pandas
+from objek_data_pandas import (AMBANG_MODE_CLUSTER, MODE_PETA, buat_objek_lokasi_dari_df,
+                               callback_marker_lazy, data_cluster_lokasi)
 
-# --- Definisi Kelas (Salin dari Praktikum 3/4) ---
-class Lokasi(ABC):
-    def __init__(self, nama: str, latitude: float, longitude: float):
-        self.nama = str(nama) if nama else "Tanpa Nama"
-        try:
-            self.latitude, self.longitude = float(latitude), float(longitude)
-        except ValueError:
-            self.latitude, self.longitude = 0.0, 0.0
-
-    def get_koordinat(self) -> tuple:
-        return (self.latitude, self.longitude)
-
-    @abstractmethod
-    def get_info_popup(self) -> str:
-        pass
-
-    def __repr__(self) -> str:
-        return f"{type(self).__name__}(nama='{self.nama}', lat={self.latitude:.4f}, lon={self.longitude:.4f})"
-
-    def __str__(self) -> str:
-        return f"{self.nama} [{type(self).__name__}]"
-
-
-class TempatWisata(Lokasi):
-    def __init__(self, nama: str, latitude: float, longitude: float,
-                 jenis: str, deskripsi: str):
-        super().__init__(nama, latitude, longitude)
-        self.jenis_wisata = str(jenis) if jenis else "Umum"
-        self.deskripsi = str(deskripsi) if deskripsi else "Tidak ada deskripsi."
-
-    def get_info_popup(self) -> str:
-        return f"<h4><b>{self.nama}</b></h4><i>{self.jenis_wisata}</i><br>{self.deskripsi}<br>Koordinat: ({self.latitude:.4f}, {self.longitude:.4f})"
-
-
-class Kuliner(Lokasi):
-    def __init__(self, nama: str, latitude: float, longitude: float,
-                 menu_andalan: str):
-        super().__init__(nama, latitude, longitude)
-        self.menu_andalan = str(menu_andalan) if menu_andalan else "Tidak diketahui"
-
-    def get_info_popup(self) -> str:
-        return f"{self.nama}<br>Kuliner<br><br>Menu Andalan: {self.menu_andalan}<br><br>Koordinat: ({self.latitude:.4f}, {self.longitude:.4f})"
-
-
-class TempatIbadah(Lokasi):
-    def __init__(self, nama: str, latitude: float, longitude: float,
-                 agama: str = "Umum", deskripsi: str = ""):
-        super().__init__(nama, latitude, longitude)
-        self.agama = str(agama) if agama else "Umum"
-        self.deskripsi = str(deskripsi) if deskripsi else "Tempat Ibadah"
-
-    def get_info_popup(self) -> str:
-        return f"{self.nama}<br>Tempat Ibadah ({self.agama})<br><br>{self.deskripsi}<br><br>Koordinat: ({self.latitude:.4f}, {self.longitude:.4f})"
-
-
-# --- Fungsi baca data dan buat objek (Salin dari Praktikum 4) ---
+# --- Fungsi baca data (Salin dari Praktikum 4) ---
 def baca_data_lokasi(nama_file: str) -> pd.DataFrame | None:
     try:
         dataframe = pd.read_csv(nama_file)
@@ -70,49 +18,29 @@ def baca_data_lokasi(nama_file: str) -> pd.DataFrame | None:
         print(f"ERROR saat membaca file CSV: {type(e).__name__} - {e}");
         return None
 
-def buat_objek_lokasi_dari_df(dataframe: pd.DataFrame) -> list:
-    list_objek_lokasi = []
-    if dataframe is None or dataframe.empty:
-        return list_objek_lokasi
-    for index, row in dataframe.iterrows():
-        nama = row.get('Nama',None)
-        lat = row.get('Latitude',None)
-        lon = row.get('Longitude',None)
-        tipe = row.get('Tipe','Lainnya')
-        deskripsi = row.get('Deskripsi','')
-
-        objek = None
-        if nama is None or lat is None or lon is None:
-            continue
-        try:
-            if 'Wisata' in tipe or tipe == 'Landmark':
-                objek = TempatWisata(nama, lat, lon, tipe, deskripsi)
-            elif tipe == 'Kuliner':
-                # Menggunakan kolom 'Deskripsi' sebagai 'menu_andalan' untuk contoh ini
-                objek = Kuliner(nama, lat, lon, deskripsi)
-            elif 'Ibadah' in tipe:
-                agama_info = "Umum" # Default
-                if "Islam" in tipe: agama_info="Islam"
-                elif "Kristen" in tipe: agama_info="Kristen"
-                elif "Klenteng" in tipe: agama_info="Tridharma"
-                # Dst...
-                objek = TempatIbadah(nama, lat, lon, agama_info, deskripsi)
-            if objek:
-                list_objek_lokasi.append(objek)
-        except Exception as e:
-            print(f"  -> GAGAL membuat objek untuk '{nama}' di baris {index}: {e}")
-    return list_objek_lokasi
-
 # --- Fungsi Inti Praktikum Ini ---
-def buat_peta_lokasi_folium(list_objek: list, file_output: str = "peta_lokasi.html"):
+def buat_peta_lokasi_folium(list_objek: list, file_output: str = "peta_lokasi.html",
+                            mode: str = "otomatis"):
     """
     Membuat peta Folium interaktif dengan marker untuk setiap objek
     dalam list_objek.
 
+    Untuk data besar (lebih dari AMBANG_MODE_CLUSTER titik) marker dikelompokkan
+    (cluster) dan dibuat di browser dari satu array data, dengan popup yang baru
+    dibuat saat marker diklik. Dengan begitu ukuran HTML dan beban browser tidak
+    meledak seperti saat membuat satu folium.Marker + folium.Popup per lokasi.
+
     Args:
         list_objek (list): List berisi instance objek turunan Lokasi.
         file_output (str): Nama file HTML untuk menyimpan peta.
+        mode (str): "marker" (satu marker per lokasi), "cluster", atau
+                    "otomatis" (pilih berdasarkan jumlah lokasi).
+
+    Raises:
+        ValueError: Jika mode bukan salah satu dari MODE_PETA.
     """
+    if mode not in MODE_PETA:
+        raise ValueError(f"mode peta tidak dikenal: {mode!r} (pilihan: {', '.join(MODE_PETA)})")
     if not list_objek:
         print("Tidak ada objek lokasi untuk dipetakan.")
         return
@@ -131,28 +59,41 @@ def buat_peta_lokasi_folium(list_objek: list, file_output: str = "peta_lokasi.ht
     peta = folium.Map(location=[lat_tengah, lon_tengah], zoom_start=13, tiles="OpenStreetMap")
     print(f"  -> Objek peta dibuat, berpusat di ({lat_tengah:.4f}, {lon_tengah:.4f})")
 
-    # 3. Tambahkan marker untuk setiap lokasi dalam list
-    jumlah_marker_valid = 0
-    for lok in list_objek:
-        koordinat = lok.get_koordinat()
-
-        # Pastikan koordinat valid (bukan 0.0, 0.0 dari error sebelumnya)
-        if koordinat != (0.0, 0.0):
-            # Ambil info popup secara polimorfik dari objek
-            # Metode get_info_popup() akan memanggil implementasi yang sesuai
-            # (TempatWisata, Kuliner, TempatIbadah)
-            info_popup_html = lok.get_info_popup()
-
-            # Buat objek Marker dan tambahkan ke peta
-            folium.Marker(
-                location=koordinat,                     # Koordinat marker
-                popup=folium.Popup(info_popup_html, max_width=300), # Konten popup saat diklik
-                tooltip=lok.nama                        # Teks saat hover
-                # icon=folium.Icon(color='blue', icon='info-sign') # Contoh kustomisasi ikon
-            ).add_to(peta)
-            jumlah_marker_valid += 1
-        else:
-             print(f"  -> Melewati marker untuk '{lok.nama}' karena koordinat tidak valid.")
+    # 3. Pilih mode: marker satu per satu untuk data kecil, cluster untuk data besar
+    if mode == "otomatis":
+        mode = "cluster" if len(list_objek) > AMBANG_MODE_CLUSTER else "marker"
+    print(f"  -> Mode peta: {mode}")
+
+    if mode == "cluster":
+        # Satu layer cluster berisi array [lat, lon, nama, indeks_tipe, teks] untuk semua lokasi
+        data, daftar_tipe, dilewati = data_cluster_lokasi(list_objek)
+        FastMarkerCluster(data, callback=callback_marker_lazy(daftar_tipe), name="Lokasi").add_to(peta)
+        jumlah_marker_valid = len(data)
+        if dilewati:
+            print(f"  -> Melewati {len(dilewati)} marker karena koordinat tidak valid.")
+    else:
+        # Tambahkan marker untuk setiap lokasi dalam list
+        jumlah_marker_valid = 0
+        for lok in list_objek:
+            koordinat = lok.get_koordinat()
+
+            # Pastikan koordinat valid (bukan 0.0, 0.0 dari error sebelumnya)
+            if koordinat != (0.0, 0.0):
+                # Ambil info popup secara polimorfik dari objek
+                # Metode get_info_popup() akan memanggil implementasi yang sesuai
+                # (TempatWisata, Kuliner, TempatIbadah)
+                info_popup_html = lok.get_info_popup()
+
+                # Buat objek Marker dan tambahkan ke peta
+                folium.Marker(
+                    location=koordinat,                     # Koordinat marker
+                    popup=folium.Popup(info_popup_html, max_width=300), # Konten popup saat diklik
+                    tooltip=lok.nama                        # Teks saat hover
+                    # icon=folium.Icon(color='blue', icon='info-sign') # Contoh kustomisasi ikon
+                ).add_to(peta)
+                jumlah_marker_valid += 1
+            else:
+                 print(f"  -> Melewati marker untuk '{lok.nama}' karena koordinat tidak valid.")
 
     # 4. Simpan peta ke file HTML
     try: